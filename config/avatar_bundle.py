@@ -0,0 +1,160 @@
+"""
+Avatar Bundle Module
+Packs a Live2D model's JSON files into one precompressed bundle.
+
+A model such as ANIYA is made of a .model3.json plus dozens of small expression,
+motion, physics and display-info JSON files that the page would otherwise fetch one
+by one. build_bundle() parses all of them once and writes
+``<avatar>/<id>.bundle.json.gz``::
+
+    {"version": 1, "avatar": id, "model": "<id>.model3.json",
+     "files": {relative path: parsed JSON, ...},
+     "moc": relative path, "textures": [relative paths],
+     "sources": {relative path: [mtime_ns, size], ...}}
+
+The page fetches the bundle in a single request, decompresses it with
+DecompressionStream and answers pixi-live2d-display's JSON loads from it, while the
+moc and textures are preloaded in parallel. Bundles are rebuilt on demand when any
+source file changed (see ensure_bundle), or offline with:
+
+    python -m config.avatar_bundle assets/avatar/ANIYA
+"""
+import os
+import sys
+import json
+import gzip
+from typing import Optional
+
+BUNDLE_VERSION = 1
+BUNDLE_SUFFIX = '.bundle.json.gz'
+# Cubism JSON that is loaded at runtime even when the model file does not list it
+# (e.g. expressions that VTube Studio hotkeys refer to)
+LIVE2D_JSON_SUFFIXES = ('.exp3.json', '.motion3.json', '.physics3.json', '.pose3.json',
+                        '.cdi3.json', '.userdata3.json')
+
+
+def bundle_path(avatar_path: str) -> str:
+    avatar_id = os.path.basename(os.path.normpath(avatar_path))
+    return os.path.join(avatar_path, avatar_id + BUNDLE_SUFFIX)
+
+
+def _find_model_file(avatar_path: str) -> Optional[str]:
+    for name in sorted(os.listdir(avatar_path)):
+        if name.endswith('.model3.json'):
+            return name
+    return None
+
+
+def _json_sources(avatar_path: str, model_file: str):
+    """
+    The model file, every JSON file it references and any other Cubism JSON in the
+    folder, as paths relative to avatar_path.
+    """
+    with open(os.path.join(avatar_path, model_file), 'r', encoding='utf-8') as f:
+        model = json.load(f)
+    refs = model.get('FileReferences', {}) or {}
+    files = [model_file]
+    for key in ('Physics', 'Pose', 'DisplayInfo', 'UserData'):
+        if refs.get(key):
+            files.append(refs[key])
+    files.extend(e['File'] for e in refs.get('Expressions', []) or [] if e.get('File'))
+    for motions in (refs.get('Motions', {}) or {}).values():
+        files.extend(m['File'] for m in motions or [] if m.get('File'))
+    for dirpath, dirnames, filenames in os.walk(avatar_path):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+        for name in sorted(filenames):
+            if name.endswith(LIVE2D_JSON_SUFFIXES):
+                files.append(os.path.relpath(os.path.join(dirpath, name), avatar_path))
+    seen = []
+    for rel in files:
+        rel = rel.replace('\\', '/')
+        if rel not in seen and os.path.isfile(os.path.join(avatar_path, rel)):
+            seen.append(rel)
+    return model, seen
+
+
+def _stat_sources(avatar_path: str, files):
+    sources = {}
+    for rel in files:
+        st = os.stat(os.path.join(avatar_path, rel))
+        sources[rel] = [st.st_mtime_ns, st.st_size]
+    return sources
+
+
+def build_bundle(avatar_path: str, out_path: str = None) -> dict:
+    """
+    Build the bundle for one avatar folder.
+
+    Returns a summary dict (path, files, raw_bytes, bundle_bytes).
+    """
+    avatar_path = os.path.abspath(avatar_path)
+    model_file = _find_model_file(avatar_path)
+    if not model_file:
+        raise FileNotFoundError(f"No .model3.json in {avatar_path}")
+    model, files = _json_sources(avatar_path, model_file)
+
+    parsed = {}
+    raw_bytes = 0
+    for rel in files:
+        with open(os.path.join(avatar_path, rel), 'rb') as f:
+            raw = f.read()
+        raw_bytes += len(raw)
+        parsed[rel] = json.loads(raw.decode('utf-8-sig'))
+
+    refs = model.get('FileReferences', {}) or {}
+    data = {
+        'version': BUNDLE_VERSION,
+        'avatar': os.path.basename(avatar_path),
+        'model': model_file,
+        'files': parsed,
+        'moc': refs.get('Moc'),
+        'textures': list(refs.get('Textures', []) or []),
+        'sources': _stat_sources(avatar_path, files),
+    }
+    payload = gzip.compress(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+                            compresslevel=9, mtime=0)
+
+    out_path = out_path or bundle_path(avatar_path)
+    tmp = out_path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp, out_path)
+    return {'path': out_path, 'files': len(files), 'raw_bytes': raw_bytes, 'bundle_bytes': len(payload)}
+
+
+def is_bundle_current(avatar_path: str) -> bool:
+    """True if the bundle exists and none of its source files changed."""
+    path = bundle_path(avatar_path)
+    try:
+        with gzip.open(path, 'rb') as f:
+            data = json.loads(f.read().decode('utf-8'))
+        if data.get('version') != BUNDLE_VERSION:
+            return False
+        model_file = _find_model_file(avatar_path)
+        if model_file != data.get('model'):
+            return False
+        _, files = _json_sources(avatar_path, model_file)
+        return _stat_sources(avatar_path, files) == data.get('sources')
+    except (OSError, ValueError, TypeError, KeyError):
+        return False
+
+
+def ensure_bundle(avatar_path: str) -> Optional[str]:
+    """Build the bundle if it is missing or stale. Returns its path, or None if the folder has no model."""
+    try:
+        if not is_bundle_current(avatar_path):
+            build_bundle(avatar_path)
+        return bundle_path(avatar_path)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not build avatar bundle for {avatar_path}: {e}")
+        return None
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Usage: python -m config.avatar_bundle <avatar folder> [<avatar folder> ...]")
+        sys.exit(1)
+    for folder in sys.argv[1:]:
+        summary = build_bundle(folder)
+        print(f"✓ {summary['path']}: {summary['files']} JSON files, "
+              f"{summary['raw_bytes'] / 1024:.0f} KB -> {summary['bundle_bytes'] / 1024:.0f} KB")
@@ -0,0 +1,194 @@
+"""
+Avatar Catalog Module
+Persistent index of the Live2D avatars in the avatar folder.
+
+Each entry records the avatar id, display name, model file, texture sizes and the
+mtimes of the files it was built from. refresh() walks the avatar folder with one
+scandir call and a few stat calls per avatar; only avatars whose folder, model,
+vtube or texture files changed are re-read. The index is saved as JSON next to the
+avatars, so a restart starts from the previous index instead of a directory crawl.
+"""
+import os
+import json
+import struct
+import threading
+from typing import Dict, List, Optional
+
+INDEX_VERSION = 1
+INDEX_FILENAME = '.avatar_index.json'
+
+
+def png_size(path: str):
+    """(width, height) of a PNG from its IHDR header, or None."""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(24)
+        if len(head) == 24 and head[:8] == b'\x89PNG\r\n\x1a\n' and head[12:16] == b'IHDR':
+            return struct.unpack('>II', head[16:24])
+    except OSError:
+        pass
+    return None
+
+
+def _mtime(path: str):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class AvatarCatalog:
+    """Incrementally refreshed, persisted index of avatars under avatar_dir."""
+
+    def __init__(self, avatar_dir: str, index_path: str = None):
+        self.avatar_dir = os.path.abspath(avatar_dir)
+        self.index_path = index_path or os.path.join(self.avatar_dir, INDEX_FILENAME)
+        self._entries: Dict[str, dict] = {}
+        self._skipped: Dict[str, int] = {}  # folders without a model -> dir mtime (not persisted)
+        self._lock = threading.Lock()
+        self.last_rescanned: List[str] = []
+        self._load_index()
+
+    # ---- persistence ----
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION and data.get('avatar_dir') == self.avatar_dir:
+                self._entries = {e['id']: e for e in data.get('avatars', [])}
+        except (OSError, ValueError, KeyError, TypeError):
+            self._entries = {}
+
+    def _save_index(self):
+        data = {
+            'version': INDEX_VERSION,
+            'avatar_dir': self.avatar_dir,
+            'avatars': [self._entries[k] for k in sorted(self._entries)],
+        }
+        tmp = self.index_path + '.tmp'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.index_path)
+        except OSError as e:
+            print(f"Warning: Could not save avatar index {self.index_path}: {e}")
+
+    # ---- scanning ----
+
+    def _is_current(self, entry: dict, dir_mtime) -> bool:
+        """True if nothing the entry was built from changed on disk."""
+        if entry.get('dir_mtime') != dir_mtime:
+            return False
+        for rel, mtime in entry.get('mtimes', {}).items():
+            if _mtime(os.path.join(entry['path'], rel)) != mtime:
+                return False
+        return True
+
+    def _scan_avatar(self, avatar_id: str, avatar_path: str, dir_mtime) -> Optional[dict]:
+        """Build the entry for one avatar folder, or None if it has no .model3.json."""
+        model_file = None
+        try:
+            for name in sorted(os.listdir(avatar_path)):
+                if name.endswith('.model3.json'):
+                    model_file = name
+                    break
+        except OSError:
+            return None
+        if not model_file:
+            return None
+
+        entry = {
+            'id': avatar_id,
+            'name': avatar_id,
+            'path': avatar_path,
+            'model_file': model_file,
+            'dir_mtime': dir_mtime,
+            'textures': [],
+            'mtimes': {model_file: _mtime(os.path.join(avatar_path, model_file))},
+        }
+
+        # Display name from vtube.json if available
+        vtube_name = f"{avatar_id}.vtube.json"
+        vtube_file = os.path.join(avatar_path, vtube_name)
+        if os.path.exists(vtube_file):
+            entry['mtimes'][vtube_name] = _mtime(vtube_file)
+            try:
+                with open(vtube_file, 'r', encoding='utf-8') as f:
+                    vtube_data = json.load(f)
+                if 'Name' in vtube_data:
+                    entry['name'] = vtube_data['Name']
+            except Exception:
+                pass  # Use folder name as fallback
+
+        # Texture sizes (PNG headers only) so the UI can tell heavy models apart
+        try:
+            with open(os.path.join(avatar_path, model_file), 'r', encoding='utf-8') as f:
+                model_data = json.load(f)
+            textures = model_data.get('FileReferences', {}).get('Textures', []) or []
+        except Exception:
+            textures = []
+        for rel in textures:
+            tex_path = os.path.join(avatar_path, rel)
+            size = png_size(tex_path)
+            entry['textures'].append({'file': rel, 'width': size[0] if size else None,
+                                      'height': size[1] if size else None})
+            entry['mtimes'][rel] = _mtime(tex_path)
+        return entry
+
+    def refresh(self) -> bool:
+        """
+        Bring the index up to date with the avatar folder.
+
+        Returns True if anything changed (and the index was saved).
+        """
+        with self._lock:
+            self.last_rescanned = []
+            if not os.path.isdir(self.avatar_dir):
+                changed = bool(self._entries)
+                self._entries = {}
+                return changed
+
+            seen = set()
+            changed = False
+            with os.scandir(self.avatar_dir) as it:
+                for item in it:
+                    if item.name.startswith('.') or not item.is_dir():
+                        continue
+                    seen.add(item.name)
+                    dir_mtime = item.stat().st_mtime_ns
+                    entry = self._entries.get(item.name)
+                    if entry is not None and self._is_current(entry, dir_mtime):
+                        continue
+                    if entry is None and self._skipped.get(item.name) == dir_mtime:
+                        continue
+                    new_entry = self._scan_avatar(item.name, os.path.abspath(item.path), dir_mtime)
+                    self.last_rescanned.append(item.name)
+                    if new_entry is None:
+                        self._skipped[item.name] = dir_mtime
+                        if self._entries.pop(item.name, None) is not None:
+                            changed = True
+                        continue
+                    if new_entry != entry:
+                        self._entries[item.name] = new_entry
+                        changed = True
+
+            for removed in set(self._entries) - seen:
+                del self._entries[removed]
+                changed = True
+
+            if changed or not os.path.exists(self.index_path):
+                self._save_index()
+            return changed
+
+    # ---- queries ----
+
+    def avatars(self) -> List[dict]:
+        """All indexed avatars, sorted by id."""
+        with self._lock:
+            return [dict(self._entries[k]) for k in sorted(self._entries)]
+
+    def get(self, avatar_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(avatar_id)
+            return dict(entry) if entry else None
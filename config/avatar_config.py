@@ -3,15 +3,20 @@ Avatar Configuration Module
 Manages available Live2D avatars and provides selection functionality.
 """
 import os
-import json
 from typing import List, Dict, Optional
 
+from .avatar_catalog import AvatarCatalog
+
+# Absolute so lookups don't depend on the process working directory
+DEFAULT_AVATAR_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "avatar"))
+
 class AvatarConfig:
     """Manages avatar configuration and selection."""
     
-    def __init__(self, avatar_dir: str = "assets/avatar"):
-        self.avatar_dir = avatar_dir
+    def __init__(self, avatar_dir: str = None):
+        self.avatar_dir = os.path.abspath(avatar_dir) if avatar_dir else DEFAULT_AVATAR_DIR
         self.default_avatar = "ANIYA"
+        self._catalog = AvatarCatalog(self.avatar_dir)
         self._available_avatars = None
         
     def get_available_avatars(self) -> List[Dict[str, str]]:
@@ -20,47 +25,21 @@ class AvatarConfig:
             self._scan_avatars()
         return self._available_avatars
     
+    def refresh(self) -> bool:
+        """Re-check the avatar folder (only changed avatars are re-read). Returns True if the list changed."""
+        changed = self._catalog.refresh()
+        if changed or self._available_avatars is None:
+            self._available_avatars = self._catalog.avatars()
+        return changed
+    
     def _scan_avatars(self):
-        """Scan avatar directory for available Live2D models."""
-        self._available_avatars = []
-        
+        """Load available Live2D models from the incrementally refreshed catalog index."""
         if not os.path.exists(self.avatar_dir):
             print(f"Warning: Avatar directory {self.avatar_dir} not found")
-            return
-            
-        for item in os.listdir(self.avatar_dir):
-            avatar_path = os.path.join(self.avatar_dir, item)
-            
-            # Check if it's a directory
-            if os.path.isdir(avatar_path):
-                # Look for .model3.json file
-                model_file = None
-                for file in os.listdir(avatar_path):
-                    if file.endswith('.model3.json'):
-                        model_file = file
-                        break
-                
-                if model_file:
-                    avatar_info = {
-                        'id': item,
-                        'name': item,
-                        'path': avatar_path,
-                        'model_file': model_file
-                    }
-                    
-                    # Try to get display name from vtube.json if available
-                    vtube_file = os.path.join(avatar_path, f"{item}.vtube.json")
-                    if os.path.exists(vtube_file):
-                        try:
-                            with open(vtube_file, 'r', encoding='utf-8') as f:
-                                vtube_data = json.load(f)
-                                if 'Name' in vtube_data:
-                                    avatar_info['name'] = vtube_data['Name']
-                        except:
-                            pass  # Use folder name as fallback
-                    
-                    self._available_avatars.append(avatar_info)
-                    print(f"✓ Found avatar: {avatar_info['name']} ({avatar_info['id']})")
+        self.refresh()
+        rescanned = self._catalog.last_rescanned
+        print(f"✓ Avatar catalog: {len(self._available_avatars)} avatars"
+              + (f" ({len(rescanned)} re-read)" if rescanned else ""))
     
     def get_avatar_info(self, avatar_id: str) -> Optional[Dict[str, str]]:
         """Get information about a specific avatar."""
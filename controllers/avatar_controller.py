@@ -29,6 +29,13 @@ class AvatarController(QObject):
         except Exception:
             pass
 
+    def play_lip_sync(self, payload: dict):
+        """Play an audio-derived mouth envelope (see voice.lip_sync.build_payload)."""
+        try:
+            self.avatar_widget.play_lip_sync(payload)
+        except Exception:
+            pass
+
     def set_view(self, mode: str):
         # future: tell page to switch view mode
         pass
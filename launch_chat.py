@@ -22,10 +22,12 @@ from PyQt5.QtWidgets import QApplication
 sys.path.insert(0, os.path.dirname(__file__))
 
 from ui.chat_window import ChatApp
+from ui.avatar_scheme import register_avatar_scheme
 from services.voice_engine_service import VoiceEngineService
 
 def main():
     """Launch the chat app with voice integration."""
+    register_avatar_scheme()
     app = QApplication(sys.argv)
     app.setApplicationName("Peer Elpis - AI Chat")
     
@@ -6,32 +6,14 @@ Launches the complete AI assistant application with:
 - Live2D avatar animation
 - Voice synthesis and cloning
 - Interactive chat interface
-- HTTP server for avatar assets
+- In-process elpis:// scheme for avatar assets (no local HTTP server)
 
 This is the full-featured version. For chat-only mode, use launch_chat.py instead.
 """
 
 import sys
-import threading
-import os
-from http.server import HTTPServer, SimpleHTTPRequestHandler
-from functools import partial
 from PyQt5.QtCore import Qt, QCoreApplication
 from PyQt5.QtWidgets import QApplication
-def start_local_server():
-    # Serve the 'assets/avatars' folder
-    avatars_path = os.path.join(os.path.dirname(__file__), "assets", "avatar")
-    # Do not change the process working directory; instead let the HTTP handler
-    # serve files from the specific assets/avatar directory. This prevents side
-    # effects where other parts of the app write logs relative to the CWD and
-    # end up under assets/avatar/logs.
-    handler = partial(SimpleHTTPRequestHandler, directory=avatars_path)
-    server = HTTPServer(("localhost", 8080), handler)
-    print("Starting local HTTP server at http://localhost:8080")
-    server.serve_forever()
-
-# Start server in a separate daemon thread
-threading.Thread(target=start_local_server, daemon=True).start()
 
 # -------------------------------
 # Launch PyQt app
@@ -41,7 +23,12 @@ if __name__ == "__main__":
     QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
     # Import WebEngine AFTER setting attribute but BEFORE creating QApplication
     from PyQt5 import QtWebEngineWidgets  # noqa: F401
+    # Avatar assets are served from memory via elpis://avatar/; the scheme has to be
+    # declared before QApplication exists
+    from ui.avatar_scheme import register_avatar_scheme, install_avatar_scheme
+    register_avatar_scheme()
     app = QApplication(sys.argv)
+    install_avatar_scheme()
     from ui.chat_window import ChatApp
     window = ChatApp()
     window.show()
@@ -7,6 +7,7 @@ Usage:
     python run_tests.py voice         # Run voice tests only
     python run_tests.py integration   # Run integration tests only
     python run_tests.py debug         # Run debug utilities
+    python run_tests.py benchmark     # Run benchmarks
 """
 
 import sys
@@ -56,6 +57,19 @@ def run_debug_utilities():
         except subprocess.CalledProcessError:
             print(f"❌ {debug_file.name} failed")
 
+def run_benchmarks():
+    """Run benchmarks."""
+    print("=== Running Benchmarks ===")
+    bench_dir = Path("tests/benchmarks")
+    
+    for bench_file in bench_dir.glob("bench_*.py"):
+        print(f"\nRunning {bench_file.name}...")
+        try:
+            subprocess.run([sys.executable, str(bench_file)], check=True)
+            print(f"✅ {bench_file.name} completed")
+        except subprocess.CalledProcessError:
+            print(f"❌ {bench_file.name} failed")
+
 def main():
     """Main test runner."""
     if len(sys.argv) < 2:
@@ -70,9 +84,11 @@ def main():
             run_integration_tests()
         elif test_type == "debug":
             run_debug_utilities()
+        elif test_type == "benchmark":
+            run_benchmarks()
         else:
             print(f"Unknown test type: {test_type}")
-            print("Available options: voice, integration, debug")
+            print("Available options: voice, integration, debug, benchmark")
             sys.exit(1)
 
 if __name__ == "__main__":
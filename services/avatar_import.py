@@ -0,0 +1,302 @@
+"""
+Background import of Live2D avatar folders.
+
+Copying a model folder (textures are often tens of MB) used to block the GUI thread.
+An import job now runs on a thread pool and, per file, tries the cheapest way to get
+the bytes into the avatar folder: a hardlink (same filesystem), a copy-on-write
+reflink (Linux FICLONE), then a chunked byte copy. Progress is reported per chunk,
+the files referenced by the .model3.json are checked while copying, and the result is
+assembled in a temporary folder that is renamed into place only when complete, so a
+failed or cancelled import never leaves a half-copied avatar behind.
+"""
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+import itertools
+from typing import Optional, Dict, Any, List
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+COPY_CHUNK = 1 << 20
+FICLONE = 0x40049409  # linux/fs.h
+PROGRESS_INTERVAL = 0.05  # seconds between progress signals
+
+
+class ImportCancelled(Exception):
+    """Raised inside an import job when cancellation was requested."""
+
+
+def find_model_file(folder: str) -> Optional[str]:
+    """Name of the first .model3.json in folder, or None."""
+    try:
+        for name in sorted(os.listdir(folder)):
+            if name.endswith('.model3.json'):
+                return name
+    except OSError:
+        pass
+    return None
+
+
+def model_references(model_path: str) -> Dict[str, List[str]]:
+    """
+    Files a .model3.json refers to, relative to its folder, grouped as
+    'required' (moc, textures) and 'optional' (physics, pose, expressions, motions, ...).
+    """
+    with open(model_path, 'r', encoding='utf-8') as f:
+        refs = json.load(f).get('FileReferences', {}) or {}
+    required = []
+    optional = []
+    if refs.get('Moc'):
+        required.append(refs['Moc'])
+    required.extend(refs.get('Textures', []) or [])
+    for key in ('Physics', 'Pose', 'DisplayInfo', 'UserData'):
+        if refs.get(key):
+            optional.append(refs[key])
+    for expression in refs.get('Expressions', []) or []:
+        if expression.get('File'):
+            optional.append(expression['File'])
+    for motions in (refs.get('Motions', {}) or {}).values():
+        for motion in motions or []:
+            for key in ('File', 'Sound'):
+                if motion.get(key):
+                    optional.append(motion[key])
+    norm = lambda paths: [os.path.normpath(p) for p in paths]
+    return {'required': norm(required), 'optional': norm(optional)}
+
+
+def _try_reflink(src: str, dst: str) -> bool:
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return True
+    except OSError:
+        try:
+            os.remove(dst)
+        except OSError:
+            pass
+        return False
+
+
+def link_or_copy(src: str, dst: str, on_bytes=None, cancel_event: threading.Event = None) -> str:
+    """
+    Place src at dst using a hardlink, a reflink or a chunked copy, in that order.
+
+    on_bytes(n) is called as bytes are copied (with the whole size for link/reflink).
+    Returns the method used: 'link', 'reflink' or 'copy'.
+    """
+    size = os.path.getsize(src)
+    try:
+        os.link(src, dst)
+        if on_bytes:
+            on_bytes(size)
+        return 'link'
+    except OSError:
+        pass
+    if _try_reflink(src, dst):
+        shutil.copystat(src, dst)
+        if on_bytes:
+            on_bytes(size)
+        return 'reflink'
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise ImportCancelled()
+            chunk = fsrc.read(COPY_CHUNK)
+            if not chunk:
+                break
+            fdst.write(chunk)
+            if on_bytes:
+                on_bytes(len(chunk))
+    shutil.copystat(src, dst)
+    return 'copy'
+
+
+class AvatarImportSignals(QObject):
+    # job_id, current file (relative), bytes done, total bytes
+    progress = pyqtSignal(int, str, int, int)
+    # job_id, result dict
+    finished = pyqtSignal(int, dict)
+    # job_id, error message
+    failed = pyqtSignal(int, str)
+    # job_id
+    cancelled = pyqtSignal(int)
+
+
+class AvatarImportJob(QRunnable):
+    """Imports one avatar folder into the avatar directory; runs on the importer's pool."""
+
+    def __init__(self, job_id: int, source_folder: str, avatar_dir: str, avatar_id: str = None):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.job_id = job_id
+        self.source_folder = os.path.abspath(source_folder)
+        self.avatar_dir = os.path.abspath(avatar_dir)
+        self.avatar_id = avatar_id or os.path.basename(self.source_folder.rstrip('/\\'))
+        self.signals = AvatarImportSignals()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def run(self):
+        try:
+            result = self._import()
+        except ImportCancelled:
+            logger.info(f"[AvatarImport] Job {self.job_id} cancelled")
+            self.signals.cancelled.emit(self.job_id)
+        except Exception as e:
+            logger.error(f"[AvatarImport] Job {self.job_id} failed: {e}")
+            self.signals.failed.emit(self.job_id, str(e))
+        else:
+            self.signals.finished.emit(self.job_id, result)
+
+    def _import(self) -> Dict[str, Any]:
+        started = time.time()
+        model_file = find_model_file(self.source_folder)
+        if not model_file:
+            raise RuntimeError("No .model3.json file found in the selected folder")
+        references = model_references(os.path.join(self.source_folder, model_file))
+
+        files = []
+        for dirpath, _, filenames in os.walk(self.source_folder):
+            for name in filenames:
+                full = os.path.join(dirpath, name)
+                files.append((os.path.relpath(full, self.source_folder), full, os.path.getsize(full)))
+        total = sum(size for _, _, size in files)
+        present = {rel for rel, _, _ in files}
+
+        missing_required = [r for r in references['required'] if r not in present]
+        if missing_required:
+            raise RuntimeError("Model references missing files: " + ", ".join(missing_required))
+        warnings = [f"Missing referenced file: {r}" for r in references['optional'] if r not in present]
+
+        os.makedirs(self.avatar_dir, exist_ok=True)
+        staging = os.path.join(self.avatar_dir, f".importing-{self.avatar_id}-{os.getpid()}-{self.job_id}")
+        methods = {'link': 0, 'reflink': 0, 'copy': 0}
+        done = 0
+        last_emit = 0.0
+        current = ''
+
+        def on_bytes(n):
+            nonlocal done, last_emit
+            done += n
+            now = time.time()
+            if now - last_emit >= PROGRESS_INTERVAL or done == total:
+                last_emit = now
+                self.signals.progress.emit(self.job_id, current, done, total)
+
+        try:
+            for rel, full, _ in files:
+                if self._cancel.is_set():
+                    raise ImportCancelled()
+                current = rel
+                dst = os.path.join(staging, rel)
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                methods[link_or_copy(full, dst, on_bytes, self._cancel)] += 1
+            if not files:
+                os.makedirs(staging, exist_ok=True)
+
+            # The copy must still be loadable on its own
+            copied = references['required'] + [r for r in references['optional'] if r in present]
+            unreadable = [r for r in copied if not os.path.isfile(os.path.join(staging, r))]
+            if unreadable:
+                raise RuntimeError("Files missing after copy: " + ", ".join(unreadable))
+            if self._cancel.is_set():
+                raise ImportCancelled()
+
+            dest = os.path.join(self.avatar_dir, self.avatar_id)
+            replaced = None
+            if os.path.exists(dest):
+                replaced = os.path.join(self.avatar_dir, f".replaced-{self.avatar_id}-{os.getpid()}-{self.job_id}")
+                os.rename(dest, replaced)
+            os.rename(staging, dest)
+            if replaced:
+                shutil.rmtree(replaced, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        return {
+            'avatar_id': self.avatar_id,
+            'path': dest,
+            'model_file': model_file,
+            'files': len(files),
+            'bytes': total,
+            'methods': methods,
+            'warnings': warnings,
+            'elapsed': time.time() - started,
+        }
+
+
+class AvatarImporter(QObject):
+    """Runs avatar imports off the GUI thread, one at a time."""
+
+    progress = pyqtSignal(int, str, int, int)   # job_id, file, bytes done, total bytes
+    finished = pyqtSignal(int, dict)            # job_id, result
+    failed = pyqtSignal(int, str)               # job_id, error message
+    cancelled = pyqtSignal(int)                 # job_id
+
+    def __init__(self, avatar_dir: str, parent=None):
+        super().__init__(parent)
+        self.avatar_dir = avatar_dir
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._ids = itertools.count(1)
+        self._jobs = {}
+
+    def submit(self, source_folder: str, avatar_id: str = None) -> int:
+        """Queue an import of source_folder. Returns the job id used in all signals."""
+        job_id = next(self._ids)
+        job = AvatarImportJob(job_id, source_folder, self.avatar_dir, avatar_id)
+        job.signals.progress.connect(self.progress)
+        job.signals.finished.connect(self._on_finished)
+        job.signals.failed.connect(self._on_failed)
+        job.signals.cancelled.connect(self._on_cancelled)
+        self._jobs[job_id] = job
+        self._pool.start(job)
+        return job_id
+
+    def cancel(self, job_id: Optional[int] = None) -> bool:
+        """Cancel one import, or all of them when job_id is None."""
+        jobs = list(self._jobs.values()) if job_id is None else [self._jobs.get(job_id)]
+        cancelled = False
+        for job in jobs:
+            if job is None:
+                continue
+            if self._pool.tryTake(job):
+                self._jobs.pop(job.job_id, None)
+                self.cancelled.emit(job.job_id)
+            else:
+                job.cancel()
+            cancelled = True
+        return cancelled
+
+    def is_busy(self) -> bool:
+        return bool(self._jobs)
+
+    def wait(self, timeout_ms: int = -1) -> bool:
+        return self._pool.waitForDone(timeout_ms)
+
+    def _on_finished(self, job_id: int, result: dict):
+        self._jobs.pop(job_id, None)
+        self.finished.emit(job_id, result)
+
+    def _on_failed(self, job_id: int, message: str):
+        self._jobs.pop(job_id, None)
+        self.failed.emit(job_id, message)
+
+    def _on_cancelled(self, job_id: int):
+        self._jobs.pop(job_id, None)
+        self.cancelled.emit(job_id)
@@ -0,0 +1,130 @@
+"""
+Background speech worker so synthesis and playback never block the GUI thread.
+"""
+import time
+import queue
+import logging
+import itertools
+from PyQt5.QtCore import QThread, pyqtSignal
+from voice import lip_sync
+from voice import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SpeechWorker(QThread):
+    """
+    Dedicated thread that owns a queue of speech requests and speaks them one at a time.
+
+    All signals are emitted from the worker thread; receivers living in the GUI thread
+    get them through Qt's queued connections, so typing updates and timing data can be
+    used directly to touch widgets.
+    """
+
+    # request_id, text so far, is_complete
+    typing_update = pyqtSignal(int, str, bool)
+    # request_id, timing dict
+    speaking_started = pyqtSignal(int, dict)
+    # request_id, timing dict (includes 'event', 'index', 'total')
+    speaking_progress = pyqtSignal(int, dict)
+    # request_id, success, timing dict
+    speaking_finished = pyqtSignal(int, bool, dict)
+    # request_id, lip-sync payload for one audio chunk (see voice.lip_sync.build_payload)
+    lip_sync = pyqtSignal(int, dict)
+    # request_id, per-request timing record (see voice.metrics.RequestTrace.record)
+    metrics_ready = pyqtSignal(int, dict)
+
+    _STOP = object()
+
+    def __init__(self, engine, parent=None, registry: metrics.MetricsRegistry = None):
+        super().__init__(parent)
+        self._engine = engine
+        self._registry = registry or metrics.registry
+        self._queue = queue.Queue()
+        self._ids = itertools.count(1)
+
+    def enqueue(self, text: str) -> int:
+        """Queue text to be spoken. Returns the request id used in all signals."""
+        request_id = next(self._ids)
+        self._queue.put((request_id, text, time.time()))
+        return request_id
+
+    def pending(self) -> int:
+        """Number of requests waiting behind the one currently being spoken."""
+        return self._queue.qsize()
+
+    def clear_pending(self) -> int:
+        """Drop queued requests that have not started yet. Returns how many were dropped."""
+        dropped = 0
+        try:
+            while True:
+                item = self._queue.get_nowait()
+                if item is self._STOP:
+                    # keep the stop request, it must still be honoured
+                    self._queue.put(item)
+                    break
+                dropped += 1
+        except queue.Empty:
+            pass
+        return dropped
+
+    def stop(self, timeout_ms: int = 5000):
+        """Ask the worker to exit after the current request and wait for it."""
+        self._queue.put(self._STOP)
+        if self.isRunning():
+            self.wait(timeout_ms)
+
+    def run(self):
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                break
+            request_id, text, queued_at = item
+            self._speak(request_id, text, queued_at)
+
+    def _speak(self, request_id: int, text: str, queued_at: float):
+        started_at = time.time()
+        timing = {
+            'queued_at': queued_at,
+            'started_at': started_at,
+            'queue_wait': started_at - queued_at,
+            'first_audio_at': None,
+            'finished_at': None,
+        }
+        self.speaking_started.emit(request_id, dict(timing))
+
+        def typing_callback(partial_text, is_complete):
+            self.typing_update.emit(request_id, partial_text, bool(is_complete))
+
+        def progress_callback(event, index, total):
+            now = time.time()
+            if event == 'audio_start' and timing['first_audio_at'] is None:
+                timing['first_audio_at'] = now
+                timing['time_to_first_audio'] = now - started_at
+            info = dict(timing)
+            info.update({'event': event, 'index': index, 'total': total, 'at': now})
+            self.speaking_progress.emit(request_id, info)
+
+        def audio_callback(audio, sample_rate, index, total):
+            # Envelope is computed here, off the GUI thread, right before playback starts
+            payload = lip_sync.build_payload(audio, sample_rate, start_time=time.time())
+            payload['index'] = index
+            self.lip_sync.emit(request_id, payload)
+
+        success = True
+        with metrics.trace_request(request_id, queued_at) as trace, metrics.torch_profile_once():
+            try:
+                self._engine.speak(text, typing_callback, progress_callback=progress_callback,
+                                   audio_callback=audio_callback)
+            except Exception as e:
+                logger.error(f"[SpeechWorker] Speech request {request_id} failed: {e}")
+                success = False
+
+        record = trace.record(success)
+        self._registry.add(record)
+        self.metrics_ready.emit(request_id, record)
+
+        finished_at = time.time()
+        timing['finished_at'] = finished_at
+        timing['duration'] = finished_at - started_at
+        self.speaking_finished.emit(request_id, success, dict(timing))
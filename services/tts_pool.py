@@ -0,0 +1,309 @@
+"""
+Shared synthesis host for many concurrent chat sessions.
+
+Sessions submit sentences; the pool tokenizes them on the caller's thread and queues
+them per session. A dispatcher thread forms batches of sentences that share a target
+voice, speed and language and fall into the same token-length bucket (so padding stays
+small), waits up to batch_window for more sentences to join, and hands the batch to a
+worker thread. The worker runs one padded BaseSpeakerTTS.infer_batch() pass and, for
+cloned voices, one ToneColorConverter.convert_batch() pass, then resolves each
+sentence's Future.
+
+Fairness: sessions are served round-robin and one session can take at most its fair
+share of a batch while others are waiting. Latency: a sentence that has waited
+max_wait is dispatched with the next free worker regardless of round-robin order, and
+the batching window never delays a sentence past max_wait.
+"""
+import re
+import time
+import queue
+import logging
+import threading
+import collections
+from concurrent.futures import Future
+from typing import List, Optional
+
+import numpy as np
+
+from voice.openvoice import utils as ov_utils
+from voice import metrics
+from voice.audio_io import resample
+
+logger = logging.getLogger(__name__)
+
+# Upper token-length bound of each batching bucket (longer sentences share the last one)
+DEFAULT_BUCKETS = (32, 64, 128, 256)
+
+# Silence between sentences when joining them, as BaseSpeakerTTS.audio_numpy_concat
+SENTENCE_GAP_SECONDS = 0.05
+
+
+class _Sentence:
+    __slots__ = ('session_id', 'text', 'tokens', 'speaker', 'speed', 'language', 'reference_audio',
+                 'key', 'queued_at', 'future')
+
+    def __init__(self, session_id, text, tokens, speaker, speed, language, reference_audio, bucket):
+        self.session_id = session_id
+        self.text = text
+        self.tokens = tokens
+        self.speaker = speaker
+        self.speed = speed
+        self.language = language
+        self.reference_audio = reference_audio
+        # sentences with the same key can share a batch
+        self.key = (reference_audio, float(speed), language, bucket)
+        self.queued_at = time.monotonic()
+        self.future = Future()
+
+
+class TTSWorkerPool:
+    """
+    Batching front end for one OpenVoiceTTS instance shared by many sessions.
+
+    Args:
+        tts: a loaded voice.openvoice_tts.OpenVoiceTTS
+        workers: threads running batches (they share the model weights)
+        max_batch: most sentences per batch
+        batch_window: seconds the dispatcher waits for a batch to fill
+        max_wait: bound on the time a sentence waits before it is dispatched
+        buckets: token-length bucket edges
+    """
+
+    def __init__(self, tts, workers: int = 1, max_batch: int = 8, batch_window: float = 0.02,
+                 max_wait: float = 0.25, buckets=DEFAULT_BUCKETS):
+        self.tts = tts
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = float(max_wait)
+        self.batch_window = min(float(batch_window), self.max_wait)
+        self.buckets = tuple(sorted(buckets))
+
+        self._cond = threading.Condition()
+        self._sessions: "collections.OrderedDict[object, collections.deque]" = collections.OrderedDict()
+        self._batches = queue.Queue()
+        # batches are only formed when a worker can take them, so sentences keep joining while all are busy
+        self._free_workers = threading.Semaphore(max(1, int(workers)))
+        self._closed = False
+        self._stats = {'requests': 0, 'sentences': 0, 'batches': 0, 'batched': 0, 'max_batch': 0,
+                       'max_queue_wait': 0.0, 'failures': 0}
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name='tts-pool-dispatch', daemon=True)
+        self._workers = [threading.Thread(target=self._worker_loop, name=f'tts-pool-worker-{i}', daemon=True)
+                         for i in range(max(1, int(workers)))]
+        self._dispatcher.start()
+        for t in self._workers:
+            t.start()
+
+    # ---- submission -------------------------------------------------------
+
+    def _bucket(self, n_tokens: int) -> int:
+        for i, edge in enumerate(self.buckets):
+            if n_tokens <= edge:
+                return i
+        return len(self.buckets)
+
+    def submit(self, session_id, text: str, reference_audio: Optional[str] = None, speaker: str = 'default',
+               language: str = 'English', speed: float = 1.0) -> Future:
+        """
+        Queue one sentence. The Future resolves to (audio float32 array, sample_rate).
+        """
+        base = self.tts.base_speaker_tts
+        mark = base.language_marks.get(language.lower(), None)
+        if mark is None:
+            raise ValueError(f"language {language} is not supported")
+        if speaker not in base.hps.speakers:
+            raise ValueError(f"unknown speaker: {speaker}")
+        with metrics.span('tokenize'):
+            piece = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
+            tokens = base.get_text(f'[{mark}]{piece}[{mark}]', base.hps, False)
+        sentence = _Sentence(session_id, text, tokens, speaker, speed, language, reference_audio,
+                             self._bucket(int(tokens.shape[0])))
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("TTSWorkerPool is shut down")
+            self._sessions.setdefault(session_id, collections.deque()).append(sentence)
+            self._stats['sentences'] += 1
+            self._cond.notify_all()
+        return sentence.future
+
+    def split_text(self, text: str, language: str = 'English') -> List[str]:
+        """Sentences of text, split the way BaseSpeakerTTS.tts splits them."""
+        mark = self.tts.base_speaker_tts.language_marks.get(language.lower(), 'EN')
+        return [t for t in ov_utils.split_sentence(text, language_str=mark) if t.strip()]
+
+    def submit_text(self, session_id, text: str, reference_audio: Optional[str] = None,
+                    speaker: str = 'default', language: str = 'English', speed: float = 1.0) -> List[Future]:
+        """Split text into sentences and queue them in order. Returns one Future per sentence."""
+        with self._cond:
+            self._stats['requests'] += 1
+        return [self.submit(session_id, t, reference_audio, speaker, language, speed)
+                for t in self.split_text(text, language)]
+
+    def synthesize(self, session_id, text: str, reference_audio: Optional[str] = None,
+                   speaker: str = 'default', language: str = 'English', speed: float = 1.0,
+                   timeout: float = None):
+        """Blocking helper: synthesize text through the pool and join the sentences."""
+        futures = self.submit_text(session_id, text, reference_audio, speaker, language, speed)
+        sr = self.tts.sampling_rate
+        gap = np.zeros(int(sr * SENTENCE_GAP_SECONDS / speed), dtype=np.float32)
+        parts = []
+        for future in futures:
+            audio, sr = future.result(timeout)
+            parts += [audio, gap]
+        return (np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)), sr
+
+    def cancel_session(self, session_id) -> int:
+        """Drop a session's sentences that have not been dispatched. Returns how many."""
+        with self._cond:
+            pending = self._sessions.pop(session_id, None) or ()
+        for sentence in pending:
+            sentence.future.cancel()
+        return len(pending)
+
+    def pending(self) -> int:
+        with self._cond:
+            return sum(len(q) for q in self._sessions.values())
+
+    def stats(self) -> dict:
+        with self._cond:
+            stats = dict(self._stats)
+        stats['mean_batch'] = stats['batched'] / stats['batches'] if stats['batches'] else 0.0
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work, cancel what was not dispatched and stop the threads."""
+        with self._cond:
+            self._closed = True
+            pending = [s for q in self._sessions.values() for s in q]
+            self._sessions.clear()
+            self._cond.notify_all()
+        self._free_workers.release()
+        for sentence in pending:
+            sentence.future.cancel()
+        if wait:
+            self._dispatcher.join()
+        for _ in self._workers:
+            self._batches.put(None)
+        if wait:
+            for t in self._workers:
+                t.join()
+
+    # ---- scheduling ---------------------------------------------------------
+
+    def _oldest(self) -> Optional[_Sentence]:
+        heads = [q[0] for q in self._sessions.values() if q]
+        return min(heads, key=lambda s: s.queued_at) if heads else None
+
+    def _next_anchor(self, now: float) -> Optional[_Sentence]:
+        """Overdue sentences first, otherwise the head of the next session in round-robin order."""
+        oldest = self._oldest()
+        if oldest is None or now - oldest.queued_at >= self.max_wait:
+            return oldest
+        for session_id, q in self._sessions.items():
+            if q:
+                return q[0]
+        return None
+
+    def _take_batch(self, anchor: _Sentence) -> List[_Sentence]:
+        """Remove a batch of sentences compatible with anchor, at most a fair share per session."""
+        active = [sid for sid, q in self._sessions.items() if any(s.key == anchor.key for s in q)]
+        share = max(1, self.max_batch // max(1, len(active)))
+        batch = [anchor]
+        self._sessions[anchor.session_id].remove(anchor)
+        taken = collections.Counter({anchor.session_id: 1})
+        # round-robin one sentence per session per pass until the batch is full
+        progress = True
+        while len(batch) < self.max_batch and progress:
+            progress = False
+            for session_id in active:
+                if len(batch) >= self.max_batch or taken[session_id] >= share:
+                    continue
+                q = self._sessions.get(session_id)
+                match = next((s for s in q if s.key == anchor.key), None) if q else None
+                if match is not None:
+                    q.remove(match)
+                    batch.append(match)
+                    taken[session_id] += 1
+                    progress = True
+        # the served session moves to the back of the round-robin order
+        for session_id in list(taken):
+            if session_id in self._sessions:
+                self._sessions.move_to_end(session_id)
+                if not self._sessions[session_id]:
+                    del self._sessions[session_id]
+        return batch
+
+    def _compatible(self, key) -> int:
+        return sum(1 for q in self._sessions.values() for s in q if s.key == key)
+
+    def _dispatch_loop(self):
+        while True:
+            self._free_workers.acquire()
+            with self._cond:
+                while not self._closed and self._oldest() is None:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                now = time.monotonic()
+                anchor = self._next_anchor(now)
+                # let the batch fill, bounded by the window and the oldest sentence's max_wait
+                deadline = min(anchor.queued_at + self.batch_window,
+                               self._oldest().queued_at + self.max_wait)
+                while (not self._closed and self._compatible(anchor.key) < self.max_batch
+                       and time.monotonic() < deadline):
+                    self._cond.wait(deadline - time.monotonic())
+                if self._closed:
+                    return
+                # the anchor may have been cancelled while waiting
+                anchor = self._next_anchor(time.monotonic())
+                if anchor is None:
+                    self._free_workers.release()
+                    continue
+                batch = self._take_batch(anchor)
+            self._batches.put(batch)
+
+    # ---- execution ----------------------------------------------------------
+
+    def _worker_loop(self):
+        while True:
+            batch = self._batches.get()
+            if batch is None:
+                return
+            batch = [s for s in batch if s.future.set_running_or_notify_cancel()]
+            try:
+                if batch:
+                    self._run_batch(batch)
+            finally:
+                self._free_workers.release()
+
+    def _run_batch(self, batch: List[_Sentence]):
+        started = time.monotonic()
+        tts = self.tts
+        first = batch[0]
+        try:
+            with metrics.span('synthesis'):
+                audios = tts.base_speaker_tts.infer_batch([s.tokens for s in batch], [s.speaker for s in batch],
+                                                          speed=first.speed)
+                sr = tts.base_speaker_tts.hps.data.sampling_rate
+                if first.reference_audio:
+                    target_se = tts.get_target_se(first.reference_audio)
+                    converter = tts.tone_color_converter
+                    if converter.hps.data.sampling_rate != sr:
+                        audios = [resample(a, sr, converter.hps.data.sampling_rate) for a in audios]
+                        sr = converter.hps.data.sampling_rate
+                    audios = converter.convert_batch(audios, tts.source_se, [target_se] * len(batch),
+                                                     message="@peer-elpis")
+        except Exception as e:
+            logger.error(f"[TTSPool] Batch of {len(batch)} failed: {e}")
+            with self._cond:
+                self._stats['failures'] += len(batch)
+            for s in batch:
+                s.future.set_exception(e)
+            return
+        with self._cond:
+            self._stats['batches'] += 1
+            self._stats['batched'] += len(batch)
+            self._stats['max_batch'] = max(self._stats['max_batch'], len(batch))
+            self._stats['max_queue_wait'] = max(self._stats['max_queue_wait'],
+                                                max(started - s.queued_at for s in batch))
+        for s, audio in zip(batch, audios):
+            s.future.set_result((audio, sr))
@@ -0,0 +1,588 @@
+"""
+Headless local TTS server.
+
+Exposes OpenVoiceTTS (through a TTSWorkerPool, so concurrent clients share batches)
+over HTTP and WebSocket on 127.0.0.1, using only asyncio from the standard library:
+
+    GET    /health              status, sampling rate, active and queued streams
+    GET    /v1/voices           ids of cached voices
+    PUT    /v1/voices/<id>      body: reference audio file (wav/mp3/...); extracts and caches the voice
+    DELETE /v1/voices/<id>
+    POST   /v1/tts              JSON {text, voice?, speaker?, speed?, language?, format?}
+                                -> chunked audio stream, sent as each sentence is synthesized
+    GET    /v1/stream           WebSocket: send the same JSON as text messages, receive binary
+                                audio messages and a {"event": "done"} text message per request
+
+Formats: 'pcm' (s16le mono, rate in X-Sample-Rate / the 'start' event), 'wav' (streamed
+WAV header with an open length, then s16le) and 'opus' (needs opuslib; 20 ms packets at
+24 kHz, one WebSocket message each or, over HTTP, each prefixed with a 2-byte length).
+
+Backpressure: each stream keeps at most `lookahead` sentences queued ahead of what the
+client has received, and every write waits for the socket buffer to drain, so a slow
+client holds back only its own synthesis. At most max_streams streams synthesize at
+once; up to max_queued more wait for a slot and further requests get 503.
+
+Run with ``python -m services.tts_server [--port 8765]``. LocalClient is a small
+asyncio client for tests and scripts.
+"""
+import os
+import re
+import sys
+import json
+import struct
+import base64
+import asyncio
+import hashlib
+import logging
+import argparse
+import itertools
+import collections
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+FORMATS = ('pcm', 'wav', 'opus')
+MAX_JSON_BYTES = 64 << 10
+MAX_UPLOAD_BYTES = 32 << 20
+CHUNK_BYTES = 16 << 10
+OPUS_RATE = 24000
+OPUS_FRAME = OPUS_RATE // 50  # 20 ms
+
+_WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+_VOICE_ID = re.compile(r'^[A-Za-z0-9_.-]{1,64}$')
+_REASONS = {200: 'OK', 201: 'Created', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found',
+            405: 'Method Not Allowed', 413: 'Payload Too Large', 503: 'Service Unavailable'}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def pcm16(audio: np.ndarray) -> bytes:
+    """float audio in [-1, 1] -> little-endian signed 16-bit PCM."""
+    return (np.clip(audio, -1.0, 1.0) * 32767.0).astype('<i2').tobytes()
+
+
+def wav_header(sample_rate: int) -> bytes:
+    """Header of a mono 16-bit WAV stream whose length is not known in advance."""
+    open_length = 0xFFFFFFFF
+    return (b'RIFF' + struct.pack('<I', open_length) + b'WAVE'
+            + b'fmt ' + struct.pack('<IHHIIHH', 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+            + b'data' + struct.pack('<I', open_length))
+
+
+class _OpusStream:
+    """Encodes float audio into 20 ms Opus packets (optional opuslib dependency)."""
+
+    def __init__(self, sample_rate: int):
+        import opuslib
+        self.sample_rate = sample_rate
+        self.encoder = opuslib.Encoder(OPUS_RATE, 1, opuslib.APPLICATION_VOIP)
+        self.pending = np.zeros(0, dtype=np.float32)
+
+    def encode(self, audio: np.ndarray, final: bool = False):
+        if self.sample_rate != OPUS_RATE:
+            from voice.audio_io import resample
+            audio = resample(audio, self.sample_rate, OPUS_RATE)
+        samples = np.concatenate([self.pending, audio.astype(np.float32)])
+        if final and len(samples) % OPUS_FRAME:
+            samples = np.concatenate([samples, np.zeros(OPUS_FRAME - len(samples) % OPUS_FRAME, np.float32)])
+        n = len(samples) // OPUS_FRAME * OPUS_FRAME
+        self.pending = samples[n:]
+        return [self.encoder.encode(pcm16(samples[i:i + OPUS_FRAME]), OPUS_FRAME) for i in range(0, n, OPUS_FRAME)]
+
+
+# ---- WebSocket framing (RFC 6455, unfragmented messages) ------------------------
+
+async def ws_send(writer: asyncio.StreamWriter, payload, mask: bool = False):
+    opcode = 0x1 if isinstance(payload, str) else 0x2
+    data = payload.encode('utf-8') if isinstance(payload, str) else bytes(payload)
+    await _ws_send_frame(writer, opcode, data, mask)
+
+
+async def _ws_send_frame(writer, opcode: int, data: bytes, mask: bool):
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    if len(data) < 126:
+        header.append(mask_bit | len(data))
+    elif len(data) < 1 << 16:
+        header += bytes([mask_bit | 126]) + struct.pack('>H', len(data))
+    else:
+        header += bytes([mask_bit | 127]) + struct.pack('>Q', len(data))
+    if mask:
+        key = os.urandom(4)
+        header += key
+        data = _ws_mask(data, key)
+    writer.write(bytes(header) + data)
+    await writer.drain()
+
+
+def _ws_mask(data: bytes, key: bytes) -> bytes:
+    mask = np.frombuffer((key * (len(data) // 4 + 1))[:len(data)], dtype=np.uint8)
+    return (np.frombuffer(data, dtype=np.uint8) ^ mask).tobytes()
+
+
+async def ws_recv(reader: asyncio.StreamReader, writer: asyncio.StreamWriter = None,
+                  max_bytes: int = MAX_JSON_BYTES):
+    """Next text (str) or binary (bytes) message; None once the peer closes."""
+    while True:
+        head = await reader.readexactly(2)
+        opcode, length = head[0] & 0x0F, head[1] & 0x7F
+        if length == 126:
+            length = struct.unpack('>H', await reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack('>Q', await reader.readexactly(8))[0]
+        if length > max_bytes:
+            raise HTTPError(413, "WebSocket message too large")
+        key = await reader.readexactly(4) if head[1] & 0x80 else None
+        data = await reader.readexactly(length)
+        if key:
+            data = _ws_mask(data, key)
+        if opcode == 0x8:
+            return None
+        if opcode == 0x9 and writer is not None:
+            await _ws_send_frame(writer, 0xA, data, mask=False)
+            continue
+        if opcode == 0x1:
+            return data.decode('utf-8')
+        if opcode == 0x2:
+            return data
+
+
+# ---- server --------------------------------------------------------------------
+
+class TTSServer:
+    """
+    asyncio HTTP/WebSocket front end for a TTSWorkerPool.
+
+    Args:
+        pool: services.tts_pool.TTSWorkerPool around a loaded OpenVoiceTTS
+        voices_dir: where uploaded reference clips are kept (voices survive restarts)
+        max_streams: streams synthesizing at once
+        max_queued: streams allowed to wait for a slot before requests are refused
+        lookahead: sentences a stream may have queued ahead of what was sent
+    """
+
+    def __init__(self, pool, voices_dir: str, host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+                 max_streams: int = 4, max_queued: int = 16, lookahead: int = 2):
+        self.pool = pool
+        self.tts = pool.tts
+        self.voices_dir = voices_dir
+        self.host = host
+        self.port = port
+        self.max_queued = max_queued
+        self.lookahead = max(1, lookahead)
+        self._slots = asyncio.Semaphore(max_streams)
+        self._active = 0
+        self._waiting = 0
+        self._sessions = itertools.count(1)
+        self._server = None
+        os.makedirs(voices_dir, exist_ok=True)
+        self.voices = {os.path.splitext(name)[0]: os.path.join(voices_dir, name)
+                       for name in os.listdir(voices_dir) if name.endswith('.wav')}
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"[TTSServer] Listening on http://{self.host}:{self.port}")
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    # ---- HTTP plumbing
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode('latin-1').strip()
+            if not request_line:
+                return
+            method, target, _ = request_line.split(' ', 2)
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1')
+                if line in ('\r\n', '\n', ''):
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            path = target.split('?', 1)[0]
+            if headers.get('upgrade', '').lower() == 'websocket' and path == '/v1/stream':
+                await self._websocket(reader, writer, headers)
+            else:
+                await self._route(method, path, headers, reader, writer)
+        except HTTPError as e:
+            await self._respond(writer, e.status, {'error': str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            logger.error(f"[TTSServer] Request failed: {e}")
+            try:
+                await self._respond(writer, 500, {'error': str(e)})
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+
+    async def _body(self, reader, headers, limit: int) -> bytes:
+        length = int(headers.get('content-length', '0') or 0)
+        if length > limit:
+            raise HTTPError(413, f"body larger than {limit} bytes")
+        return await reader.readexactly(length) if length else b''
+
+    async def _respond(self, writer, status: int, body=None, headers: dict = None):
+        data = json.dumps(body).encode('utf-8') if body is not None else b''
+        lines = [f'HTTP/1.1 {status} {_REASONS.get(status, "Error")}', 'Connection: close',
+                 f'Content-Length: {len(data)}']
+        if body is not None:
+            lines.append('Content-Type: application/json')
+        lines += [f'{k}: {v}' for k, v in (headers or {}).items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + data)
+        await writer.drain()
+
+    async def _route(self, method, path, headers, reader, writer):
+        if path == '/health':
+            await self._respond(writer, 200, {'status': 'ok', 'sampling_rate': self.tts.sampling_rate,
+                                              'active': self._active, 'queued': self._waiting,
+                                              'pool': self.pool.stats()})
+        elif path == '/v1/voices' and method == 'GET':
+            await self._respond(writer, 200, {'voices': sorted(self.voices)})
+        elif path.startswith('/v1/voices/'):
+            voice_id = path[len('/v1/voices/'):]
+            if not _VOICE_ID.match(voice_id):
+                raise HTTPError(400, "voice ids may only use letters, digits, '_', '-' and '.'")
+            if method == 'PUT':
+                await self._put_voice(voice_id, await self._body(reader, headers, MAX_UPLOAD_BYTES))
+                await self._respond(writer, 201, {'voice': voice_id})
+            elif method == 'DELETE':
+                await self._delete_voice(voice_id)
+                await self._respond(writer, 204)
+            else:
+                raise HTTPError(405, "use PUT or DELETE")
+        elif path == '/v1/tts':
+            if method != 'POST':
+                raise HTTPError(405, "use POST")
+            params = self._params(await self._body(reader, headers, MAX_JSON_BYTES))
+            await self._http_stream(params, writer)
+        else:
+            raise HTTPError(404, f"no such endpoint: {path}")
+
+    # ---- voices
+
+    async def _put_voice(self, voice_id: str, data: bytes):
+        if not data:
+            raise HTTPError(400, "empty upload")
+        loop = asyncio.get_running_loop()
+        path = os.path.join(self.voices_dir, f'{voice_id}.wav')
+        await loop.run_in_executor(None, self._store_voice, path, data)
+        self.voices[voice_id] = path
+
+    async def _delete_voice(self, voice_id: str):
+        path = self.voices.pop(voice_id, None)
+        if path is None:
+            raise HTTPError(404, f"unknown voice: {voice_id}")
+        # forget_target_se waits for the model lock, so keep it off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, self._remove_voice, path)
+
+    def _remove_voice(self, path: str):
+        self.tts.forget_target_se(path)
+        os.remove(path)
+
+    def _store_voice(self, path: str, data: bytes):
+        import soundfile
+        from voice.audio_io import load_audio
+        sr = self.tts.sampling_rate
+        try:
+            audio, _ = load_audio(data, sr=sr)
+        except Exception as e:
+            raise HTTPError(400, f"could not decode audio: {e}")
+        # a re-uploaded voice gets a new mtime, so its old embedding would never be used again
+        self.tts.forget_target_se(path)
+        soundfile.write(path, audio, sr)
+        # extract now so the first request with this voice does not pay for it
+        self.tts.set_target_se(path, self.tts.extract_target_se(audio))
+
+    # ---- synthesis streams
+
+    def _params(self, data) -> dict:
+        try:
+            params = json.loads(data or b'{}')
+        except ValueError:
+            raise HTTPError(400, "body must be JSON")
+        if not isinstance(params, dict) or not str(params.get('text', '')).strip():
+            raise HTTPError(400, "'text' is required")
+        fmt = params.get('format', 'pcm')
+        if fmt not in FORMATS:
+            raise HTTPError(400, f"format must be one of {FORMATS}")
+        if fmt == 'opus':
+            try:
+                import opuslib  # noqa: F401
+            except ImportError:
+                raise HTTPError(400, "format 'opus' needs the opuslib package")
+        voice = params.get('voice')
+        if voice is not None and voice not in self.voices:
+            raise HTTPError(404, f"unknown voice: {voice}")
+        # checked here so a bad request gets a 400 before any audio headers go out
+        base = self.tts.base_speaker_tts
+        speaker = str(params.get('speaker', 'default'))
+        if speaker not in base.hps.speakers:
+            raise HTTPError(400, f"unknown speaker: {speaker}")
+        language = str(params.get('language', 'English'))
+        if language.lower() not in base.language_marks:
+            raise HTTPError(400, f"language {language} is not supported")
+        try:
+            speed = float(params.get('speed', 1.0))
+        except (TypeError, ValueError):
+            raise HTTPError(400, "'speed' must be a number")
+        return {'text': str(params['text']), 'format': fmt, 'reference_audio': self.voices.get(voice),
+                'speaker': speaker, 'language': language, 'speed': speed}
+
+    async def _acquire(self):
+        if self._waiting >= self.max_queued:
+            raise HTTPError(503, "too many queued requests")
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        self._active += 1
+
+    def _release(self):
+        self._active -= 1
+        self._slots.release()
+
+    async def _synthesize(self, params: dict, send):
+        """Synthesize sentence by sentence, awaiting send(bytes) for each piece of encoded audio."""
+        session = ('stream', next(self._sessions))
+        sr = self.tts.sampling_rate
+        fmt = params['format']
+        opus = _OpusStream(sr) if fmt == 'opus' else None
+        sentences = iter(self.pool.split_text(params['text'], params['language']))
+        pending = collections.deque()
+        exhausted = False
+        count = 0
+        try:
+            if fmt == 'wav':
+                await send(wav_header(sr))
+            while True:
+                while len(pending) < self.lookahead:
+                    text = next(sentences, None)
+                    if text is None:
+                        exhausted = True
+                        break
+                    pending.append(asyncio.wrap_future(self.pool.submit(
+                        session, text, params['reference_audio'], params['speaker'],
+                        params['language'], params['speed'])))
+                if not pending:
+                    break
+                audio, sr = await pending.popleft()
+                count += 1
+                if opus is not None:
+                    for packet in opus.encode(audio, final=exhausted and not pending):
+                        await send(packet)
+                else:
+                    data = pcm16(audio)
+                    for i in range(0, len(data), CHUNK_BYTES):
+                        await send(data[i:i + CHUNK_BYTES])
+        finally:
+            self.pool.cancel_session(session)
+            for future in pending:
+                future.cancel()
+        return count
+
+    async def _http_stream(self, params: dict, writer):
+        await self._acquire()
+        try:
+            content_type = {'pcm': 'audio/L16', 'wav': 'audio/wav', 'opus': 'application/octet-stream'}
+            head = ['HTTP/1.1 200 OK', 'Connection: close', 'Transfer-Encoding: chunked',
+                    f'Content-Type: {content_type[params["format"]]}',
+                    f'X-Sample-Rate: {OPUS_RATE if params["format"] == "opus" else self.tts.sampling_rate}']
+            writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+
+            async def send(data: bytes):
+                if params['format'] == 'opus':
+                    data = struct.pack('>H', len(data)) + data
+                writer.write(f'{len(data):X}\r\n'.encode('latin-1') + data + b'\r\n')
+                await writer.drain()
+
+            try:
+                await self._synthesize(params, send)
+            except (ConnectionError, asyncio.CancelledError):
+                raise
+            except Exception as e:
+                # headers are out: end the connection without the final chunk so the client sees the failure
+                logger.error(f"[TTSServer] Stream failed: {e}")
+                return
+            writer.write(b'0\r\n\r\n')
+            await writer.drain()
+        finally:
+            self._release()
+
+    async def _websocket(self, reader, writer, headers):
+        key = headers.get('sec-websocket-key')
+        if not key:
+            raise HTTPError(400, "missing Sec-WebSocket-Key")
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode('latin-1')).digest()).decode('latin-1')
+        writer.write(('HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                      f'Sec-WebSocket-Accept: {accept}\r\n\r\n').encode('latin-1'))
+        await writer.drain()
+        while True:
+            message = await ws_recv(reader, writer)
+            if message is None:
+                await _ws_send_frame(writer, 0x8, b'', mask=False)
+                return
+            try:
+                params = self._params(message if isinstance(message, str) else message.decode('utf-8'))
+                await self._acquire()
+            except HTTPError as e:
+                await ws_send(writer, json.dumps({'event': 'error', 'status': e.status, 'error': str(e)}))
+                continue
+            try:
+                rate = OPUS_RATE if params['format'] == 'opus' else self.tts.sampling_rate
+                await ws_send(writer, json.dumps({'event': 'start', 'sample_rate': rate, 'format': params['format']}))
+                count = await self._synthesize(params, lambda data: ws_send(writer, data))
+                await ws_send(writer, json.dumps({'event': 'done', 'sentences': count}))
+            except HTTPError as e:
+                await ws_send(writer, json.dumps({'event': 'error', 'status': e.status, 'error': str(e)}))
+            except (ConnectionError, asyncio.CancelledError):
+                raise
+            except Exception as e:
+                # the socket is upgraded, so report in-band rather than with an HTTP 500
+                logger.exception("[TTSServer] WebSocket synthesis failed")
+                await ws_send(writer, json.dumps({'event': 'error', 'status': 500, 'error': str(e)}))
+            finally:
+                self._release()
+
+
+# ---- client --------------------------------------------------------------------
+
+class LocalClient:
+    """Minimal asyncio client for a TTSServer (HTTP requests and the WebSocket stream)."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = DEFAULT_PORT):
+        self.host = host
+        self.port = port
+
+    async def request(self, method: str, path: str, body: bytes = b'', headers: dict = None):
+        """Returns (status, headers, body) with chunked bodies reassembled."""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            lines = [f'{method} {path} HTTP/1.1', f'Host: {self.host}', f'Content-Length: {len(body)}']
+            lines += [f'{k}: {v}' for k, v in (headers or {}).items()]
+            writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+            await writer.drain()
+            status, response_headers = await self._read_head(reader)
+            chunks = [chunk async for chunk in self._read_body(reader, response_headers)]
+            return status, response_headers, b''.join(chunks)
+        finally:
+            writer.close()
+
+    async def health(self) -> dict:
+        return json.loads((await self.request('GET', '/health'))[2])
+
+    async def put_voice(self, voice_id: str, audio_file: str) -> int:
+        with open(audio_file, 'rb') as f:
+            return (await self.request('PUT', f'/v1/voices/{voice_id}', f.read()))[0]
+
+    async def stream(self, text: str, **params):
+        """Async iterator over the audio chunks of POST /v1/tts as they arrive."""
+        body = json.dumps(dict(params, text=text)).encode('utf-8')
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write((f'POST /v1/tts HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n'
+                          f'Content-Length: {len(body)}\r\n\r\n').encode('latin-1') + body)
+            await writer.drain()
+            status, headers = await self._read_head(reader)
+            if status != 200:
+                body = b''.join([c async for c in self._read_body(reader, headers)])
+                raise HTTPError(status, json.loads(body or b'{}').get('error', ''))
+            async for chunk in self._read_body(reader, headers):
+                yield chunk
+        finally:
+            writer.close()
+
+    async def websocket(self):
+        """Open /v1/stream. Returns (reader, writer); use ws_send(writer, ..., mask=True) and ws_recv(reader)."""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        key = base64.b64encode(os.urandom(16)).decode('latin-1')
+        writer.write((f'GET /v1/stream HTTP/1.1\r\nHost: {self.host}\r\nUpgrade: websocket\r\n'
+                      f'Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n')
+                     .encode('latin-1'))
+        await writer.drain()
+        status, _ = await self._read_head(reader)
+        if status != 101:
+            writer.close()
+            raise HTTPError(status, "WebSocket upgrade refused")
+        return reader, writer
+
+    @staticmethod
+    async def _read_head(reader):
+        status = int((await reader.readline()).decode('latin-1').split(' ', 2)[1])
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1')
+            if line in ('\r\n', '\n', ''):
+                return status, headers
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+    @staticmethod
+    async def _read_body(reader, headers):
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size = int((await reader.readline()).split(b';')[0].strip() or b'0', 16)
+                if size == 0:
+                    await reader.readline()
+                    return
+                yield await reader.readexactly(size)
+                await reader.readline()
+        else:
+            length = int(headers.get('content-length', '0') or 0)
+            if length:
+                yield await reader.readexactly(length)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless local OpenVoice TTS server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--checkpoints', help='OpenVoice checkpoints folder (default: ./checkpoints)')
+    parser.add_argument('--device', help="torch device (default: cuda if available)")
+    parser.add_argument('--precision', help='vocoder/flow precision: fp32, bf16, fp16 or auto')
+    parser.add_argument('--voices-dir', default=os.path.join(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__))), '.cache', 'tts_server_voices'))
+    parser.add_argument('--workers', type=int, default=1, help='synthesis threads')
+    parser.add_argument('--max-batch', type=int, default=8)
+    parser.add_argument('--max-streams', type=int, default=4)
+    parser.add_argument('--max-queued', type=int, default=16)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    from voice.openvoice_tts import OpenVoiceTTS
+    from services.tts_pool import TTSWorkerPool
+
+    tts = OpenVoiceTTS(device=args.device, checkpoints_dir=args.checkpoints, precision=args.precision)
+    pool = TTSWorkerPool(tts, workers=args.workers, max_batch=args.max_batch)
+    server = TTSServer(pool, args.voices_dir, host=args.host, port=args.port,
+                       max_streams=args.max_streams, max_queued=args.max_queued)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,9 @@ from typing import Optional, Dict, Any, Callable
 from PyQt5.QtCore import QObject, pyqtSignal, QThread, QTimer
 from voice.tts_engine import TTSEngine
 from voice.openvoice_tts import OpenVoiceTTS
+from voice import metrics
+from services.speech_worker import SpeechWorker
+from services.voice_job_runner import VoiceJobRunner, STAGES
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +25,13 @@ class VoiceEngineService(QObject):
     processing_started = pyqtSignal()
     processing_finished = pyqtSignal(bool)  # success
     processing_progress = pyqtSignal(str)   # status message
+    processing_stage = pyqtSignal(str, float)  # stage name, overall fraction (0..1)
     voice_ready = pyqtSignal()
+    speaking_started = pyqtSignal(dict)         # timing data
+    speaking_progress = pyqtSignal(dict)        # timing data + event/index/total
+    speaking_finished = pyqtSignal(bool, dict)  # success, timing data
+    lip_sync_ready = pyqtSignal(dict)           # lip-sync envelope for the chunk about to play
+    speech_metrics = pyqtSignal(dict)           # per-request stage timings, RTF, time to first audio
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -30,6 +39,27 @@ class VoiceEngineService(QObject):
         self._current_voice_config = None
         self._is_processing = False
         
+        # Speech runs on a dedicated worker thread; typing callbacks come back via queued signals
+        self._typing_callbacks = {}
+        self._speech_worker = SpeechWorker(self._engine)
+        self._speech_worker.typing_update.connect(self._on_typing_update)
+        self._speech_worker.speaking_started.connect(self._on_speaking_started)
+        self._speech_worker.speaking_progress.connect(self._on_speaking_progress)
+        self._speech_worker.speaking_finished.connect(self._on_speaking_finished)
+        self._speech_worker.lip_sync.connect(lambda request_id, payload: self.lip_sync_ready.emit(payload))
+        self._speech_worker.metrics_ready.connect(self._on_speech_metrics)
+        self._speech_worker.start()
+        # Local /metrics endpoint, only when ELPIS_METRICS_PORT is set
+        metrics.start_metrics_server()
+        
+        # Voice preparation (decode, VAD, embedding, verification) runs on a thread pool
+        self._voice_job_id = None
+        self._job_runner = VoiceJobRunner(lambda: self._engine.openvoice, self)
+        self._job_runner.stage.connect(self._on_voice_job_stage)
+        self._job_runner.finished.connect(self._on_voice_job_finished)
+        self._job_runner.failed.connect(self._on_voice_job_failed)
+        self._job_runner.cancelled.connect(self._on_voice_job_cancelled)
+        
         # Use absolute path for engines directory
         project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self._engines_dir = os.path.join(project_root, "saved_engines")
@@ -41,6 +71,9 @@ class VoiceEngineService(QObject):
         """
         Select and process a voice sample for cloning.
         
+        Processing runs in the background; progress is reported through
+        processing_stage/processing_progress and the result through processing_finished.
+        
         Args:
             audio_path: Path to reference audio file (mp3/wav)
             voice_name: Optional name for the voice (for saving)
@@ -48,85 +81,164 @@ class VoiceEngineService(QObject):
         Returns:
             bool: True if voice selection started successfully
         """
-        if self._is_processing:
-            logger.warning("[VoiceEngine] Already processing, please wait")
-            return False
-            
         if not os.path.exists(audio_path):
             logger.error(f"[VoiceEngine] Audio file not found: {audio_path}")
             return False
         
+        if self._is_processing:
+            # Same content again just joins the running job
+            if self._job_runner.is_running(audio_path):
+                logger.info("[VoiceEngine] Voice sample already being processed")
+                return True
+            logger.warning("[VoiceEngine] Already processing, please wait")
+            return False
+        
         self._is_processing = True
         self.processing_started.emit()
         
-        # Process in background thread
-        self._process_voice_sample(audio_path, voice_name)
+        try:
+            self._voice_job_id, _ = self._job_runner.submit(audio_path, voice_name)
+        except Exception as e:
+            logger.error(f"[VoiceEngine] Failed to start voice processing: {e}")
+            self._is_processing = False
+            self.processing_finished.emit(False)
+            return False
         return True
     
-    def _process_voice_sample(self, audio_path: str, voice_name: str = None):
-        """Process voice sample in background."""
+    def cancel_voice_processing(self) -> bool:
+        """Cancel the running voice preparation job, if any."""
+        if not self._is_processing:
+            return False
+        return self._job_runner.cancel(self._voice_job_id)
+    
+    _STAGE_MESSAGES = {
+        'decode': "Decoding voice sample...",
+        'vad': "Detecting speech...",
+        'embedding': "Analyzing voice sample...",
+        'verification': "Testing voice synthesis...",
+    }
+    
+    def _on_voice_job_stage(self, job_id: int, stage: str, fraction: float):
+        self.processing_stage.emit(stage, fraction)
+        # Status text once per stage, when it begins
+        if fraction == STAGES.get(stage, (None, None))[0]:
+            self.processing_progress.emit(self._STAGE_MESSAGES.get(stage, stage))
+    
+    def _on_voice_job_finished(self, job_id: int, result: dict):
         try:
-            self.processing_progress.emit("Analyzing voice sample...")
-            
-            # Set the reference audio in the TTS engine
+            audio_path = result['reference_audio']
             self._engine.set_voice_reference(audio_path)
             
-            # Test synthesis to ensure everything works
-            self.processing_progress.emit("Testing voice synthesis...")
-            test_text = "Hello, this is a voice test."
-            
-            if self._engine._is_openvoice_available():
-                # Test with OpenVoice
-                audio, sr = self._engine.openvoice.synthesize_audio(
-                    test_text,
-                    reference_audio=audio_path,
-                    speaker='default',
-                    language='English',
-                    speed=1.0
-                )
-                self.processing_progress.emit("Voice processing complete!")
-            else:
-                # Fallback test
-                self.processing_progress.emit("Using fallback voice engine...")
-            
             # Store current configuration
             self._current_voice_config = {
                 'reference_audio': audio_path,
-                'voice_name': voice_name or os.path.basename(audio_path),
+                'voice_name': result.get('voice_name') or os.path.basename(audio_path),
                 'timestamp': int(time.time()),
-                'engine_type': 'openvoice' if self._engine._is_openvoice_available() else 'pyttsx3'
+                'engine_type': result.get('engine_type', 'pyttsx3')
             }
+            timings = ", ".join(f"{k} {v:.2f}s" for k, v in result.get('timings', {}).items())
+            logger.info(f"[VoiceEngine] Voice ready ({timings or 'cached'})")
+            self.processing_progress.emit("Voice processing complete!")
             
             self._is_processing = False
             self.processing_finished.emit(True)
             self.voice_ready.emit()
-            
         except Exception as e:
             logger.error(f"[VoiceEngine] Voice processing failed: {e}")
             self._is_processing = False
             self.processing_finished.emit(False)
     
+    def _on_voice_job_failed(self, job_id: int, message: str):
+        logger.error(f"[VoiceEngine] Voice processing failed: {message}")
+        self.processing_progress.emit(f"Voice processing failed: {message}")
+        self._is_processing = False
+        self.processing_finished.emit(False)
+    
+    def _on_voice_job_cancelled(self, job_id: int):
+        logger.info("[VoiceEngine] Voice processing cancelled")
+        self.processing_progress.emit("Voice processing cancelled")
+        self._is_processing = False
+        self.processing_finished.emit(False)
+    
     def speak_with_voice(self, text: str, typing_callback: Optional[Callable] = None) -> bool:
         """
-        Speak text using the configured voice.
+        Queue text to be spoken with the configured voice.
+        
+        Synthesis and playback run on the speech worker thread. The typing callback
+        is always invoked on the GUI thread.
         
         Args:
             text: Text to speak
             typing_callback: Optional callback for typing animation
             
         Returns:
-            bool: True if speaking started successfully
+            bool: True if the request was queued successfully
         """
         if not text.strip():
             return False
             
         try:
-            self._engine.speak(text, typing_callback)
+            request_id = self._speech_worker.enqueue(text)
+            if typing_callback:
+                self._typing_callbacks[request_id] = typing_callback
             return True
         except Exception as e:
-            logger.error(f"[VoiceEngine] Speech synthesis failed: {e}")
+            logger.error(f"[VoiceEngine] Failed to queue speech: {e}")
             return False
     
+    def cancel_pending_speech(self) -> int:
+        """Drop queued replies that have not started speaking yet."""
+        return self._speech_worker.clear_pending()
+    
+    def shutdown(self):
+        """Stop background workers. Call when the app is closing."""
+        try:
+            self._job_runner.cancel()
+            self._job_runner.wait(5000)
+        except Exception as e:
+            logger.warning(f"[VoiceEngine] Failed to stop voice jobs: {e}")
+        try:
+            self._speech_worker.clear_pending()
+            self._speech_worker.stop()
+        except Exception as e:
+            logger.warning(f"[VoiceEngine] Failed to stop speech worker: {e}")
+        self._engine.close()
+        metrics.stop_metrics_server()
+    
+    def _on_typing_update(self, request_id: int, text: str, is_complete: bool):
+        callback = self._typing_callbacks.get(request_id)
+        if callback:
+            try:
+                callback(text, is_complete)
+            except Exception as e:
+                logger.warning(f"[VoiceEngine] Typing callback failed: {e}")
+    
+    def _on_speaking_started(self, request_id: int, timing: dict):
+        timing['request_id'] = request_id
+        logger.debug(f"[VoiceEngine] Speech {request_id} started after {timing['queue_wait']:.3f}s in queue")
+        self.speaking_started.emit(timing)
+    
+    def _on_speaking_progress(self, request_id: int, timing: dict):
+        timing['request_id'] = request_id
+        self.speaking_progress.emit(timing)
+    
+    def _on_speech_metrics(self, request_id: int, record: dict):
+        stages = ", ".join(f"{name} {record['stages'][name]:.3f}s"
+                           for name in metrics.STAGES if name in record['stages'])
+        rtf = record.get('rtf')
+        logger.debug(f"[VoiceEngine] Speech {request_id} stages: {stages or 'none'}"
+                     + (f" (RTF {rtf:.2f})" if rtf is not None else ""))
+        self.speech_metrics.emit(record)
+    
+    def _on_speaking_finished(self, request_id: int, success: bool, timing: dict):
+        timing['request_id'] = request_id
+        self._typing_callbacks.pop(request_id, None)
+        ttfa = timing.get('time_to_first_audio')
+        if ttfa is not None:
+            logger.info(f"[VoiceEngine] Speech {request_id} done in {timing['duration']:.2f}s "
+                        f"(first audio after {ttfa:.2f}s)")
+        self.speaking_finished.emit(success, timing)
+    
     def save_current_engine(self, engine_name: str) -> bool:
         """
         Save the current voice engine configuration and models.
@@ -266,15 +378,12 @@ class TTSSvc(VoiceEngineService):
         # Map new signals to old ones for compatibility
         self.processing_started.connect(self.started.emit)
         self.processing_finished.connect(lambda success: self.finished.emit())
+        self.speaking_started.connect(lambda timing: self.started.emit())
+        self.speaking_finished.connect(lambda success, timing: self.finished.emit())
     
     def speak(self, text: str, typing_callback=None):
-        """Legacy speak method for backward compatibility."""
-        self.started.emit()
-        try:
-            success = self.speak_with_voice(text, typing_callback)
-        finally:
-            self.finished.emit()
-        return success
+        """Legacy speak method for backward compatibility (started/finished follow the worker)."""
+        return self.speak_with_voice(text, typing_callback)
     
     def set_volume(self, v: float):
         try:
@@ -0,0 +1,343 @@
+"""
+Background job runner for voice-sample preparation.
+
+A job hashes and decodes the reference clip, trims silence with a simple energy VAD,
+extracts the tone color embedding and runs a short verification synthesis. Progress is
+reported per stage from the real work, jobs can be cancelled between stages, jobs for
+the same file are coalesced instead of being run twice, and a file whose content was
+already prepared reuses the earlier result.
+"""
+import os
+import time
+import hashlib
+import logging
+import threading
+import itertools
+from typing import Optional, Dict, Any
+
+import numpy as np
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+# Stage name -> (start, end) fraction of the overall job
+STAGES = {
+    'decode': (0.0, 0.2),
+    'vad': (0.2, 0.35),
+    'embedding': (0.35, 0.7),
+    'verification': (0.7, 1.0),
+}
+
+DEFAULT_SAMPLE_RATE = 22050
+MIN_VOICED_SECONDS = 1.0
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested."""
+
+
+def file_key(path: str) -> tuple:
+    """Cheap identity of a file (path, size, mtime) for coalescing on the GUI thread."""
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """Hash a file in chunks so large samples are never read into memory at once."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def energy_vad(audio: np.ndarray, sr: int, frame_ms: float = 30.0, threshold_db: float = -35.0,
+               pad_frames: int = 3) -> np.ndarray:
+    """
+    Drop silent frames using short-time energy relative to the loudest part of the clip.
+
+    Returns the concatenated voiced audio (the input unchanged if nothing is voiced).
+    """
+    frame = max(1, int(sr * frame_ms / 1000.0))
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return audio
+    frames = audio[:n_frames * frame].reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1)) + 1e-10
+    db = 20.0 * np.log10(rms / rms.max())
+    voiced = db > threshold_db
+    if pad_frames and voiced.any():
+        # keep a few frames around speech so word onsets/offsets are not clipped
+        kernel = np.ones(2 * pad_frames + 1)
+        voiced = np.convolve(voiced.astype(np.float64), kernel, mode='same') > 0
+    if not voiced.any():
+        return audio
+    return frames[voiced].reshape(-1)
+
+
+class VoiceJobSignals(QObject):
+    # job_id, stage name, overall fraction (0..1)
+    stage = pyqtSignal(int, str, float)
+    # job_id, result dict
+    finished = pyqtSignal(int, dict)
+    # job_id, error message
+    failed = pyqtSignal(int, str)
+    # job_id
+    cancelled = pyqtSignal(int)
+
+
+class VoiceJob(QRunnable):
+    """
+    One voice preparation job; runs on the runner's QThreadPool.
+
+    openvoice is the engine or a callable returning it, resolved when the job runs.
+    file_hash is computed in the decode stage when not given; lookup(file_hash) may
+    return an earlier (result, target_se) for the same content, which ends the job early.
+    """
+
+    def __init__(self, job_id: int, audio_path: str, file_hash: str = None, openvoice=None,
+                 voice_name: str = None, verify_text: str = "Hello, this is a voice test.",
+                 lookup=None):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.job_id = job_id
+        self.audio_path = audio_path
+        self.file_hash = file_hash
+        self.voice_name = voice_name or os.path.basename(audio_path)
+        self.openvoice = openvoice
+        self.verify_text = verify_text
+        self.lookup = lookup
+        self.file_key = None
+        self.signals = VoiceJobSignals()
+        self._cancel = threading.Event()
+        self.timings = {}
+        self.target_se = None
+
+    def cancel(self):
+        self._cancel.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def _enter(self, stage: str):
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.signals.stage.emit(self.job_id, stage, STAGES[stage][0])
+        return time.time()
+
+    def _leave(self, stage: str, started: float):
+        self.timings[stage] = time.time() - started
+        self.signals.stage.emit(self.job_id, stage, STAGES[stage][1])
+
+    def run(self):
+        try:
+            result = self._run_stages()
+        except JobCancelled:
+            logger.info(f"[VoiceJob] Job {self.job_id} cancelled")
+            self.signals.cancelled.emit(self.job_id)
+        except Exception as e:
+            logger.error(f"[VoiceJob] Job {self.job_id} failed: {e}")
+            self.signals.failed.emit(self.job_id, str(e))
+        else:
+            self.signals.finished.emit(self.job_id, result)
+
+    def _run_stages(self) -> Dict[str, Any]:
+        openvoice = self.openvoice() if callable(self.openvoice) else self.openvoice
+        sr = openvoice.sampling_rate if openvoice is not None else DEFAULT_SAMPLE_RATE
+
+        t = self._enter('decode')
+        if self.file_hash is None:
+            self.file_hash = file_sha256(self.audio_path)
+        previous = self.lookup(self.file_hash) if self.lookup is not None else None
+        if previous is not None:
+            result, target_se = previous
+            if target_se is not None and openvoice is not None:
+                openvoice.set_target_se(self.audio_path, target_se)
+            self.target_se = target_se
+            self._leave('decode', t)
+            return dict(result, reference_audio=self.audio_path, voice_name=self.voice_name)
+        from voice.audio_io import load_audio
+        audio, sr = load_audio(self.audio_path, sr=sr)
+        if audio.size == 0:
+            raise RuntimeError("Reference audio is empty")
+        self._leave('decode', t)
+
+        t = self._enter('vad')
+        voiced = energy_vad(audio, sr)
+        voiced_seconds = len(voiced) / float(sr)
+        if voiced_seconds < MIN_VOICED_SECONDS:
+            raise RuntimeError(f"Only {voiced_seconds:.1f}s of speech found, need at least {MIN_VOICED_SECONDS:.0f}s")
+        self._leave('vad', t)
+
+        t = self._enter('embedding')
+        target_se = None
+        if openvoice is not None:
+            target_se = openvoice.extract_target_se(voiced)
+            openvoice.set_target_se(self.audio_path, target_se)
+        self.target_se = target_se
+        self._leave('embedding', t)
+
+        # OpenVoiceTTS serializes model calls internally, so this waits for (rather than
+        # runs alongside) a sentence the speech worker is synthesizing
+
+        t = self._enter('verification')
+        if openvoice is not None:
+            test_audio, _ = openvoice.synthesize_audio(
+                self.verify_text,
+                reference_audio=self.audio_path,
+                speaker='default',
+                language='English',
+                speed=1.0
+            )
+            test_audio = np.asarray(test_audio)
+            if test_audio.size == 0 or not np.isfinite(test_audio).all():
+                raise RuntimeError("Verification synthesis produced invalid audio")
+        self._leave('verification', t)
+
+        return {
+            'reference_audio': self.audio_path,
+            'voice_name': self.voice_name,
+            'file_hash': self.file_hash,
+            'duration': len(audio) / float(sr),
+            'voiced_duration': voiced_seconds,
+            'engine_type': 'openvoice' if openvoice is not None else 'pyttsx3',
+            'timings': dict(self.timings),
+        }
+
+
+class VoiceJobRunner(QObject):
+    """
+    Runs voice preparation jobs off the GUI thread.
+
+    Submitting a file (same path, size and mtime) that is already being processed joins
+    the running job, and one that was already prepared returns the previous result
+    immediately. Content hashing happens inside the job, off the GUI thread, and a
+    different file with already prepared content reuses that result there.
+
+    openvoice may be the engine itself or a callable returning the current one, so a
+    reloaded engine is picked up by the next job.
+    """
+
+    stage = pyqtSignal(int, str, float)   # job_id, stage, overall fraction
+    finished = pyqtSignal(int, dict)      # job_id, result
+    failed = pyqtSignal(int, str)         # job_id, error message
+    cancelled = pyqtSignal(int)           # job_id
+
+    def __init__(self, openvoice=None, parent=None):
+        super().__init__(parent)
+        self._openvoice = openvoice
+        self._pool = QThreadPool(self)
+        # Models are shared, so prepare one voice at a time
+        self._pool.setMaxThreadCount(1)
+        self._ids = itertools.count(1)
+        self._jobs = {}          # job_id -> VoiceJob
+        self._by_key = {}        # file key -> running job_id
+        self._hash_by_key = {}   # file key -> file hash of a finished job
+        self._results = {}       # file hash -> result dict
+        self._embeddings = {}    # file hash -> tone color embedding
+
+    def set_openvoice(self, openvoice):
+        self._openvoice = openvoice
+
+    def _current_openvoice(self):
+        return self._openvoice() if callable(self._openvoice) else self._openvoice
+
+    def submit(self, audio_path: str, voice_name: str = None):
+        """
+        Queue a preparation job.
+
+        Returns:
+            tuple(job_id, status) where status is 'started', 'coalesced' (joined a running
+            job for the same file) or 'cached' (result re-emitted from an earlier job).
+        """
+        key = file_key(audio_path)
+
+        running = self._by_key.get(key)
+        if running is not None:
+            logger.info(f"[VoiceJobRunner] Coalescing duplicate job for {os.path.basename(audio_path)}")
+            return running, 'coalesced'
+
+        file_hash = self._hash_by_key.get(key)
+        cached = self._results.get(file_hash)
+        if cached is not None:
+            job_id = next(self._ids)
+            result = dict(cached, reference_audio=audio_path, voice_name=voice_name or cached['voice_name'])
+            target_se = self._embeddings.get(file_hash)
+            openvoice = self._current_openvoice()
+            if target_se is not None and openvoice is not None:
+                openvoice.set_target_se(audio_path, target_se)
+            logger.info(f"[VoiceJobRunner] Reusing prepared voice for {os.path.basename(audio_path)}")
+            self.finished.emit(job_id, result)
+            return job_id, 'cached'
+
+        job_id = next(self._ids)
+        job = VoiceJob(job_id, audio_path, openvoice=self._openvoice, voice_name=voice_name,
+                       lookup=self._lookup)
+        job.file_key = key
+        job.signals.stage.connect(self.stage)
+        job.signals.finished.connect(self._on_finished)
+        job.signals.failed.connect(self._on_failed)
+        job.signals.cancelled.connect(self._on_cancelled)
+        self._jobs[job_id] = job
+        self._by_key[key] = job_id
+        self._pool.start(job)
+        return job_id, 'started'
+
+    def _lookup(self, file_hash: str):
+        """Earlier (result, target_se) for this content; called from the job's thread."""
+        result = self._results.get(file_hash)
+        if result is None or not os.path.exists(result['reference_audio']):
+            return None
+        return result, self._embeddings.get(file_hash)
+
+    def cancel(self, job_id: Optional[int] = None) -> bool:
+        """Cancel one job, or every running job when job_id is None."""
+        jobs = list(self._jobs.values()) if job_id is None else [self._jobs.get(job_id)]
+        cancelled = False
+        for job in jobs:
+            if job is None:
+                continue
+            # jobs still waiting in the pool never start
+            if self._pool.tryTake(job):
+                self._forget(job.job_id)
+                self.cancelled.emit(job.job_id)
+            else:
+                job.cancel()
+            cancelled = True
+        return cancelled
+
+    def is_running(self, audio_path: str) -> bool:
+        """True if a job for this file's content is currently queued or running."""
+        try:
+            return file_key(audio_path) in self._by_key
+        except OSError:
+            return False
+
+    def is_busy(self) -> bool:
+        return bool(self._jobs)
+
+    def wait(self, timeout_ms: int = -1) -> bool:
+        return self._pool.waitForDone(timeout_ms)
+
+    def _forget(self, job_id: int):
+        job = self._jobs.pop(job_id, None)
+        if job is not None and self._by_key.get(job.file_key) == job_id:
+            del self._by_key[job.file_key]
+        return job
+
+    def _on_finished(self, job_id: int, result: dict):
+        job = self._forget(job_id)
+        self._results[result['file_hash']] = result
+        if job is not None:
+            self._hash_by_key[job.file_key] = result['file_hash']
+        if job is not None and job.target_se is not None:
+            self._embeddings[result['file_hash']] = job.target_se
+        self.finished.emit(job_id, result)
+
+    def _on_failed(self, job_id: int, message: str):
+        self._forget(job_id)
+        self.failed.emit(job_id, message)
+
+    def _on_cancelled(self, job_id: int):
+        self._forget(job_id)
+        self.cancelled.emit(job_id)
@@ -5,4 +5,5 @@ This package contains all test files organized by functionality:
 - voice/: Voice synthesis and TTS engine tests
 - integration/: Integration tests for combined functionality
 - debug/: Debug utilities and diagnostic scripts
+- benchmarks/: Performance benchmarks
 """
@@ -0,0 +1 @@
+"""Benchmarks (timings only, not run by pytest)"""
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Avatar cold-load benchmark: per-file JSON loading vs the precompressed bundle.
+
+Two measurements, both from a cold start:
+
+* assets  - what the asset layer does for one model load: every JSON file read and
+            parsed one by one vs one bundle read, decompressed and parsed. Always runs.
+* page    - the real page in an off-screen QWebEngineView with a fresh off-the-record
+            profile and asset cache per run, loaded with ?bundle=0 and ?bundle=1, timed
+            until window.getAvatarLoadStats() reports the first laid-out frame.
+            Needs PyQt5 with QtWebEngine (and the model's moc/textures).
+
+Usage:
+    python tests/benchmarks/bench_avatar_load.py [--avatar ANIYA] [--runs 5] [--no-page] [--json out.json]
+"""
+
+import sys
+import os
+import gc
+import json
+import gzip
+import time
+import argparse
+import statistics
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.avatar_bundle import build_bundle, bundle_path, _find_model_file, _json_sources
+
+AVATAR_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                           'assets', 'avatar')
+
+
+def _summary(samples_ms):
+    samples = sorted(samples_ms)
+    return {
+        'runs': len(samples),
+        'median_ms': round(statistics.median(samples), 2),
+        'min_ms': round(samples[0], 2),
+        'max_ms': round(samples[-1], 2),
+    }
+
+
+def bench_assets(avatar_path: str, runs: int) -> dict:
+    """Read+parse every JSON file individually vs read+decompress+parse the bundle."""
+    model_file = _find_model_file(avatar_path)
+    _, files = _json_sources(avatar_path, model_file)
+    path = bundle_path(avatar_path)
+
+    def per_file():
+        for rel in files:
+            with open(os.path.join(avatar_path, rel), 'rb') as f:
+                json.loads(f.read().decode('utf-8-sig'))
+
+    def bundled():
+        with open(path, 'rb') as f:
+            json.loads(gzip.decompress(f.read()).decode('utf-8'))
+
+    results = {}
+    for name, fn in (('per_file', per_file), ('bundle', bundled)):
+        samples = []
+        for _ in range(runs):
+            gc.collect()
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000)
+        results[name] = _summary(samples)
+    results['per_file']['requests'] = len(files)
+    results['bundle']['requests'] = 1
+    return results
+
+
+def bench_page(avatar: str, runs: int, timeout_s: float = 60.0) -> dict:
+    """Cold page loads with and without the bundle. Returns {} if QtWebEngine is missing."""
+    try:
+        from PyQt5.QtWidgets import QApplication
+        from PyQt5.QtCore import QUrl, QEventLoop, QTimer
+        from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEngineProfile, QWebEnginePage
+        from ui.avatar_scheme import (register_avatar_scheme, AvatarSchemeHandler, AvatarAssetCache,
+                                      avatar_url, SCHEME)
+    except ImportError as e:
+        print(f"⚠️ Skipping page benchmark: {e}")
+        return {}
+
+    register_avatar_scheme()
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    def load_once(use_bundle: bool):
+        profile = QWebEngineProfile()  # off-the-record: no HTTP cache carried over between runs
+        handler = AvatarSchemeHandler(AvatarAssetCache(AVATAR_ROOT))
+        profile.installUrlSchemeHandler(SCHEME.encode('ascii'), handler)
+        page = QWebEnginePage(profile)
+        view = QWebEngineView()
+        view.setPage(page)
+        view.resize(480, 640)
+        view.show()
+
+        result = {}
+        loop = QEventLoop()
+
+        def poll():
+            def got(stats):
+                if stats and stats.get('readyMs') is not None:
+                    result.update(stats)
+                    loop.quit()
+            page.runJavaScript("window.getAvatarLoadStats ? window.getAvatarLoadStats() : null", got)
+
+        timer = QTimer()
+        timer.timeout.connect(poll)
+        timer.start(50)
+        QTimer.singleShot(int(timeout_s * 1000), loop.quit)
+        view.load(QUrl(avatar_url(avatar=avatar, bundle=None if use_bundle else 0)))
+        loop.exec_()
+        timer.stop()
+        view.close()
+        view.setPage(None)
+        page.deleteLater()
+        view.deleteLater()
+        app.processEvents()
+        return result
+
+    results = {}
+    for name, use_bundle in (('per_file', False), ('bundle', True)):
+        samples = []
+        for _ in range(runs):
+            stats = load_once(use_bundle)
+            if not stats:
+                print(f"⚠️ {name}: model did not load within {timeout_s:.0f}s")
+                continue
+            if stats.get('bundle') != use_bundle:
+                print(f"⚠️ {name}: page reported bundle={stats.get('bundle')}")
+            samples.append(float(stats['readyMs']))
+        if samples:
+            results[name] = _summary(samples)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--avatar', default='ANIYA')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--no-page', action='store_true', help='skip the QtWebEngine page benchmark')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    avatar_path = os.path.join(AVATAR_ROOT, args.avatar)
+    summary = build_bundle(avatar_path)
+    print(f"📦 Bundle: {summary['files']} JSON files, {summary['raw_bytes'] / 1024:.0f} KB -> "
+          f"{summary['bundle_bytes'] / 1024:.0f} KB")
+
+    results = {'avatar': args.avatar, 'bundle': {k: v for k, v in summary.items() if k != 'path'},
+               'assets': bench_assets(avatar_path, args.runs)}
+    if not args.no_page:
+        results['page'] = bench_page(args.avatar, args.runs)
+
+    for section in ('assets', 'page'):
+        data = results.get(section) or {}
+        for name in ('per_file', 'bundle'):
+            if name in data:
+                print(f"⏱️ {section:6s} {name:8s}: median {data[name]['median_ms']:.1f} ms "
+                      f"(min {data[name]['min_ms']:.1f}, max {data[name]['max_ms']:.1f}, n={data[name]['runs']})")
+        if 'per_file' in data and 'bundle' in data and data['bundle']['median_ms'] > 0:
+            print(f"   {section}: {data['per_file']['median_ms'] / data['bundle']['median_ms']:.2f}x faster with bundle")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Synthesis benchmark: per-stage latency of the OpenVoice pipeline on random weights.
+
+Builds the base speaker and converter models from the shipped config shapes with
+random weights (see model_fixtures.py), so it runs offline without checkpoints, and
+times each stage of a synthesis:
+
+    text_frontend, enc_p, sdp, dp, generate_path, flow, generator,
+    voice_conversion, extract_se, end_to_end (OpenVoiceTTS.synthesize_audio)
+
+Each stage reports p50/p95/mean latency and its real-time factor (p50 / seconds of
+audio produced; extract_se is relative to the reference clip). Peak RSS of the
+process is reported alongside. Results are JSON; --save-baseline stores them and
+--compare checks a run against a stored baseline (exit code 1 on regressions).
+
+Usage:
+    python tests/benchmarks/bench_synthesis.py [--scale real|tiny] [--runs 10]
+        [--checkpoints DIR] [--precision fp32|bf16|fp16|auto]
+        [--json out.json|-] [--save-baseline FILE] [--compare FILE]
+"""
+
+import sys
+import os
+import gc
+import json
+import time
+import argparse
+import platform
+import contextlib
+import tempfile
+import statistics
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import torch
+
+from tests.benchmarks.model_fixtures import make_checkpoints, make_reference_audio, SCALES
+from voice.precision import PRECISIONS
+
+DEFAULT_TEXT = "Hello there, my friend. It is a lovely day for a walk in the park, isn't it?"
+
+STAGES = ('text_frontend', 'enc_p', 'sdp', 'dp', 'generate_path', 'flow', 'generator',
+          'voice_conversion', 'extract_se', 'end_to_end')
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if it cannot be read."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return round(getattr(info, 'peak_wset', info.rss) / (1024 * 1024), 1)
+    except ImportError:
+        return None
+
+
+def _percentile(samples, q):
+    samples = sorted(samples)
+    k = (len(samples) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(samples) - 1)
+    return samples[lo] + (samples[hi] - samples[lo]) * (k - lo)
+
+
+def time_stage(fn, runs: int, warmup: int = 1) -> dict:
+    """Latency statistics (ms) of fn() over runs calls after warmup calls."""
+    with torch.no_grad():
+        for _ in range(warmup):
+            fn()
+        gc.collect()
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'runs': runs,
+        'p50_ms': round(_percentile(samples, 0.5), 3),
+        'p95_ms': round(_percentile(samples, 0.95), 3),
+        'mean_ms': round(statistics.fmean(samples), 3),
+    }
+
+
+def run_benchmark(checkpoints_dir: str, reference_path: str, text: str, runs: int,
+                  precision: str = 'fp32') -> dict:
+    from voice.openvoice_tts import OpenVoiceTTS
+    from voice.openvoice import commons
+    from voice.openvoice.mel_processing import spectrogram_torch
+
+    torch.manual_seed(0)
+    tts = OpenVoiceTTS(device='cpu', checkpoints_dir=checkpoints_dir, precision=precision)
+    base = tts.base_speaker_tts
+    converter = tts.tone_color_converter
+    model = base.model
+    hps = base.hps
+    sr = hps.data.sampling_rate
+    stages = {}
+
+    # Stage inputs are computed once up front so each stage is timed on its own
+    stages['text_frontend'] = time_stage(lambda: base.text_to_phonemes(text, 'english'), runs)
+    phonemes = base.text_to_phonemes(text, 'english')
+    with torch.no_grad():
+        x = phonemes.unsqueeze(0)
+        x_lengths = torch.LongTensor([phonemes.shape[0]])
+        g = model.emb_g(torch.LongTensor([hps.speakers['default']])).unsqueeze(-1)
+
+        stages['enc_p'] = time_stage(lambda: model.enc_p(x, x_lengths), runs)
+        h, m_p, logs_p, x_mask = model.enc_p(x, x_lengths)
+
+        stages['sdp'] = time_stage(lambda: model.sdp(h, x_mask, g=g, reverse=True, noise_scale=0.6), runs)
+        stages['dp'] = time_stage(lambda: model.dp(h, x_mask, g=g), runs)
+        logw = model.sdp(h, x_mask, g=g, reverse=True, noise_scale=0.6) * 0.2 + model.dp(h, x_mask, g=g) * 0.8
+
+        w_ceil = torch.ceil(torch.exp(logw) * x_mask)
+        y_lengths = torch.clamp_min(torch.sum(w_ceil, [1, 2]), 1).long()
+        y_mask = torch.unsqueeze(commons.sequence_mask(y_lengths, None), 1).to(x_mask.dtype)
+        attn_mask = torch.unsqueeze(x_mask, 2) * torch.unsqueeze(y_mask, -1)
+        stages['generate_path'] = time_stage(lambda: commons.generate_path(w_ceil, attn_mask), runs)
+        attn = commons.generate_path(w_ceil, attn_mask)
+
+        m_p = torch.matmul(attn.squeeze(1), m_p.transpose(1, 2)).transpose(1, 2)
+        logs_p = torch.matmul(attn.squeeze(1), logs_p.transpose(1, 2)).transpose(1, 2)
+        z_p = m_p + torch.randn_like(m_p) * torch.exp(logs_p) * 0.667
+        stages['flow'] = time_stage(lambda: model.flow(z_p, y_mask, g=g, reverse=True), runs)
+        z = model.flow(z_p, y_mask, g=g, reverse=True)
+
+        stages['generator'] = time_stage(lambda: model.dec(z * y_mask, g=g), runs)
+        audio = model.dec(z * y_mask, g=g)[0, 0]
+        audio_seconds = audio.numel() / sr
+
+        chd = converter.hps.data
+        spec = spectrogram_torch(audio.unsqueeze(0), chd.filter_length, chd.sampling_rate,
+                                 chd.hop_length, chd.win_length, center=False)
+        spec_lengths = torch.LongTensor([spec.size(-1)])
+        target_se = converter.extract_se([reference_path])
+        stages['voice_conversion'] = time_stage(
+            lambda: converter.model.voice_conversion(spec, spec_lengths, sid_src=tts.source_se,
+                                                     sid_tgt=target_se, tau=0.3), runs)
+
+    stages['extract_se'] = time_stage(lambda: converter.extract_se([reference_path]), runs)
+    import soundfile
+    reference_seconds = soundfile.info(reference_path).duration
+
+    # End to end as the app calls it; the reference embedding is cached after the warmup call
+    e2e_audio = {}
+
+    def end_to_end():
+        e2e_audio['audio'], e2e_audio['sr'] = tts.synthesize_audio(text, reference_audio=reference_path)
+    stages['end_to_end'] = time_stage(end_to_end, runs)
+    e2e_seconds = len(e2e_audio['audio']) / e2e_audio['sr']
+
+    for name, stats in stages.items():
+        seconds = reference_seconds if name == 'extract_se' else (
+            e2e_seconds if name == 'end_to_end' else audio_seconds)
+        stats['rtf'] = round(stats['p50_ms'] / 1000 / seconds, 4) if seconds > 0 else None
+
+    return {
+        'stages': {name: stages[name] for name in STAGES},
+        'audio_seconds': round(audio_seconds, 3),
+        'end_to_end_audio_seconds': round(e2e_seconds, 3),
+        'tokens': int(phonemes.shape[0]),
+        'memory': tts.memory_report(),
+        'precision': {'base_speaker': base.precision_report, 'converter': converter.precision_report},
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, out=sys.stdout) -> bool:
+    """Print p50 changes against baseline. Returns False if any stage got slower than tolerance allows."""
+    ok = True
+    print(f"\n{'stage':16s} {'baseline':>12s} {'current':>12s} {'change':>9s}", file=out)
+    for name, stats in results['stages'].items():
+        old = baseline.get('stages', {}).get(name)
+        if not old or not old.get('p50_ms'):
+            print(f"{name:16s} {'-':>12s} {stats['p50_ms']:>10.2f}ms {'new':>9s}", file=out)
+            continue
+        ratio = stats['p50_ms'] / old['p50_ms']
+        regressed = ratio > 1 + tolerance
+        ok = ok and not regressed
+        print(f"{name:16s} {old['p50_ms']:>10.2f}ms {stats['p50_ms']:>10.2f}ms {(ratio - 1) * 100:>+8.1f}%"
+              + ("  ❌ regression" if regressed else ""), file=out)
+    if baseline.get('meta', {}).get('scale') != results['meta']['scale']:
+        print(f"⚠️ Baseline scale {baseline.get('meta', {}).get('scale')} != {results['meta']['scale']}", file=out)
+    if baseline.get('meta', {}).get('precision', 'fp32') != results['meta']['precision']:
+        print(f"ℹ️ Baseline precision {baseline.get('meta', {}).get('precision', 'fp32')} "
+              f"vs {results['meta']['precision']}", file=out)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--scale', choices=SCALES, default='real', help='random-weight fixture size')
+    parser.add_argument('--checkpoints', help='benchmark real checkpoints from this folder instead of fixtures')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--threads', type=int, help='torch intra-op threads')
+    parser.add_argument('--precision', choices=PRECISIONS, default='fp32', help='vocoder/flow precision')
+    parser.add_argument('--text', default=DEFAULT_TEXT)
+    parser.add_argument('--json', help="write results to this file ('-' for stdout)")
+    parser.add_argument('--save-baseline', help='store the results as a baseline file')
+    parser.add_argument('--compare', help='compare against a stored baseline file')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='allowed p50 slowdown vs baseline (0.15 = 15%%)')
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    # Keep stdout clean for --json - (model loading prints progress)
+    log = sys.stderr if args.json == '-' else sys.stdout
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(log):
+        checkpoints = args.checkpoints or make_checkpoints(os.path.join(tmp, 'checkpoints'), scale=args.scale)
+        reference = make_reference_audio(os.path.join(tmp, 'reference.wav'))
+        results = run_benchmark(checkpoints, reference, args.text, args.runs, args.precision)
+
+    results['meta'] = {
+        'scale': 'checkpoints' if args.checkpoints else args.scale,
+        'text': args.text,
+        'runs': args.runs,
+        'precision': args.precision,
+        'torch': torch.__version__,
+        'threads': torch.get_num_threads(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+    }
+    results['peak_rss_mb'] = peak_rss_mb()
+
+    if args.json == '-':
+        print(json.dumps(results, indent=2))
+    else:
+        for name, stats in results['stages'].items():
+            print(f"⏱️ {name:16s} p50 {stats['p50_ms']:9.2f} ms  p95 {stats['p95_ms']:9.2f} ms  RTF {stats['rtf']}")
+        print(f"📈 Peak RSS: {results['peak_rss_mb']} MB")
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f"✓ Results written to {args.json}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Baseline saved to {args.save_baseline}", file=log)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.tolerance, out=log):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
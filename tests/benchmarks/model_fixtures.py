@@ -0,0 +1,98 @@
+"""
+Random-weight OpenVoice checkpoints for running the voice pipeline offline.
+
+make_checkpoints() writes a ``checkpoints/`` layout that OpenVoiceTTS loads like the
+real one (base_speakers/EN + converter, configs, checkpoint.pth, source embeddings),
+but with randomly initialized weights, so benchmarks and tests run without the
+downloaded models. The ``real`` scale keeps the shipped config shapes, so timings
+match the real model; ``tiny`` shrinks the channels and layers for quick smoke runs.
+"""
+
+import os
+import copy
+import json
+
+import torch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BASE_CONFIG = os.path.join(PROJECT_ROOT, 'voice', 'models', 'base_speakers', 'EN', 'config.json')
+
+# Overrides for the 'tiny' scale. hop_length and upsample_rates are kept so the
+# generator still produces hop_length samples per frame.
+TINY_MODEL = {
+    'inter_channels': 32,
+    'hidden_channels': 32,
+    'filter_channels': 64,
+    'n_layers': 2,
+    'upsample_initial_channel': 64,
+    'gin_channels': 32,
+}
+
+SCALES = ('real', 'tiny')
+
+
+def base_speaker_config(scale: str = 'real') -> dict:
+    """Config of the English base speaker model at the given scale."""
+    if scale not in SCALES:
+        raise ValueError(f"Unknown fixture scale: {scale} (expected one of {SCALES})")
+    with open(BASE_CONFIG, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    if scale == 'tiny':
+        config['model'].update(TINY_MODEL)
+    return config
+
+
+def converter_config(scale: str = 'real') -> dict:
+    """Config of the tone color converter: same shapes, no text encoder, a reference encoder instead."""
+    config = copy.deepcopy(base_speaker_config(scale))
+    config['data'] = {k: config['data'][k] for k in
+                      ('sampling_rate', 'filter_length', 'hop_length', 'win_length')}
+    config['data']['n_speakers'] = 0
+    config['symbols'] = []
+    config.pop('speakers', None)
+    return config
+
+
+def _write_model(folder: str, config: dict, seed: int):
+    from voice.openvoice.api import OpenVoiceBaseClass
+
+    os.makedirs(folder, exist_ok=True)
+    config_path = os.path.join(folder, 'config.json')
+    with open(config_path, 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2)
+    torch.manual_seed(seed)
+    model = OpenVoiceBaseClass(config_path, device='cpu', roles='full').model
+    torch.save({'model': model.state_dict()}, os.path.join(folder, 'checkpoint.pth'))
+
+
+def make_checkpoints(root: str, scale: str = 'real', seed: int = 0) -> str:
+    """
+    Write random-weight checkpoints under root (used as OpenVoiceTTS(checkpoints_dir=root)).
+
+    Returns root.
+    """
+    base = base_speaker_config(scale)
+    _write_model(os.path.join(root, 'base_speakers', 'EN'), base, seed)
+    _write_model(os.path.join(root, 'converter'), converter_config(scale), seed + 1)
+
+    gin_channels = base['model']['gin_channels']
+    generator = torch.Generator().manual_seed(seed + 2)
+    for name in ('en_default_se.pth', 'en_style_se.pth'):
+        se = torch.randn(1, gin_channels, 1, generator=generator) * 0.1
+        torch.save(se, os.path.join(root, 'base_speakers', 'EN', name))
+    return root
+
+
+def make_reference_audio(path: str, sampling_rate: int = 22050, seconds: float = 3.0, seed: int = 0) -> str:
+    """Write a voiced-sounding reference clip (harmonics with vibrato plus a little noise)."""
+    import numpy as np
+    import soundfile
+
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(sampling_rate * seconds)) / sampling_rate
+    f0 = 160 + 20 * np.sin(2 * np.pi * 3 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sampling_rate
+    audio = sum(np.sin(k * phase) / k for k in range(1, 6))
+    audio = 0.3 * audio / np.max(np.abs(audio)) + 0.01 * rng.standard_normal(len(t))
+    soundfile.write(path, audio.astype(np.float32), sampling_rate)
+    return path
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for the avatar QWebChannel bridge.
+Checks per-frame batching of updates and the state resent when the page connects.
+"""
+
+import sys
+import os
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ui.avatar_bridge import AvatarBridge, FLUSH_INTERVAL_MS
+
+
+def _wait(ms):
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec_()
+
+
+def test_avatar_bridge():
+    """Many updates within a frame reach the page as one message each."""
+    print("🧪 Testing AvatarBridge...")
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+    bridge = AvatarBridge()
+    sent = []
+    bridge.viewParamsChanged.connect(lambda p: sent.append(('view', p)))
+    bridge.previewZoomChanged.connect(lambda z: sent.append(('zoom', z)))
+    bridge.lipSyncBatch.connect(lambda b: sent.append(('lip', len(b))))
+    bridge.volumeChanged.connect(lambda v: sent.append(('volume', v)))
+
+    for zoom in range(50, 151):
+        bridge.set_preview_zoom(zoom / 100.0)
+    bridge.update_view_params({'view': 'upper', 'zoom': 1.2})
+    bridge.update_view_params({'pan_x': 4.0, 'pan_y': None})
+    bridge.queue_lip_sync({'fps': 60, 't0': 0, 'frames': 3, 'open': 'AAAA'})
+    bridge.queue_lip_sync({'fps': 60, 't0': 50, 'frames': 3, 'open': 'AAAA'})
+    assert sent == [], "nothing is sent before the frame flush"
+
+    _wait(FLUSH_INTERVAL_MS * 4)
+    print(f"✅ Flushed: {sent}")
+    assert ('zoom', 1.5) in sent and len([s for s in sent if s[0] == 'zoom']) == 1
+    assert ('view', {'view': 'upper', 'zoom': 1.2, 'pan_x': 4.0}) in sent
+    assert ('lip', 2) in sent
+
+    # A (re)connecting page gets the current state again
+    sent.clear()
+    bridge.set_volume(0.5)
+    bridge.hello()
+    assert {s[0] for s in sent} == {'view', 'zoom', 'volume'}, sent
+    assert bridge.is_connected
+
+    states = []
+    bridge.preview_state_changed.connect(states.append)
+    bridge.reportPreviewState({'x': 12.5, 'y': -3.0, 'previewRootWidth': 400})
+    assert bridge.preview_state['x'] == 12.5 and states
+
+    bridge.reset_page_state()
+    assert bridge.view_params == {} and bridge.preview_state == {} and not bridge.is_connected
+    print("✅ Handshake and page state reset work")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_avatar_bridge()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the precompressed avatar JSON bundle.
+Checks which files are packed, that they round-trip, and that edits make the bundle stale.
+"""
+
+import sys
+import os
+import json
+import gzip
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.avatar_bundle import build_bundle, bundle_path, is_bundle_current, ensure_bundle
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def _touch_later(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+
+
+def test_avatar_bundle():
+    """Bundle a small model and rebuild it after an edit."""
+    print("🧪 Testing avatar bundle...")
+    with tempfile.TemporaryDirectory() as root:
+        folder = os.path.join(root, 'Mini')
+        _write_json(os.path.join(folder, 'Mini.model3.json'), {
+            'Version': 3,
+            'FileReferences': {
+                'Moc': 'Mini.moc3',
+                'Textures': ['tex/texture_00.png'],
+                'Physics': 'Mini.physics3.json',
+                'Expressions': [{'Name': 'smile', 'File': 'exp/smile.exp3.json'}],
+                'Motions': {'Idle': [{'File': 'motion/idle.motion3.json'}, {'File': 'motion/missing.motion3.json'}]},
+            },
+        })
+        _write_json(os.path.join(folder, 'Mini.physics3.json'), {'Version': 3})
+        _write_json(os.path.join(folder, 'exp', 'smile.exp3.json'), {'Type': 'Live2D Expression'})
+        _write_json(os.path.join(folder, 'motion', 'idle.motion3.json'), {'Version': 3, 'Curves': []})
+        _write_json(os.path.join(folder, 'Unlisted.exp3.json'), {'Type': 'Live2D Expression'})
+        _write_json(os.path.join(folder, 'Mini.vtube.json'), {'Name': 'not a Cubism file'})
+
+        assert not is_bundle_current(folder)
+        summary = build_bundle(folder)
+        assert summary['path'] == bundle_path(folder) and summary['path'].endswith('Mini.bundle.json.gz')
+        with gzip.open(summary['path'], 'rb') as f:
+            data = json.loads(f.read().decode('utf-8'))
+        assert data['model'] == 'Mini.model3.json' and data['moc'] == 'Mini.moc3'
+        assert data['textures'] == ['tex/texture_00.png']
+        assert sorted(data['files']) == ['Mini.model3.json', 'Mini.physics3.json', 'Unlisted.exp3.json',
+                                         'exp/smile.exp3.json', 'motion/idle.motion3.json']
+        assert data['files']['motion/idle.motion3.json'] == {'Version': 3, 'Curves': []}
+        assert is_bundle_current(folder)
+        print(f"✅ Packed {summary['files']} JSON files into {summary['bundle_bytes']} bytes")
+
+        # Editing any packed file makes the bundle stale; ensure_bundle rebuilds it
+        _write_json(os.path.join(folder, 'exp', 'smile.exp3.json'), {'Type': 'Live2D Expression', 'FadeInTime': 0.5})
+        _touch_later(os.path.join(folder, 'exp', 'smile.exp3.json'))
+        assert not is_bundle_current(folder)
+        assert ensure_bundle(folder) == bundle_path(folder) and is_bundle_current(folder)
+        with gzip.open(bundle_path(folder), 'rb') as f:
+            assert json.loads(f.read())['files']['exp/smile.exp3.json']['FadeInTime'] == 0.5
+        print("✅ Stale bundle rebuilt")
+
+        empty = os.path.join(root, 'Empty')
+        os.makedirs(empty)
+        assert ensure_bundle(empty) is None
+    return True
+
+
+if __name__ == "__main__":
+    success = test_avatar_bundle()
+    sys.exit(0 if success else 1)
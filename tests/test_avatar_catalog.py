@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent avatar catalog index.
+Checks that only changed avatars are re-read and that the index survives a restart.
+"""
+
+import sys
+import os
+import json
+import struct
+import zlib
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.avatar_catalog import AvatarCatalog, INDEX_FILENAME
+from config.avatar_config import AvatarConfig
+
+
+def _write_png(path, width, height):
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n' + struct.pack('>I', 13) + b'IHDR' + ihdr
+                + struct.pack('>I', zlib.crc32(b'IHDR' + ihdr)))
+
+
+def _make_avatar(root, name, display_name=None, texture=(1024, 1024)):
+    folder = os.path.join(root, name)
+    os.makedirs(os.path.join(folder, 'tex'), exist_ok=True)
+    _write_png(os.path.join(folder, 'tex', 'texture_00.png'), *texture)
+    with open(os.path.join(folder, f'{name}.model3.json'), 'w') as f:
+        json.dump({'Version': 3, 'FileReferences': {'Moc': f'{name}.moc3', 'Textures': ['tex/texture_00.png']}}, f)
+    if display_name:
+        with open(os.path.join(folder, f'{name}.vtube.json'), 'w') as f:
+            json.dump({'Name': display_name}, f)
+    return folder
+
+
+def _touch_later(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+
+
+def test_avatar_catalog():
+    """Incremental refresh, persisted index and AvatarConfig on top of it."""
+    print("🧪 Testing avatar catalog...")
+    with tempfile.TemporaryDirectory() as root:
+        _make_avatar(root, 'Alpha', 'Alpha Prime', texture=(2048, 1024))
+        beta = _make_avatar(root, 'Beta')
+        os.makedirs(os.path.join(root, 'not_an_avatar'))
+
+        catalog = AvatarCatalog(root)
+        assert catalog.refresh()
+        assert sorted(catalog.last_rescanned) == ['Alpha', 'Beta', 'not_an_avatar']
+        alpha = catalog.get('Alpha')
+        assert alpha['name'] == 'Alpha Prime' and alpha['model_file'] == 'Alpha.model3.json'
+        assert alpha['textures'][0]['width'] == 2048 and os.path.isabs(alpha['path'])
+        assert os.path.exists(os.path.join(root, INDEX_FILENAME))
+
+        assert not catalog.refresh() and catalog.last_rescanned == [], "unchanged folders are not re-read"
+
+        # Edit one texture: only that avatar is re-read
+        _write_png(os.path.join(beta, 'tex', 'texture_00.png'), 512, 512)
+        _touch_later(os.path.join(beta, 'tex', 'texture_00.png'))
+        assert catalog.refresh() and catalog.last_rescanned == ['Beta']
+        assert catalog.get('Beta')['textures'][0]['width'] == 512
+
+        # A new process starts from the saved index
+        restarted = AvatarCatalog(root)
+        assert [a['id'] for a in restarted.avatars()] == ['Alpha', 'Beta']
+        assert not restarted.refresh() and restarted.last_rescanned == ['not_an_avatar']
+
+        # Removal is picked up
+        import shutil
+        shutil.rmtree(beta)
+        assert restarted.refresh() and restarted.get('Beta') is None
+        print("✅ Incremental refresh and persistence work")
+
+        config = AvatarConfig(root)
+        assert [a['id'] for a in config.get_available_avatars()] == ['Alpha']
+        _make_avatar(root, 'Gamma')
+        assert config.refresh() and config.is_avatar_valid('Gamma')
+        print(f"✅ AvatarConfig sees {[a['name'] for a in config.get_available_avatars()]}")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_avatar_catalog()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for background avatar import.
+Checks hardlink/copy placement, reference validation, progress and atomic replacement.
+"""
+
+import sys
+import os
+import json
+import tempfile
+from PyQt5.QtCore import QCoreApplication
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.avatar_import import AvatarImportJob, link_or_copy, model_references
+
+
+def _make_source(root, name, with_moc=True):
+    folder = os.path.join(root, 'src', name)
+    os.makedirs(os.path.join(folder, 'tex'), exist_ok=True)
+    refs = {'Moc': f'{name}.moc3', 'Textures': ['tex/texture_00.png'],
+            'Motions': {'Idle': [{'File': 'idle.motion3.json'}]}}
+    with open(os.path.join(folder, f'{name}.model3.json'), 'w') as f:
+        json.dump({'Version': 3, 'FileReferences': refs}, f)
+    with open(os.path.join(folder, 'tex', 'texture_00.png'), 'wb') as f:
+        f.write(os.urandom(3 << 20))
+    if with_moc:
+        with open(os.path.join(folder, f'{name}.moc3'), 'wb') as f:
+            f.write(b'MOC3' + os.urandom(1000))
+    return folder
+
+
+def _run(job):
+    results = {}
+    progress = []
+    job.signals.progress.connect(lambda j, rel, done, total: progress.append((done, total)))
+    job.signals.finished.connect(lambda j, r: results.update(ok=r))
+    job.signals.failed.connect(lambda j, m: results.update(error=m))
+    job.signals.cancelled.connect(lambda j: results.update(cancelled=True))
+    job.run()  # synchronously; signals are direct within one thread
+    return results, progress
+
+
+def test_avatar_import():
+    """Import, validation failure, cancellation and replacement."""
+    print("🧪 Testing avatar import...")
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as root:
+        avatar_dir = os.path.join(root, 'avatars')
+        source = _make_source(root, 'Neo')
+
+        refs = model_references(os.path.join(source, 'Neo.model3.json'))
+        assert refs['required'] == ['Neo.moc3', os.path.join('tex', 'texture_00.png')]
+        assert refs['optional'] == ['idle.motion3.json']
+
+        results, progress = _run(AvatarImportJob(1, source, avatar_dir))
+        result = results['ok']
+        print(f"✅ Imported {result['files']} files ({result['bytes']} bytes) via {result['methods']}")
+        assert os.path.isfile(os.path.join(avatar_dir, 'Neo', 'tex', 'texture_00.png'))
+        assert result['warnings'] == ['Missing referenced file: idle.motion3.json']
+        assert progress[-1][0] == progress[-1][1] == result['bytes']
+        assert not [d for d in os.listdir(avatar_dir) if d.startswith('.')], "staging folder left behind"
+
+        # Without hardlinks it falls back to reflink or a chunked copy with partial progress
+        chunks = []
+        import services.avatar_import as ai
+        real_link, ai.os.link = ai.os.link, lambda *a: (_ for _ in ()).throw(OSError('no links'))
+        try:
+            method = link_or_copy(os.path.join(source, 'tex', 'texture_00.png'), os.path.join(root, 'copy.png'), chunks.append)
+        finally:
+            ai.os.link = real_link
+        assert method in ('reflink', 'copy') and sum(chunks) == 3 << 20
+        print(f"✅ Fallback placement: {method} in {len(chunks)} step(s)")
+
+        # Missing required files: nothing is written
+        broken = _make_source(root, 'Broken', with_moc=False)
+        results, _ = _run(AvatarImportJob(2, broken, avatar_dir))
+        assert 'Broken.moc3' in results['error'] and not os.path.exists(os.path.join(avatar_dir, 'Broken'))
+
+        # Cancelled before it starts: existing avatar untouched
+        job = AvatarImportJob(3, source, avatar_dir)
+        job.cancel()
+        results, _ = _run(job)
+        assert results.get('cancelled') and os.path.isdir(os.path.join(avatar_dir, 'Neo'))
+
+        # Re-import replaces the existing folder in one rename
+        with open(os.path.join(avatar_dir, 'Neo', 'stale.txt'), 'w') as f:
+            f.write('old')
+        results, _ = _run(AvatarImportJob(4, source, avatar_dir))
+        assert 'ok' in results and not os.path.exists(os.path.join(avatar_dir, 'Neo', 'stale.txt'))
+        print("✅ Validation, cancellation and replacement work")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_avatar_import()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the avatar render policy.
+Checks the mode pushed to the page for visibility and synthesis state, and reported stats.
+"""
+
+import sys
+import os
+from PyQt5.QtCore import QCoreApplication, QObject, pyqtSignal
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ui.avatar_render_policy import AvatarRenderPolicy, MODE_IDLE, MODE_SYNTH, MODE_HIDDEN
+from ui.avatar_bridge import AvatarBridge
+
+
+class FakePageHost(QObject):
+    """Same surface as AvatarPageHost as far as the policy is concerned: a real bridge, no page."""
+
+    page_ready = pyqtSignal(bool)
+
+    def __init__(self):
+        super().__init__()
+        self.bridge = AvatarBridge(self)
+        self.policies = []
+        self.bridge.renderPolicyChanged.connect(lambda p: self.policies.append(p['mode']))
+
+
+def test_avatar_render_policy():
+    """Synthesis caps the frame rate, hiding pauses it, stats come back from the page."""
+    print("🧪 Testing AvatarRenderPolicy...")
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+    host = FakePageHost()
+    policy = AvatarRenderPolicy(host)
+    assert policy.mode == MODE_IDLE
+
+    pushed = []
+
+    def step():
+        host.bridge.flush()
+        pushed.append(host.policies[-1] if host.policies else None)
+        host.policies.clear()
+
+    step()
+    policy.on_speaking_progress({'event': 'synth_start', 'index': 0, 'total': 2})
+    assert policy.mode == MODE_SYNTH
+    step()
+    policy.on_speaking_progress({'event': 'audio_start', 'index': 0, 'total': 2})
+    step()
+    policy.on_speaking_progress({'event': 'synth_start', 'index': 1, 'total': 2})
+    policy.on_speaking_finished(True, {})
+    step()  # synth then idle within one frame: only the final state is sent
+    policy.set_visible(False)
+    policy.set_synthesizing(True)
+    assert policy.mode == MODE_HIDDEN, "hidden wins over synthesis"
+    step()
+    policy.set_visible(True)
+    step()
+    print(f"✅ Pushed modes: {pushed}")
+    assert pushed == [MODE_IDLE, MODE_SYNTH, MODE_IDLE, MODE_IDLE, MODE_HIDDEN, MODE_SYNTH], pushed
+
+    host.bridge.hello()
+    assert host.policies == [MODE_SYNTH], "policy is resent when the page (re)connects"
+
+    received = []
+    policy.stats_updated.connect(received.append)
+    host.bridge.reportRenderStats({'fps': 14.8, 'targetFps': 15, 'mode': 'idle'})
+    assert received and received[0]['fps'] == 14.8
+    print(f"✅ Stats: {policy.last_stats}")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_avatar_render_policy()
+    sys.exit(0 if success else 1)
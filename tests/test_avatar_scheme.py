@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test script for the elpis://avatar/ asset cache.
+Checks path confinement, MIME types, cache hits and revalidation on file changes.
+"""
+
+import sys
+import os
+import time
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ui.avatar_scheme import AvatarAssetCache, AVATAR_ROOT, avatar_url, guess_mime_type
+
+
+def test_avatar_asset_cache():
+    """Serve real avatar assets from memory and pick up edits."""
+    print("🧪 Testing avatar asset cache...")
+    cache = AvatarAssetCache()
+
+    page = cache.get('/index.html')
+    assert page and b'<html' in page
+    assert cache.get('index.html') is page, "second read should come from memory"
+    assert cache.hits == 1 and cache.misses == 1
+    assert cache.get('/ANIYA/ANIYA.model3.json') is not None
+    assert cache.get('/../main.py') is None, "must not serve files outside the avatar root"
+    assert cache.get('/%2e%2e/main.py') is None
+    assert cache.get('/does-not-exist.js') is None
+    print(f"✅ Served {cache.size_bytes} bytes from {AVATAR_ROOT}")
+
+    assert guess_mime_type('live2dcubismcore.js') == 'text/javascript'
+    assert guess_mime_type('ANIYA/ANIYA.model3.json') == 'application/json'
+    assert guess_mime_type('ANIYA/ANIYA.moc3') == 'application/octet-stream'
+    assert avatar_url(avatar='ANIYA', view='full', debug=None) == 'elpis://avatar/index.html?avatar=ANIYA&view=full'
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, 'a.json')
+        with open(path, 'w') as f:
+            f.write('{"v": 1}')
+        small = AvatarAssetCache(root, max_bytes=12)
+        assert small.get('a.json') == b'{"v": 1}'
+        with open(path, 'w') as f:
+            f.write('{"v": 22}')
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 1000))
+        assert small.get('a.json') == b'{"v": 22}', "changed file must be re-read"
+        with open(os.path.join(root, 'b.json'), 'w') as f:
+            f.write('{"v": 3}')
+        small.get('b.json')
+        assert small.size_bytes <= 12, "least recently used entries should be evicted"
+    print("✅ Revalidation and eviction work")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_avatar_asset_cache()
+    sys.exit(0 if success else 1)
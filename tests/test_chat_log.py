@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for the model/view chat history.
+Fills a long session and checks typing state and that only visible rows are painted.
+"""
+
+import sys
+import os
+import time
+from PyQt5.QtWidgets import QApplication
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ui.chat_log import ChatLogView, MessageBubbleDelegate, TypingRole
+
+
+class CountingDelegate(MessageBubbleDelegate):
+    painted = 0
+
+    def paint(self, painter, option, index):
+        CountingDelegate.painted += 1
+        super().paint(painter, option, index)
+
+
+def _pump(app, seconds):
+    end = time.time() + seconds
+    while time.time() < end:
+        app.processEvents()
+
+
+def test_chat_log():
+    """Hundreds of messages, one active typing row, painting limited to the viewport."""
+    print("🧪 Testing ChatLogView...")
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    view = ChatLogView()
+    view.setItemDelegate(CountingDelegate(view))
+    view.resize(500, 400)
+    view.show()
+    model = view.chat_model()
+
+    for i in range(250):
+        model.add_message(f"Message number {i} from the user", "user")
+        row = model.add_message(f"Reply number {i} from the bot", "bot")
+        model.update_message(row, f"Reply number {i} from the bot", True)
+    _pump(app, 0.3)
+
+    CountingDelegate.painted = 0
+    view.viewport().repaint()
+    print(f"🎨 Painted {CountingDelegate.painted} of {model.rowCount()} rows")
+    assert 0 < CountingDelegate.painted < 30
+
+    row = model.add_message("", "bot")
+    view.update_message(row, "Hello there. ", False)
+    _pump(app, 0.5)
+    assert model.data(model.index(row), TypingRole)
+    view.update_message(row, "Hello there. How are you?", False)
+    assert model.data(model.index(row)).startswith("Hello there.")
+    view.update_message(row, "Hello there. How are you?", True)
+    _pump(app, 0.1)
+    assert not model.data(model.index(row), TypingRole)
+    assert model.data(model.index(row)) == "Hello there. How are you?"
+
+    bar = view.verticalScrollBar()
+    assert bar.value() == bar.maximum(), "view should stay pinned to the newest message"
+    print("✅ Chat log keeps typing state and scroll position")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_chat_log()
+    sys.exit(0 if success else 1)
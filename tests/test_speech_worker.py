@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for the background speech worker.
+Checks that speech runs off the GUI thread and that typing/timing signals arrive in order.
+"""
+
+import sys
+import os
+import time
+import threading
+import numpy as np
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.speech_worker import SpeechWorker
+
+
+class SlowEngine:
+    """Engine stand-in that behaves like TTSEngine.speak (two sentences, blocking playback)."""
+
+    def __init__(self):
+        self.threads = []
+
+    def speak(self, text, callback=None, progress_callback=None, audio_callback=None):
+        self.threads.append(threading.current_thread())
+        sentences = [s for s in text.split('.') if s.strip()]
+        shown = ""
+        for i, sentence in enumerate(sentences):
+            shown += sentence.strip() + ". "
+            if callback:
+                callback(shown.strip(), i == len(sentences) - 1)
+            progress_callback('synth_start', i, len(sentences))
+            if audio_callback:
+                audio_callback(np.zeros(2205, dtype=np.float32), 22050, i, len(sentences))
+            progress_callback('audio_start', i, len(sentences))
+            time.sleep(0.05)
+            progress_callback('audio_end', i, len(sentences))
+
+
+def test_speech_worker():
+    """Queue two replies and check signals, ordering and timing data."""
+    print("🧪 Testing SpeechWorker...")
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+    engine = SlowEngine()
+    worker = SpeechWorker(engine)
+    events = []
+    finished = []
+    lip = []
+
+    worker.typing_update.connect(lambda rid, text, done: events.append(('typing', rid, text, done)))
+    worker.speaking_started.connect(lambda rid, timing: events.append(('started', rid, timing)))
+    worker.speaking_progress.connect(lambda rid, timing: events.append(('progress', rid, timing['event'])))
+    worker.speaking_finished.connect(lambda rid, ok, timing: finished.append((rid, ok, timing)))
+    worker.lip_sync.connect(lambda rid, payload: lip.append(payload))
+    worker.start()
+
+    enqueue_start = time.time()
+    first = worker.enqueue("Hello there. How are you.")
+    second = worker.enqueue("Second reply.")
+    enqueue_time = time.time() - enqueue_start
+    print(f"⏱️  Enqueue returned in {enqueue_time * 1000:.2f} ms")
+    assert enqueue_time < 0.05, "enqueue must not block on speech"
+
+    loop = QEventLoop()
+    poll = QTimer()
+    poll.timeout.connect(lambda: loop.quit() if len(finished) == 2 else None)
+    poll.start(10)
+    QTimer.singleShot(5000, loop.quit)
+    loop.exec_()
+    worker.stop()
+
+    assert [f[0] for f in finished] == [first, second], finished
+    assert all(ok for _, ok, _ in finished)
+    assert all(t is not threading.main_thread() for t in engine.threads), "speech ran on the GUI thread"
+
+    # one lip-sync payload per sentence, 0.1 s of audio at 60 fps
+    assert len(lip) == 3 and lip[0]['frames'] == 6, lip
+
+    typing = [e for e in events if e[0] == 'typing' and e[1] == first]
+    assert typing[-1][2] == "Hello there. How are you." and typing[-1][3]
+
+    timing = finished[1][2]
+    for key in ('queued_at', 'started_at', 'first_audio_at', 'finished_at', 'queue_wait'):
+        assert timing.get(key) is not None, key
+    # the second reply waited for the first one to finish speaking
+    assert timing['queue_wait'] >= 0.05
+    print(f"✅ Second reply waited {timing['queue_wait']:.3f}s, first audio after "
+          f"{timing['time_to_first_audio'] * 1000:.1f} ms")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_speech_worker()
+    sys.exit(0 if success else 1)
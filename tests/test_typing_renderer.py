@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test script for the incremental typing renderer.
+Checks word-sized reveal steps and that already-shown text survives updates.
+"""
+
+import sys
+import os
+import time
+from PyQt5.QtWidgets import QApplication
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ui.typing_renderer import TypingRenderer
+
+
+def _pump(app, seconds):
+    end = time.time() + seconds
+    while time.time() < end:
+        app.processEvents()
+
+
+def test_typing_renderer():
+    """Reveal in word steps, keep the shown prefix, trim only a diverging tail."""
+    print("🧪 Testing TypingRenderer...")
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    renderer = TypingRenderer(fps=30, chars_per_second=40)
+    steps = []
+    renderer.updated.connect(steps.append)
+
+    renderer.set_target("Hello there. How are")
+    _pump(app, 0.15)
+    shown = renderer.visible_text()
+    assert shown and "Hello there. How are".startswith(shown)
+    # every step ends on a word boundary
+    assert all(s.endswith(' ') or s == "Hello there. How are" for s in steps), steps
+
+    # Longer text arrives: nothing already visible is retyped
+    renderer.set_target("Hello there. How are you today?")
+    assert renderer.visible_text() == shown
+    renderer.set_target("Hello there. How are you today?", True)
+    _pump(app, 2.0)
+    assert renderer.visible_text() == "Hello there. How are you today?"
+    assert renderer.document().toPlainText() == "Hello there. How are you today?"
+    assert not renderer.is_typing()
+
+    # Diverging text only removes the differing tail
+    renderer.set_target("Hello there. Bye.", True)
+    assert renderer.document().toPlainText().startswith("Hello there. ")
+    renderer.finish()
+    assert renderer.document().toPlainText() == "Hello there. Bye."
+    print(f"✅ Revealed in {len(steps)} word-sized steps")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_typing_renderer()
+    sys.exit(0 if success else 1)
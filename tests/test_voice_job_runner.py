@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for the voice preparation job runner.
+Runs real decode/VAD stages on a generated clip and checks coalescing and cancellation.
+"""
+
+import sys
+import os
+import tempfile
+import numpy as np
+import soundfile as sf
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.voice_job_runner import VoiceJobRunner, VoiceJob, energy_vad
+
+
+def _make_clip(path, sr=22050):
+    """Two seconds of tone with a second of silence in the middle."""
+    t = np.arange(int(sr * 1.0)) / sr
+    tone = 0.3 * np.sin(2 * np.pi * 220 * t)
+    audio = np.concatenate([tone, np.zeros(sr), tone]).astype(np.float32)
+    sf.write(path, audio, sr)
+    return audio
+
+
+def _wait_for(condition, timeout_ms=10000):
+    loop = QEventLoop()
+    poll = QTimer()
+    poll.timeout.connect(lambda: loop.quit() if condition() else None)
+    poll.start(10)
+    QTimer.singleShot(timeout_ms, loop.quit)
+    loop.exec_()
+
+
+def test_energy_vad():
+    """Silence in the middle of the clip should be removed."""
+    print("🧪 Testing energy VAD...")
+    sr = 22050
+    with tempfile.TemporaryDirectory() as tmp:
+        audio = _make_clip(os.path.join(tmp, 'clip.wav'), sr)
+    voiced = energy_vad(audio, sr)
+    voiced_seconds = len(voiced) / sr
+    print(f"✅ Kept {voiced_seconds:.2f}s of {len(audio) / sr:.2f}s")
+    assert 2.0 <= voiced_seconds < 2.5
+    return True
+
+
+def test_job_runner():
+    """Stages report real progress, duplicates coalesce, finished files are reused."""
+    print("🧪 Testing VoiceJobRunner...")
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = os.path.join(tmp, 'clip.wav')
+        _make_clip(clip)
+
+        runner = VoiceJobRunner(openvoice=None)
+        stages, results = [], []
+        runner.stage.connect(lambda job_id, stage, fraction: stages.append((stage, fraction)))
+        runner.finished.connect(lambda job_id, result: results.append((job_id, result)))
+
+        job_id, status = runner.submit(clip, 'test voice')
+        dup_id, dup_status = runner.submit(clip)
+        assert status == 'started' and dup_status == 'coalesced' and dup_id == job_id
+
+        _wait_for(lambda: results)
+        assert len(results) == 1, results
+        result = results[0][1]
+        print(f"✅ Stages: {[s for s, f in stages]}")
+        assert [f for _, f in stages][-1] == 1.0
+        assert {'decode', 'vad', 'embedding', 'verification'} <= set(result['timings'])
+        assert 2.0 <= result['voiced_duration'] < 2.5
+
+        again_id, again_status = runner.submit(clip)
+        assert again_status == 'cached' and len(results) == 2
+        print("✅ Duplicate job coalesced and finished result reused")
+
+        import shutil
+        copy = os.path.join(tmp, 'copy.wav')
+        shutil.copy(clip, copy)
+        _, copy_status = runner.submit(copy)
+        _wait_for(lambda: len(results) == 3)
+        assert copy_status == 'started' and results[-1][1]['reference_audio'] == copy
+        assert results[-1][1]['file_hash'] == result['file_hash']
+        print("✅ Same content under another path reused after hashing in the job")
+
+        cancelled = []
+        job = VoiceJob(99, clip, 'hash', openvoice=None)
+        job.signals.cancelled.connect(cancelled.append)
+        job.cancel()
+        job.run()
+        app.processEvents()
+        # a cancelled job stops before its next stage
+        assert cancelled == [99], cancelled
+        print("✅ Job cancelled")
+    return True
+
+
+if __name__ == "__main__":
+    ok = test_energy_vad() and test_job_runner()
+    sys.exit(0 if ok else 1)
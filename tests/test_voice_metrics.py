@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for the voice pipeline timing spans and metrics registry.
+Checks span accounting, per-request records and the local /metrics endpoint.
+"""
+
+import sys
+import os
+import time
+import threading
+import urllib.request
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from voice import metrics
+
+
+def _fake_request(request_id, queued_at):
+    with metrics.trace_request(request_id, queued_at) as trace:
+        with metrics.span('synthesis'):
+            with metrics.span('encoder'):
+                time.sleep(0.01)
+            with metrics.span('vocoder'):
+                time.sleep(0.02)
+        metrics.add_audio(22050, 22050)
+        metrics.mark_audio_start()
+        with metrics.span('playback'):
+            time.sleep(0.01)
+    return trace.record()
+
+
+def test_voice_metrics():
+    """Spans land in the current request only and records aggregate in the registry."""
+    print("🧪 Testing voice metrics...")
+    with metrics.span('encoder'):
+        pass  # no request: nothing recorded, nothing raised
+    assert metrics.current_trace() is None
+
+    record = _fake_request(7, time.time() - 0.5)
+    assert record['request_id'] == 7 and record['success']
+    assert record['queue_wait'] >= 0.5
+    assert record['stages']['vocoder'] >= 0.02 and record['stages']['synthesis'] >= 0.03
+    assert record['audio_seconds'] == 1.0 and record['chunks'] == 1
+    assert 0 < record['rtf'] < 1, record['rtf']
+    assert record['time_to_first_audio'] >= 0.03
+    print(f"✅ Record: {', '.join(f'{k} {v * 1000:.0f}ms' for k, v in record['stages'].items())}")
+
+    # Traces are per thread: a span on another thread does not leak into this request
+    with metrics.trace_request(8) as trace:
+        t = threading.Thread(target=lambda: metrics.span('flow').__enter__().__exit__())
+        t.start()
+        t.join()
+    assert 'flow' not in trace.stages
+
+    registry = metrics.MetricsRegistry(keep=2)
+    seen = []
+    registry.subscribe(seen.append)
+    for i in range(3):
+        registry.add(_fake_request(i, time.time()))
+    assert len(seen) == 3 and [r['request_id'] for r in registry.recent()] == [1, 2]
+    text = registry.render_text()
+    assert 'elpis_tts_requests_total 3' in text
+    assert 'elpis_tts_stage_calls_total{stage="vocoder"} 3' in text
+    assert 'elpis_tts_last_time_to_first_audio' in text
+    print("✅ Registry aggregates and renders")
+
+    port = metrics.start_metrics_server(0)
+    try:
+        assert port
+        metrics.registry.add(record)
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as resp:
+            body = resp.read().decode('utf-8')
+        assert 'elpis_tts_stage_seconds_total{stage="encoder"}' in body
+        print(f"✅ /metrics served on port {port}")
+    finally:
+        metrics.stop_metrics_server()
+    return True
+
+
+if __name__ == "__main__":
+    success = test_voice_metrics()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+"""
+Test script for the shared audio loader (soundfile decode, polyphase resampling, cache).
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from voice import audio_io
+
+
+def test_load_audio():
+    """float32 at the requested rate, no resampling on a match, and repeated loads come from the cache."""
+    try:
+        print("=== Audio Loader Test ===")
+        import soundfile
+
+        with tempfile.TemporaryDirectory() as tmp:
+            sr = 44100
+            t = np.arange(sr) / sr
+            stereo = np.stack([np.sin(2 * np.pi * 440 * t), 0.5 * np.sin(2 * np.pi * 440 * t)], axis=1)
+            path = os.path.join(tmp, 'tone.wav')
+            soundfile.write(path, stereo, sr, subtype='PCM_16')
+
+            audio, file_sr = audio_io.load_audio(path)
+            assert file_sr == sr and audio.dtype == np.float32 and audio.shape == (sr,)
+            assert np.allclose(audio, 0.75 * np.sin(2 * np.pi * 440 * t), atol=1e-3)
+
+            audio, out_sr = audio_io.load_audio(path, sr=22050)
+            assert out_sr == 22050 and audio.dtype == np.float32 and abs(len(audio) - 22050) <= 1
+            mid = slice(1000, 21000)
+            expected = 0.75 * np.sin(2 * np.pi * 440 * np.arange(len(audio)) / 22050)
+            assert np.max(np.abs(audio[mid] - expected[mid])) < 1e-2
+            print("✅ Decoded, downmixed and resampled to float32")
+
+            audio[:] = 0  # callers own their copy
+            again, _ = audio_io.load_audio(path, sr=22050)
+            assert np.any(again)
+            misses = audio_io._filter.cache_info().misses
+            audio_io.resample(stereo[:, 0], sr, 22050)
+            assert audio_io._filter.cache_info().misses == misses, "filter taps are designed once per rate pair"
+
+            with open(path, 'rb') as f:
+                from_bytes, _ = audio_io.load_audio(f.read(), sr=22050)
+            assert np.array_equal(from_bytes, again)
+            keys = len(audio_io._cache)
+            audio_io.load_audio(path, sr=22050)
+            assert len(audio_io._cache) == keys
+            print(f"✅ Cache holds {keys} decoded clips")
+            audio_io.clear_cache()
+    except Exception as e:
+        print(f"❌ Audio loader test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_load_audio()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+"""
+Test script for the bulk synthesis CLI (process pool, one embedding per voice, resume).
+Uses the random-weight 'tiny' checkpoints, so no downloads are needed.
+"""
+
+import os
+import sys
+import json
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from tests.benchmarks.model_fixtures import make_checkpoints, make_reference_audio
+
+
+def test_bulk_synth():
+    """All items are written once, voices are extracted once and a rerun skips finished ids."""
+    try:
+        print("=== Bulk Synthesis Test ===")
+        from voice import bulk_synth
+
+        with tempfile.TemporaryDirectory() as tmp:
+            root = make_checkpoints(os.path.join(tmp, 'checkpoints'), scale='tiny')
+            make_reference_audio(os.path.join(tmp, 'alice.wav'))
+            manifest = os.path.join(tmp, 'prompts.jsonl')
+            items = [
+                {'id': 'greet', 'text': "Hello there."},
+                {'id': 'a/1', 'text': "Nice to meet you.", 'voice': 'alice.wav', 'speed': 1.2},
+                {'id': 'a/2', 'text': "See you soon.", 'voice': 'alice.wav', 'style': 'default'},
+            ]
+            with open(manifest, 'w') as f:
+                f.writelines(json.dumps(item) + '\n' for item in items)
+            out = os.path.join(tmp, 'out')
+
+            summary = bulk_synth.run_job(manifest, out, root, workers=2, threads=1)
+            assert summary['done'] == 3 and summary['failed'] == 0, summary
+            assert summary['utterances_per_second'] > 0 and summary['rtf'] > 0
+            for item in items:
+                assert os.path.getsize(os.path.join(out, bulk_synth.output_name(item['id']))) > 44
+            assert len(os.listdir(os.path.join(out, '.voices'))) == 1, "one embedding per voice"
+            assert not [n for n in os.listdir(out) if n.endswith('.tmp')]
+            print(f"✅ {summary['done']} items at {summary['utterances_per_second']:.2f} utt/s, RTF {summary['rtf']:.3f}")
+
+            os.remove(os.path.join(out, bulk_synth.output_name('a/2')))
+            summary = bulk_synth.run_job(manifest, out, root, workers=1, threads=1)
+            assert summary['skipped'] == 2 and summary['done'] == 1, summary
+            print("✅ Rerun only synthesized the missing id")
+
+            csv_path = os.path.join(tmp, 'prompts.csv')
+            with open(csv_path, 'w') as f:
+                f.write("id,text,voice,style,speed\nx,Hello.,,,\n")
+            assert bulk_synth.read_manifest(csv_path) == [
+                {'id': 'x', 'text': 'Hello.', 'voice': None, 'style': 'default', 'speed': 1.0}]
+
+    except Exception as e:
+        print(f"❌ Bulk synthesis test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_bulk_synth()
+    sys.exit(0 if success else 1)
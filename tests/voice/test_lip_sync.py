@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+"""
+Test script for audio-driven lip-sync envelopes.
+"""
+
+import os
+import sys
+import json
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from voice.lip_sync import compute_envelope, build_payload, decode_channel
+
+
+def test_lip_sync_envelope():
+    """Loud frames open the mouth, silence closes it, payload round-trips."""
+    try:
+        print("=== Lip Sync Envelope Test ===")
+        sr = 22050
+        t = np.arange(sr // 2) / sr
+        speech = 0.5 * np.sin(2 * np.pi * 180 * t)
+        audio = np.concatenate([np.zeros(sr // 2), speech, np.zeros(sr // 2)]).astype(np.float32)
+
+        mouth_open, mouth_form = compute_envelope(audio, sr, fps=60)
+        print(f"✅ {len(mouth_open)} frames for {len(audio) / sr:.1f}s of audio")
+        assert len(mouth_open) == 90
+        assert mouth_open[5:25].max() == 0.0, "silence should keep the mouth closed"
+        assert mouth_open[35:55].min() > 0.8, "loud tone should open the mouth"
+        assert mouth_form[35:55].mean() < 0.2, "low tone should read as a round vowel"
+
+        payload = build_payload(audio, sr, fps=60, start_time=1000.0)
+        json.dumps(payload)
+        assert payload['t0'] == 1000000 and payload['frames'] == 90
+        decoded = decode_channel(payload['open'])
+        assert np.abs(decoded - mouth_open).max() <= 1 / 255 + 1e-6
+        print(f"✅ Payload: {len(payload['open'])} base64 chars per channel")
+
+    except Exception as e:
+        print(f"❌ Lip sync test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_lip_sync_envelope()
+    sys.exit(0 if success else 1)
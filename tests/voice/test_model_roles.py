@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+"""
+Test script for role-pruned OpenVoice models (TTS-only, conversion-only, SE-only graphs).
+Uses the random-weight 'tiny' checkpoints, so no downloads are needed.
+"""
+
+import os
+import sys
+import tempfile
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from tests.benchmarks.model_fixtures import make_checkpoints
+
+
+def test_model_roles():
+    """Pruned graphs load only their keys, save memory and match the full model's output."""
+    try:
+        print("=== Model Roles Test ===")
+        from voice.openvoice.api import BaseSpeakerTTS, ToneColorConverter
+
+        with tempfile.TemporaryDirectory() as tmp:
+            root = make_checkpoints(os.path.join(tmp, 'checkpoints'), scale='tiny')
+            base_dir = os.path.join(root, 'base_speakers', 'EN')
+            conv_dir = os.path.join(root, 'converter')
+
+            full = BaseSpeakerTTS(os.path.join(base_dir, 'config.json'), device='cpu', roles='full')
+            full.load_ckpt(os.path.join(base_dir, 'checkpoint.pth'))
+            tts = BaseSpeakerTTS(os.path.join(base_dir, 'config.json'), device='cpu')
+            tts.load_ckpt(os.path.join(base_dir, 'checkpoint.pth'))
+            assert tts.roles == ('tts',) and not hasattr(tts.model, 'enc_q')
+            assert tts.memory_report['skipped_modules'] == ['enc_q']
+            assert tts.resident_bytes() + tts.memory_report['skipped_bytes'] == full.resident_bytes()
+            print(f"✅ TTS graph skips {tts.memory_report['skipped_bytes'] / 1024:.0f} KB")
+
+            torch.manual_seed(0)
+            a = full.tts("Hello there.", None, 'default')
+            torch.manual_seed(0)
+            b = tts.tts("Hello there.", None, 'default')
+            assert a.shape == b.shape and abs(a - b).max() == 0, "pruned model must match the full one"
+
+            se_only = ToneColorConverter(os.path.join(conv_dir, 'config.json'), device='cpu',
+                                         enable_watermark=False, roles=('se',))
+            se_only.load_ckpt(os.path.join(conv_dir, 'checkpoint.pth'))
+            assert set(se_only.memory_report['skipped_modules']) == {'dec', 'enc_q', 'flow'}
+            converter = ToneColorConverter(os.path.join(conv_dir, 'config.json'), device='cpu',
+                                           enable_watermark=False)
+            converter.load_ckpt(os.path.join(conv_dir, 'checkpoint.pth'))
+            assert converter.memory_report['skipped_bytes'] == 0
+
+            audio = torch.randn(22050).numpy() * 0.1
+            assert torch.equal(se_only.extract_se_from_audio(audio), converter.extract_se_from_audio(audio))
+            try:
+                se_only.model.voice_conversion(None, None, None, None)
+                raise AssertionError("SE-only graph must refuse conversion")
+            except RuntimeError as e:
+                print(f"✅ SE-only graph: {e}")
+
+    except Exception as e:
+        print(f"❌ Model roles test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_model_roles()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+"""
+Test script for reduced-precision (bf16) vocoder/flow inference.
+Uses the random-weight 'tiny' checkpoints, so no downloads are needed.
+"""
+
+import os
+import sys
+import tempfile
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from tests.benchmarks.model_fixtures import make_checkpoints
+
+
+def test_precision():
+    """bf16 keeps the sensitive modules in fp32, stays close to fp32 and reverts on a failed check."""
+    try:
+        print("=== Precision Test ===")
+        from voice.openvoice.api import BaseSpeakerTTS
+        from voice import precision
+
+        with tempfile.TemporaryDirectory() as tmp:
+            root = make_checkpoints(os.path.join(tmp, 'checkpoints'), scale='tiny')
+            base_dir = os.path.join(root, 'base_speakers', 'EN')
+
+            def load():
+                tts = BaseSpeakerTTS(os.path.join(base_dir, 'config.json'), device='cpu')
+                tts.load_ckpt(os.path.join(base_dir, 'checkpoint.pth'))
+                return tts
+
+            fp32 = load()
+            bf16 = load()
+            report = bf16.set_precision('bf16')
+            assert report['precision'] == 'bf16' and report['modules'] == ['dec', 'flow'], report
+            assert set(report['parity']) == {'dec', 'flow'}
+            assert bf16.model.dec.conv_pre.weight.dtype == torch.bfloat16
+            assert bf16.model.sdp.flows[1].pre.weight.dtype == torch.float32
+            assert bf16.model.enc_p.encoder.norm_layers_1[0].gamma.dtype == torch.float32
+            print(f"✅ bf16 parity: {report['parity']}")
+
+            torch.manual_seed(0)
+            a = fp32.tts("Hello there.", None, 'default')
+            torch.manual_seed(0)
+            b = bf16.tts("Hello there.", None, 'default')
+            assert a.dtype == b.dtype and a.shape == b.shape, "durations must not change"
+            snr = precision._snr_db(torch.from_numpy(a), torch.from_numpy(b))
+            assert snr > 15, snr
+            print(f"✅ End-to-end SNR vs fp32: {snr:.1f} dB")
+
+            guarded = load()
+            report = precision.apply_precision(guarded.model, 'bf16', 'cpu', min_snr_db=1000)
+            assert report.get('reverted') and report['precision'] == 'fp32'
+            assert guarded.model.dec.conv_pre.weight.dtype == torch.float32
+            assert not hasattr(guarded.model.dec, '_precision_hooks')
+            print(f"✅ Guardrail reverted: {report['reason']}")
+
+            assert precision.resolve_precision('auto', 'cpu') in ('bf16', 'fp32')
+            try:
+                precision.resolve_precision('int8')
+                raise AssertionError("unknown precision must be rejected")
+            except ValueError:
+                pass
+
+    except Exception as e:
+        print(f"❌ Precision test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_precision()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+"""
+Test script for reference embedding extraction (in-memory VAD, bounded selection, cache).
+Uses the random-weight 'tiny' checkpoints, so no downloads are needed.
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from tests.benchmarks.model_fixtures import make_checkpoints, make_reference_audio
+
+
+def test_speech_selection():
+    """Silence is dropped, selection stops at max_seconds and pieces are views of equal length."""
+    print("=== Speech Selection Test ===")
+    from voice.openvoice import se_extractor
+
+    sr = 16000
+    rng = np.random.default_rng(0)
+    tone = 0.3 * np.sin(2 * np.pi * 200 * np.arange(4 * sr) / sr)
+    silence = 0.001 * rng.standard_normal(3 * sr)
+    audio = np.concatenate([silence, tone, silence, tone, silence]).astype(np.float32)
+
+    segments = se_extractor.energy_segments(audio, sr)
+    assert len(segments) == 2, segments
+    assert all(abs(s - e) < 0.1 * sr for (s, _), e in zip(segments, (3 * sr, 10 * sr)))
+
+    speech = se_extractor.select_speech(audio, sr, segments, max_seconds=5)
+    assert 4.9 * sr <= sum(len(s) for s in speech) <= 5 * sr
+    pieces = se_extractor.split_pieces(speech, sr, split_seconds=2)
+    assert pieces.ndim == 2 and pieces.shape[0] == 2
+    print(f"✅ {len(segments)} segments, {pieces.shape[0]} pieces of {pieces.shape[1] / sr:.2f}s")
+    return True
+
+
+def test_get_se():
+    """Short and long references embed in one pass, and the second call is served from the cache."""
+    try:
+        print("=== Get SE Test ===")
+        import time
+        from voice.openvoice import se_extractor
+        from voice.openvoice.api import ToneColorConverter
+
+        with tempfile.TemporaryDirectory() as tmp:
+            root = make_checkpoints(os.path.join(tmp, 'checkpoints'), scale='tiny')
+            converter = ToneColorConverter(os.path.join(root, 'converter', 'config.json'), device='cpu',
+                                           enable_watermark=False)
+            converter.load_ckpt(os.path.join(root, 'converter', 'checkpoint.pth'))
+            short = make_reference_audio(os.path.join(tmp, 'short.wav'))
+            long = make_reference_audio(os.path.join(tmp, 'long.wav'), seconds=300.0)
+
+            se, name = se_extractor.get_se(short, converter, target_dir=os.path.join(tmp, 'processed'))
+            assert se.shape[:2] == (1, converter.hps.model.gin_channels) and se.shape[-1] == 1
+            assert os.path.isfile(os.path.join(tmp, 'processed', name, 'se_vad_30s.pth'))
+            shorter, _ = se_extractor.get_se(short, converter, target_dir=os.path.join(tmp, 'processed'),
+                                             max_seconds=1.5)
+            assert os.path.isfile(os.path.join(tmp, 'processed', name, 'se_vad_1.5s.pth'))
+            assert not np.allclose(shorter.numpy(), se.numpy()), "max_seconds is part of the cache key"
+
+            wavs = se_extractor.split_audio_vad(short, name, os.path.join(tmp, 'split'), split_seconds=1.0)
+            import soundfile
+            assert {soundfile.info(os.path.join(wavs, f)).samplerate for f in os.listdir(wavs)} == {22050}
+
+            start = time.perf_counter()
+            long_se, _ = se_extractor.get_se(long, converter, target_dir=os.path.join(tmp, 'processed'))
+            elapsed = time.perf_counter() - start
+            assert long_se.shape == se.shape
+            print(f"✅ 300s reference embedded in {elapsed:.2f}s")
+
+            cached, cached_name = se_extractor.get_se(short, converter, target_dir=os.path.join(tmp, 'processed'))
+            assert cached_name == name and np.allclose(cached.numpy(), se.numpy())
+            print("✅ Cached embedding reused")
+    except Exception as e:
+        print(f"❌ Get SE test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+
+def test_extract_se_batch():
+    """Padded batch embeddings match clip-by-clip extraction, and extract_se averages them."""
+    try:
+        print("=== Batched Extraction Test ===")
+        import torch
+        from voice.openvoice.api import ToneColorConverter
+
+        with tempfile.TemporaryDirectory() as tmp:
+            root = make_checkpoints(os.path.join(tmp, 'checkpoints'), scale='tiny')
+            converter = ToneColorConverter(os.path.join(root, 'converter', 'config.json'), device='cpu',
+                                           enable_watermark=False)
+            converter.load_ckpt(os.path.join(root, 'converter', 'checkpoint.pth'))
+            paths = [make_reference_audio(os.path.join(tmp, f'clip{i}.wav'), seconds=1.0 + 0.7 * i, seed=i)
+                     for i in range(5)]
+
+            import librosa
+            audios = [librosa.load(p, sr=converter.hps.data.sampling_rate)[0] for p in paths]
+            single = torch.cat([converter.extract_se_from_audio(a)[..., 0] for a in audios])
+            batched = converter.extract_se_batch(audios)
+            assert torch.allclose(single, batched, atol=1e-4), (single - batched).abs().max()
+
+            se = converter.extract_se(paths, batch_size=2)
+            assert se.shape == (1, single.size(1), 1)
+            assert torch.allclose(se[..., 0], single.mean(0, keepdim=True), atol=1e-4)
+            print(f"✅ {len(paths)} clips of different lengths embedded in padded batches")
+    except Exception as e:
+        print(f"❌ Batched extraction test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_speech_selection() and test_get_se() and test_extract_se_batch()
+    sys.exit(0 if success else 1)
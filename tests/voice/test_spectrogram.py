@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+"""
+Test script for the shared spectrogram frontend (STFT and conv bases, batches, streaming).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+N_FFT, HOP, WIN = 1024, 256, 1024
+
+
+def _reference(y):
+    """The original OpenVoice spectrogram: manual reflect padding, then torch.stft."""
+    import torch
+    pad = (N_FFT - HOP) // 2
+    y = torch.nn.functional.pad(y.unsqueeze(1), (pad, pad), mode='reflect').squeeze(1)
+    spec = torch.stft(y, N_FFT, hop_length=HOP, win_length=WIN, window=torch.hann_window(WIN),
+                      center=False, onesided=True, return_complex=True)
+    return torch.sqrt(torch.view_as_real(spec).pow(2).sum(-1) + 1e-6)
+
+
+def test_spectrogram_frontend():
+    """Both methods match the original, batch rows match single clips and streaming matches the whole clip."""
+    try:
+        print("=== Spectrogram Frontend Test ===")
+        import torch
+        from voice.openvoice.mel_processing import SpectrogramFrontend, get_frontend, spectrogram_torch
+
+        torch.manual_seed(0)
+        clips = [0.3 * torch.randn(n) for n in (8000, 11025, 22050)]
+        expected = [_reference(c[None])[0] for c in clips]
+
+        stft = SpectrogramFrontend(N_FFT, HOP, WIN)
+        conv = SpectrogramFrontend(N_FFT, HOP, WIN, method='conv')
+        for clip, ref in zip(clips, expected):
+            assert torch.allclose(stft(clip), ref, atol=1e-4)
+            assert torch.allclose(conv(clip), ref, rtol=1e-3, atol=1e-3)
+        assert torch.allclose(spectrogram_torch(clips[0][None], N_FFT, 22050, HOP, WIN), expected[0][None], atol=1e-4)
+        assert get_frontend(N_FFT, HOP, WIN) is get_frontend(N_FFT, HOP, WIN)
+        print("✅ STFT and conv frontends match the original spectrogram")
+
+        spec, lengths = stft.batch(clips)
+        assert lengths.tolist() == [r.size(-1) for r in expected]
+        for row, n, ref in zip(spec, lengths.tolist(), expected):
+            assert torch.allclose(row[:, :n], ref, atol=1e-4) and not row[:, n:].any()
+        print(f"✅ Batch of {len(clips)} clips, frames {lengths.tolist()}")
+
+        streamer = stft.stream()
+        frames = [streamer.push(chunk) for chunk in clips[2].split(1000)] + [streamer.flush()]
+        streamed = torch.cat(frames, dim=-1)[0]
+        assert streamed.shape == expected[2].shape and torch.allclose(streamed, expected[2], atol=1e-4)
+        print(f"✅ Streamed {streamed.size(-1)} frames in {len(frames)} calls")
+    except Exception as e:
+        print(f"❌ Spectrogram frontend test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_spectrogram_frontend()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+"""
+Test script for the alignment timeline (token -> samples -> words/characters).
+"""
+
+import os
+import sys
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from voice.openvoice import timeline
+
+
+def test_align_tokens():
+    """Durations map to sample ranges and words split at the space symbol."""
+    symbols = [None, 'h', None, 'i', None, ' ', None, 'j', None, 'o', None]
+    durations = [1, 2, 0, 3, 1, 2, 1, 2, 0, 2, 1]
+    tokens, words = timeline.align_tokens(symbols, durations, hop_length=256)
+    assert tokens[-1]['end'] == sum(durations) * 256
+    assert [w['word'] for w in words] == ['hi', 'jo']
+    assert words[0]['start'] == 256 and words[0]['end'] == 6 * 256
+
+    tl = timeline.build_timeline("Hi Jo!", [(tokens, words)], 22050)
+    assert [(w['char_start'], w['char_end']) for w in tl['words']] == [(0, 2), (3, 6)]
+    assert tl['char_starts'] == sorted(tl['char_starts'])
+    assert timeline.chars_revealed_at(tl, 0) == 0
+    assert timeline.chars_revealed_at(tl, tl['num_samples']) == len("Hi Jo!")
+    assert timeline.interruption_point(tl, 300) == {'sample': 6 * 256, 'char': 2}
+    print("✅ align_tokens/build_timeline")
+    return True
+
+
+def test_tts_with_timeline():
+    """The timeline covers the synthesized audio (randomly initialized model, no checkpoint)."""
+    try:
+        print("=== Timeline Test ===")
+        from voice.openvoice.api import BaseSpeakerTTS
+        torch.manual_seed(0)
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        config = os.path.join(project_root, 'voice', 'models', 'base_speakers', 'EN', 'config.json')
+        tts = BaseSpeakerTTS(config, device='cpu')
+
+        text = "Hello there, my friend. How are you doing today?"
+        audio, tl = tts.tts_with_timeline(text, 'default')
+        print(f"✅ {len(tl['tokens'])} tokens, {len(tl['words'])} words, {len(audio)} samples")
+        assert tl['num_samples'] == len(audio)
+        assert tl['tokens'][-1]['end'] <= len(audio)
+        assert [w['word'] for w in tl['words']] == text.split()
+        starts = [w['start'] for w in tl['words']]
+        assert starts == sorted(starts)
+        assert len(tl['char_starts']) == len(text)
+
+    except Exception as e:
+        print(f"❌ Timeline test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_align_tokens() and test_tts_with_timeline()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+"""
+Test script for out-of-process synthesis (shared-memory rings, worker restart).
+The model part uses the random-weight 'tiny' checkpoints, so no downloads are needed.
+"""
+
+import os
+import sys
+import tempfile
+import multiprocessing
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from voice import tts_process
+
+
+def test_shm_ring():
+    """Arrays round-trip through the ring, wrap around and fall back to raw bytes when too large."""
+    print("=== Shared Memory Ring Test ===")
+    writer = tts_process.ShmRing(4096)
+    reader = tts_process.ShmRing(name=writer.name)
+    parent, child = multiprocessing.Pipe()
+    try:
+        for n in (100, 700, 300):  # the third write wraps to offset 0
+            audio = np.random.default_rng(n).standard_normal(n).astype(np.float32)
+            packed = tts_process._pack(('ok', {'audio': audio, 'sr': 22050}), writer, parent)
+            assert isinstance(packed[1]['audio'], tts_process._Array)
+            result = tts_process._unpack(packed, reader, [])
+            assert result[1]['sr'] == 22050 and np.array_equal(result[1]['audio'], audio)
+        # two arrays of one message that do not both fit: the second must not wrap onto the first
+        first, second = np.full(600, 1.0, np.float32), np.full(600, 2.0, np.float32)
+        packed = tts_process._pack([first, second], writer, parent)
+        assert not packed[0].inline and packed[1].inline
+        parent.send(packed)
+        msg, inline = tts_process._recv(child)
+        a, b = tts_process._unpack(msg, reader, inline)
+        assert np.array_equal(a, first) and np.array_equal(b, second)
+        big = np.arange(5000, dtype=np.float64)
+        parent.send(tts_process._pack([big], writer, parent))
+        msg, inline = tts_process._recv(child)
+        assert np.array_equal(tts_process._unpack(msg, reader, inline)[0], big)
+        import torch
+        se = torch.randn(1, 256, 1)
+        result = tts_process._unpack(tts_process._pack(se, writer, parent), reader, [])
+        assert isinstance(result, torch.Tensor) and torch.equal(result, se)
+        print("✅ Ring round trips arrays and tensors, wraps and falls back to raw bytes")
+    finally:
+        parent.close()
+        child.close()
+        reader.close()
+        writer.close()
+    return True
+
+
+def test_tts_process():
+    """The proxy synthesizes in another process and restarts a dead worker."""
+    try:
+        print("=== TTS Process Test ===")
+        from tests.benchmarks.model_fixtures import make_checkpoints
+
+        with tempfile.TemporaryDirectory() as tmp:
+            root = make_checkpoints(os.path.join(tmp, 'checkpoints'), scale='tiny')
+            tts = tts_process.RemoteOpenVoiceTTS(device='cpu', checkpoints_dir=root)
+            try:
+                assert tts.pid != os.getpid()
+                audio, sr = tts.synthesize_audio("Hello there.")
+                assert sr == tts.sampling_rate and len(audio) > 0
+                se = tts.extract_target_se(np.random.default_rng(0).standard_normal(22050).astype(np.float32) * 0.1)
+                assert se.shape[0] == 1
+                print(f"✅ Synthesized {len(audio)} samples in worker {tts.pid}")
+
+                first_pid = tts.pid
+                tts._process.kill()
+                tts._process.join()
+                audio, sr = tts.synthesize_audio("Still here.")
+                assert len(audio) > 0 and tts._process.pid != first_pid
+                print("✅ Worker restarted after a crash")
+            finally:
+                tts.close()
+    except Exception as e:
+        print(f"❌ TTS process test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_shm_ring() and test_tts_process()
+    sys.exit(0 if success else 1)
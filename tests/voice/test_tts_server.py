@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+"""
+Test script for the headless TTS server, driven in-process by LocalClient.
+Uses the random-weight 'tiny' checkpoints, so no downloads are needed.
+"""
+
+import os
+import sys
+import json
+import asyncio
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from tests.benchmarks.model_fixtures import make_checkpoints, make_reference_audio
+
+
+TWO_SENTENCES = ("This first sentence has quite a few words in it to stand alone. "
+                 "And the second one is long enough to be its own piece as well.")
+
+
+async def _exercise(server, reference):
+    from services.tts_server import LocalClient, ws_send, ws_recv, HTTPError
+
+    client = LocalClient(port=server.port)
+    health = await client.health()
+    assert health['status'] == 'ok' and health['sampling_rate'] == server.tts.sampling_rate
+    print(f"✅ Health: {health['sampling_rate']} Hz")
+
+    assert await client.put_voice('ref', reference) == 201
+    assert 'ref' in json.loads((await client.request('GET', '/v1/voices'))[2])['voices']
+    print("✅ Voice 'ref' cached")
+
+    chunks = [c async for c in client.stream(TWO_SENTENCES, voice='ref')]
+    pcm = b''.join(chunks)
+    assert len(chunks) >= 2 and len(pcm) % 2 == 0 and len(pcm) > 0
+    wav = b''.join([c async for c in client.stream("Hello there.", format='wav')])
+    assert wav[:4] == b'RIFF' and wav[8:12] == b'WAVE'
+    print(f"✅ HTTP stream: {len(chunks)} chunks, {len(pcm) // 2} samples")
+
+    try:
+        [c async for c in client.stream("Hello.", voice='nobody')]
+        raise AssertionError("unknown voice must be refused")
+    except HTTPError as e:
+        assert e.status == 404
+
+    for bad in ({'speaker': 'nobody'}, {'language': 'Klingon'}, {'speed': 'fast'}):
+        try:
+            [c async for c in client.stream("Hello.", **bad)]
+            raise AssertionError(f"{bad} must be refused")
+        except HTTPError as e:
+            assert e.status == 400, (bad, e.status)
+    print("✅ Bad speaker, language and speed refused with 400")
+
+    reader, writer = await client.websocket()
+    try:
+        await ws_send(writer, json.dumps({'text': "Hello.", 'speaker': 'nobody'}), mask=True)
+        error = json.loads(await ws_recv(reader))
+        assert error['event'] == 'error' and error['status'] == 400
+        await ws_send(writer, json.dumps({'text': TWO_SENTENCES}), mask=True)
+        start = json.loads(await ws_recv(reader))
+        assert start['event'] == 'start' and start['sample_rate'] == server.tts.sampling_rate
+        audio = 0
+        while True:
+            message = await ws_recv(reader, max_bytes=1 << 20)
+            if isinstance(message, str):
+                done = json.loads(message)
+                break
+            audio += len(message)
+        assert done['event'] == 'done' and done['sentences'] == 2 and audio > 0
+        print(f"✅ WebSocket stream: {audio // 2} samples in {done['sentences']} sentences")
+    finally:
+        writer.close()
+
+    assert (await client.request('DELETE', '/v1/voices/ref'))[0] == 204
+    ref_path = os.path.abspath(os.path.join(server.voices_dir, 'ref.wav'))
+    assert not any(key[0] == ref_path for key in server.tts._target_se_cache)
+    print("✅ Deleted voice evicted from the embedding cache")
+
+
+def test_tts_server():
+    """HTTP and WebSocket streams, voice upload and errors against an in-process server."""
+    try:
+        print("=== TTS Server Test ===")
+        from voice.openvoice_tts import OpenVoiceTTS
+        from services.tts_pool import TTSWorkerPool
+        from services.tts_server import TTSServer
+
+        with tempfile.TemporaryDirectory() as tmp:
+            root = make_checkpoints(os.path.join(tmp, 'checkpoints'), scale='tiny')
+            reference = make_reference_audio(os.path.join(tmp, 'reference.wav'))
+            pool = TTSWorkerPool(OpenVoiceTTS(device='cpu', checkpoints_dir=root))
+
+            async def run():
+                server = await TTSServer(pool, os.path.join(tmp, 'voices'), port=0).start()
+                try:
+                    await asyncio.wait_for(_exercise(server, reference), 120)
+                finally:
+                    await server.stop()
+
+            try:
+                asyncio.run(run())
+            finally:
+                pool.shutdown()
+    except Exception as e:
+        print(f"❌ TTS server test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+
+if __name__ == "__main__":
+    success = test_tts_server()
+    sys.exit(0 if success else 1)
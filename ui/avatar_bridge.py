@@ -0,0 +1,163 @@
+"""
+QWebChannel bridge between the app and the Live2D avatar page.
+
+Instead of compiling a JavaScript string for every update and polling page state with
+runJavaScript callbacks, the page connects to this object (registered as ``elpis``)
+and:
+
+- receives view parameters, lip-sync envelopes, volume, render policy and preview
+  zoom/reset as signals. Python coalesces updates and emits them at most once per
+  frame (FLUSH_INTERVAL_MS), so a burst of slider moves or chunk payloads costs one
+  message;
+- pushes its own state (preview drag offsets/layout, model ready, render stats) to
+  the report* slots when it changes, which Python keeps as the latest known values.
+
+When the page (re)connects it calls hello(), and the current state is sent again, so
+nothing set before the page finished loading is lost.
+"""
+import logging
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_OBJECT_NAME = 'elpis'
+FLUSH_INTERVAL_MS = 16  # one frame at 60 Hz
+
+
+class AvatarBridge(QObject):
+    """Typed state shared with the avatar page over QWebChannel."""
+
+    # --- Python -> page (connected to by the page's JavaScript) ---
+    viewParamsChanged = pyqtSignal('QVariantMap')
+    lipSyncBatch = pyqtSignal('QVariantList')
+    volumeChanged = pyqtSignal(float)
+    renderPolicyChanged = pyqtSignal('QVariantMap')
+    previewZoomChanged = pyqtSignal(float)
+    previewResetRequested = pyqtSignal()
+
+    # --- page -> Python (for the app) ---
+    connected = pyqtSignal()
+    model_ready = pyqtSignal(str)
+    preview_state_changed = pyqtSignal(dict)
+    render_stats = pyqtSignal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.view_params = {}
+        self.volume = None
+        self.render_policy = None
+        self.preview_zoom = None
+        self.preview_state = {}
+        self.model_name = None
+        self.is_connected = False
+
+        self._dirty = set()
+        self._lip_sync_queue = []
+        self._reset_pending = False
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+
+    # ---- updates from Python (batched) ----
+
+    def update_view_params(self, params: dict, replace: bool = False):
+        """Merge params (None values ignored) into the page's view parameters."""
+        if replace:
+            self.view_params = {}
+        self.view_params.update({k: v for k, v in (params or {}).items() if v is not None})
+        self._mark('view')
+
+    def remove_view_param(self, key: str):
+        if self.view_params.pop(key, None) is not None:
+            self._mark('view')
+
+    def queue_lip_sync(self, payload: dict):
+        """Queue one chunk's lip-sync payload (see voice.lip_sync.build_payload)."""
+        self._lip_sync_queue.append(payload)
+        self._schedule()
+
+    def set_volume(self, volume: float):
+        self.volume = float(volume)
+        self._mark('volume')
+
+    def set_render_policy(self, policy: dict):
+        self.render_policy = dict(policy)
+        self._mark('policy')
+
+    def set_preview_zoom(self, zoom: float):
+        self.preview_zoom = float(zoom)
+        self._mark('zoom')
+
+    def request_preview_reset(self):
+        self.preview_zoom = None
+        self._dirty.discard('zoom')
+        self._reset_pending = True
+        self._schedule()
+
+    def reset_page_state(self):
+        """Forget page-reported state (the page is navigating to another avatar)."""
+        self.view_params = {}
+        self.preview_state = {}
+        self.preview_zoom = None
+        self.model_name = None
+        self.is_connected = False
+        self._lip_sync_queue.clear()
+        self._dirty.discard('view')
+        self._dirty.discard('zoom')
+
+    def _mark(self, key: str):
+        self._dirty.add(key)
+        self._schedule()
+
+    def _schedule(self):
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        """Emit everything that changed since the last flush, once each."""
+        self._flush_timer.stop()
+        dirty, self._dirty = self._dirty, set()
+        if 'view' in dirty:
+            self.viewParamsChanged.emit(dict(self.view_params))
+        if 'policy' in dirty and self.render_policy is not None:
+            self.renderPolicyChanged.emit(dict(self.render_policy))
+        if 'volume' in dirty and self.volume is not None:
+            self.volumeChanged.emit(self.volume)
+        if self._reset_pending:
+            self._reset_pending = False
+            self.previewResetRequested.emit()
+        if 'zoom' in dirty and self.preview_zoom is not None:
+            self.previewZoomChanged.emit(self.preview_zoom)
+        if self._lip_sync_queue:
+            batch, self._lip_sync_queue = self._lip_sync_queue, []
+            self.lipSyncBatch.emit(batch)
+
+    # ---- calls from the page ----
+
+    @pyqtSlot()
+    def hello(self):
+        """The page connected (or reconnected after a reload): resend the current state."""
+        self.is_connected = True
+        self._dirty.update(k for k, v in (('view', self.view_params or None), ('policy', self.render_policy),
+                                          ('volume', self.volume), ('zoom', self.preview_zoom))
+                           if v is not None)
+        self.flush()
+        self.connected.emit()
+
+    @pyqtSlot(str)
+    def reportModelReady(self, name):
+        self.model_name = name
+        logger.info(f"[AvatarBridge] Model ready: {name}")
+        self.model_ready.emit(name)
+
+    @pyqtSlot('QVariantMap')
+    def reportPreviewState(self, state):
+        """Drag offsets, effective scale and root size of the preview (sent after drags/zoom/layout)."""
+        self.preview_state = dict(state or {})
+        self.preview_state_changed.emit(self.preview_state)
+
+    @pyqtSlot('QVariantMap')
+    def reportRenderStats(self, stats):
+        self.render_stats.emit(dict(stats or {}))
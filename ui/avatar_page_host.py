@@ -0,0 +1,188 @@
+"""
+One persistent Live2D avatar page shared by the setup preview and the chat screen.
+
+Loading the avatar page means downloading pixi.js, starting the Cubism WASM core and
+parsing the model, which takes seconds and a few hundred MB per web view. Instead of
+each screen creating its own QWebEngineView, both borrow the single view owned by
+AvatarPageHost: the setup screen uses it for the interactive preview, then the chat
+screen reparents it into its layout and only pushes new view parameters to the page.
+
+The view lives in a named QWebEngineProfile with a disk HTTP cache so the CDN script
+and compiled WASM are also reused across launches.
+"""
+import os
+import logging
+
+from PyQt5.QtCore import QObject, QUrl, Qt, QStandardPaths, pyqtSignal
+from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEngineProfile, QWebEnginePage
+from PyQt5.QtWebChannel import QWebChannel
+
+from .avatar_scheme import avatar_url, install_avatar_scheme
+from .avatar_bridge import AvatarBridge, CHANNEL_OBJECT_NAME
+from .avatar_render_policy import DIAGNOSTICS_ENABLED
+
+logger = logging.getLogger(__name__)
+
+PROFILE_NAME = 'peer-elpis-avatar'
+
+# Undo what the setup preview adds to the page (drag handlers, overlays) when the
+# view moves to the chat screen
+_LEAVE_PREVIEW_JS = """
+(function(){
+    try {
+        const model = window.avatarModel;
+        if (model) {
+            ['pointerdown','mousedown','pointermove','mousemove','pointerup',
+             'pointerupoutside','mouseup','mouseupoutside'].forEach(e => model.removeAllListeners(e));
+            model.interactive = false;
+        }
+        ['__avatar_debug_overlay', '__preview_drag_indicator'].forEach(id => {
+            const el = document.getElementById(id); if (el) el.remove();
+        });
+        window.originalModelScale = undefined;
+        window.originalModelPosition = undefined;
+        return true;
+    } catch(e) { return false; }
+})()
+"""
+
+_profile = None
+_host = None
+
+
+def shared_profile() -> QWebEngineProfile:
+    """The persistent web engine profile used for the avatar page (created on first use)."""
+    global _profile
+    if _profile is None:
+        base = QStandardPaths.writableLocation(QStandardPaths.CacheLocation) or os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), '.cache')
+        root = os.path.join(base, 'avatar_web')
+        os.makedirs(root, exist_ok=True)
+        _profile = QWebEngineProfile(PROFILE_NAME)
+        _profile.setCachePath(os.path.join(root, 'cache'))
+        _profile.setPersistentStoragePath(os.path.join(root, 'storage'))
+        _profile.setHttpCacheType(QWebEngineProfile.DiskHttpCache)
+        _profile.setHttpCacheMaximumSize(128 * 1024 * 1024)
+        install_avatar_scheme(_profile)
+    return _profile
+
+
+class AvatarPageHost(QObject):
+    """
+    Owns the shared avatar QWebEngineView and the state of the page loaded in it.
+
+    Screens call attach() to take the view into their layout; load() only navigates
+    when the avatar itself changes, everything else goes through the page's
+    AvatarBridge (``bridge``), which is published to the page over QWebChannel.
+    """
+
+    # emitted once the page for the current avatar has finished loading
+    page_ready = pyqtSignal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._view = None
+        self._avatar_name = None
+        self._loading = False
+        self._loaded = False
+        self.bridge = AvatarBridge(self)
+        self._channel = None
+
+    def view(self) -> QWebEngineView:
+        """The shared view, created on first use."""
+        if self._view is None:
+            view = QWebEngineView()
+            page = QWebEnginePage(shared_profile(), view)
+            self._channel = QWebChannel(page)
+            self._channel.registerObject(CHANNEL_OBJECT_NAME, self.bridge)
+            page.setWebChannel(self._channel)
+            view.setPage(page)
+            view.setContextMenuPolicy(Qt.NoContextMenu)
+            view.loadStarted.connect(self._on_load_started)
+            view.loadFinished.connect(self._on_load_finished)
+            self._view = view
+        return self._view
+
+    @property
+    def avatar_name(self):
+        return self._avatar_name
+
+    def is_ready(self) -> bool:
+        """True once the current avatar's page has loaded."""
+        return self._loaded and not self._loading
+
+    def attach(self, layout, **kwargs) -> QWebEngineView:
+        """Reparent the shared view into layout (keeps the page, its model and its GPU context)."""
+        view = self.view()
+        layout.addWidget(view, **kwargs)
+        view.show()
+        return view
+
+    def detach(self):
+        """Take the view out of its current parent without destroying it."""
+        if self._view is not None:
+            self._view.setParent(None)
+
+    def load(self, avatar_name: str, view_mode: str = None, debug: bool = False, force: bool = False):
+        """
+        Show avatar_name. Navigates only if a different avatar (or nothing) is loaded;
+        otherwise the view mode is applied to the running page.
+        """
+        if not force and avatar_name == self._avatar_name and (self._loaded or self._loading):
+            self.apply_view_params({'view': view_mode, 'debug': bool(debug)} if view_mode else {'debug': bool(debug)})
+            return False
+        self._avatar_name = avatar_name
+        self.bridge.reset_page_state()
+        url = avatar_url(avatar=avatar_name, view=view_mode, debug=1 if debug else None,
+                         diag=1 if DIAGNOSTICS_ENABLED else None)
+        logger.info(f"[AvatarPageHost] Loading {url}")
+        self.view().load(QUrl(url))
+        return True
+
+    def show_html(self, html: str):
+        """Replace the page with static HTML (e.g. a placeholder); the next load() navigates again."""
+        self._avatar_name = None
+        self.bridge.reset_page_state()
+        self.view().setHtml(html)
+
+    def apply_view_params(self, params: dict, replace: bool = False):
+        """
+        Merge params into the page's window._externalViewParams and re-run its layout.
+
+        Values of None are ignored; with replace=True earlier params are dropped first.
+        Sent through the bridge, coalesced to one update per frame.
+        """
+        self.bridge.update_view_params(params, replace=replace)
+
+    def leave_preview(self):
+        """Remove preview-only interaction and overlays from the page."""
+        self.bridge.remove_view_param('debug')
+        self.run_js(_LEAVE_PREVIEW_JS)
+
+    def run_js(self, code: str, callback=None):
+        if self._view is None:
+            return
+        try:
+            if callback is None:
+                self._view.page().runJavaScript(code)
+            else:
+                self._view.page().runJavaScript(code, callback)
+        except Exception as e:
+            logger.warning(f"[AvatarPageHost] runJavaScript failed: {e}")
+
+    def _on_load_started(self):
+        self._loading = True
+        self._loaded = False
+
+    def _on_load_finished(self, ok: bool):
+        self._loading = False
+        self._loaded = bool(ok)
+        self.page_ready.emit(bool(ok))
+
+
+def avatar_page_host() -> AvatarPageHost:
+    """Process-wide AvatarPageHost."""
+    global _host
+    if _host is None:
+        _host = AvatarPageHost()
+    return _host
@@ -0,0 +1,126 @@
+"""
+Render policy for the Live2D avatar page.
+
+The page's PIXI ticker would otherwise render at the display rate all the time, and
+the Chromium renderer process competes with TTS synthesis for CPU. AvatarRenderPolicy
+decides the page's mode from app state (window visibility, synthesis running) and
+pushes it over the page's AvatarBridge (window.setRenderPolicy() on the page); the
+page itself switches to the full rate only while a lip-sync envelope is playing and
+reports the frame rate it actually achieves back through the bridge.
+"""
+import os
+import logging
+
+from PyQt5.QtCore import QObject, QEvent, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_FPS = 60   # mouth animating
+IDLE_FPS = 15     # idle/breathing motion only
+SYNTH_FPS = 20    # cap while synthesis is running
+
+# Set ELPIS_AVATAR_DIAG=1 to load the page with its fetch/WASM diagnostic logging
+DIAGNOSTICS_ENABLED = os.environ.get('ELPIS_AVATAR_DIAG', '') not in ('', '0', 'false', 'False')
+
+MODE_IDLE = 'idle'
+MODE_SYNTH = 'synth'
+MODE_HIDDEN = 'hidden'
+
+
+class AvatarRenderPolicy(QObject):
+    """
+    Keeps the avatar page's frame rate in line with what the app is doing.
+
+    Call watch() with the widget showing the avatar so hiding/minimizing its window
+    pauses rendering; connect synthesis state with set_synthesizing() (or
+    on_speaking_progress/on_speaking_finished from VoiceEngineService).
+    """
+
+    # stats dict from the page: fps, targetFps, mode, lipSync, pageHidden
+    stats_updated = pyqtSignal(dict)
+
+    def __init__(self, page_host, active_fps: int = ACTIVE_FPS, idle_fps: int = IDLE_FPS,
+                 synth_fps: int = SYNTH_FPS, parent=None):
+        super().__init__(parent)
+        self._host = page_host
+        self.active_fps = active_fps
+        self.idle_fps = idle_fps
+        self.synth_fps = synth_fps
+        self._visible = True
+        self._synthesizing = False
+        self._watched = None
+        self.last_stats = {}
+
+        # The bridge resends the policy whenever the page (re)connects
+        self._host.bridge.render_stats.connect(self._on_stats)
+        self.apply()
+
+    @property
+    def mode(self) -> str:
+        if not self._visible:
+            return MODE_HIDDEN
+        if self._synthesizing:
+            return MODE_SYNTH
+        return MODE_IDLE
+
+    def policy(self) -> dict:
+        """The dict passed to window.setRenderPolicy()."""
+        return {
+            'mode': self.mode,
+            'activeFps': self.active_fps,
+            'idleFps': self.idle_fps,
+            'synthFps': self.synth_fps,
+        }
+
+    def apply(self):
+        """Push the current policy to the page."""
+        self._host.bridge.set_render_policy(self.policy())
+
+    def set_visible(self, visible: bool):
+        if bool(visible) != self._visible:
+            self._visible = bool(visible)
+            self.apply()
+
+    def set_synthesizing(self, synthesizing: bool):
+        if bool(synthesizing) != self._synthesizing:
+            self._synthesizing = bool(synthesizing)
+            self.apply()
+
+    def on_speaking_progress(self, info: dict):
+        """Slot for VoiceEngineService.speaking_progress: cap rendering while a chunk is synthesized."""
+        event = (info or {}).get('event')
+        if event == 'synth_start':
+            self.set_synthesizing(True)
+        elif event in ('audio_start', 'audio_end'):
+            self.set_synthesizing(False)
+
+    def on_speaking_finished(self, *args):
+        """Slot for VoiceEngineService.speaking_finished."""
+        self.set_synthesizing(False)
+
+    def watch(self, widget):
+        """Pause rendering whenever widget's top-level window is hidden or minimized."""
+        window = widget.window()
+        if self._watched is not None:
+            self._watched.removeEventFilter(self)
+        self._watched = window
+        window.installEventFilter(self)
+        self._update_visibility()
+
+    def eventFilter(self, obj, event):
+        if obj is self._watched and event.type() in (QEvent.Show, QEvent.Hide, QEvent.WindowStateChange):
+            self._update_visibility()
+        return False
+
+    def _update_visibility(self):
+        window = self._watched
+        if window is None:
+            return
+        self.set_visible(window.isVisible() and not window.isMinimized())
+
+    def _on_stats(self, stats):
+        if not isinstance(stats, dict):
+            return
+        self.last_stats = stats
+        logger.debug(f"[AvatarRender] {stats}")
+        self.stats_updated.emit(stats)
@@ -0,0 +1,251 @@
+"""
+In-process ``elpis://avatar/...`` URL scheme for the Live2D page and its assets.
+
+The avatar page, the Cubism core/adapter scripts and every model, motion and
+expression file are served straight from an in-memory byte cache by a
+QWebEngineUrlSchemeHandler, so no local HTTP server, socket or port is needed and
+reloading the page (e.g. when the preview switches view mode) only re-reads files
+that changed on disk. Requests for ``<id>/<id>.bundle.json.gz`` (the precompressed
+JSON bundle the page loads the model from, see config/avatar_bundle.py) build or
+refresh the bundle first.
+
+The scheme must be registered with register_avatar_scheme() before the
+QApplication is created; install_avatar_scheme() then attaches the handler to a
+web engine profile.
+"""
+import os
+import mimetypes
+import threading
+import logging
+from urllib.parse import urlencode, unquote
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QFile
+
+try:
+    from PyQt5.QtWebEngineCore import (QWebEngineUrlScheme, QWebEngineUrlSchemeHandler,
+                                       QWebEngineUrlRequestJob)
+except Exception:  # QtWebEngine not available (e.g. chat-only installs)
+    QWebEngineUrlScheme = QWebEngineUrlSchemeHandler = QWebEngineUrlRequestJob = None
+
+from config.avatar_bundle import BUNDLE_SUFFIX, ensure_bundle
+
+logger = logging.getLogger(__name__)
+
+SCHEME = 'elpis'
+HOST = 'avatar'
+AVATAR_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets', 'avatar'))
+
+# Types the browser cares about that mimetypes gets wrong or does not know
+_MIME_OVERRIDES = {
+    '.html': 'text/html',
+    '.js': 'text/javascript',
+    '.mjs': 'text/javascript',
+    '.json': 'application/json',
+    '.map': 'application/json',
+    '.wasm': 'application/wasm',
+    '.moc3': 'application/octet-stream',
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.webp': 'image/webp',
+    '.css': 'text/css',
+    '.txt': 'text/plain',
+    '.gz': 'application/gzip',
+}
+
+
+def guess_mime_type(path: str) -> str:
+    """MIME type for an avatar asset path."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in _MIME_OVERRIDES:
+        return _MIME_OVERRIDES[ext]
+    return mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+
+def avatar_url(path: str = 'index.html', **query) -> str:
+    """
+    Build an ``elpis://avatar/`` URL, e.g. avatar_url(avatar='ANIYA', view='full').
+
+    Query values of None are dropped.
+    """
+    url = f"{SCHEME}://{HOST}/{path.lstrip('/')}"
+    params = {k: v for k, v in query.items() if v is not None}
+    if params:
+        url += '?' + urlencode(params)
+    return url
+
+
+class AvatarAssetCache:
+    """
+    Thread-safe byte cache for files under the avatar root.
+
+    Entries are keyed by relative path and revalidated against the file's mtime and
+    size on every lookup (one stat call), so edits and newly imported avatars show up
+    without a restart. Least recently used files are evicted once max_bytes is exceeded.
+    """
+
+    def __init__(self, root: str = AVATAR_ROOT, max_bytes: int = 256 * 1024 * 1024):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self._entries = {}  # rel path -> (data, mtime_ns, size); dict order = LRU order
+        self._total = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, rel_path: str):
+        """Absolute path for rel_path, or None if it escapes the root."""
+        rel_path = unquote(rel_path).lstrip('/')
+        full = os.path.abspath(os.path.join(self.root, rel_path))
+        if full != self.root and not full.startswith(self.root + os.sep):
+            return None
+        return full
+
+    def get(self, rel_path: str):
+        """
+        Bytes of the file at rel_path (relative to the root).
+
+        Returns None if the path is outside the root or not a readable file.
+        """
+        full = self.resolve(rel_path)
+        if full is None:
+            return None
+        try:
+            st = os.stat(full)
+        except OSError:
+            return None
+        if not os.path.isfile(full):
+            return None
+
+        key = os.path.relpath(full, self.root)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                if entry[1] == st.st_mtime_ns and entry[2] == st.st_size:
+                    self._entries[key] = entry
+                    self.hits += 1
+                    return entry[0]
+                self._total -= len(entry[0])
+
+        try:
+            with open(full, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            logger.warning(f"[AvatarScheme] Could not read {full}: {e}")
+            return None
+
+        with self._lock:
+            self.misses += 1
+            if len(data) <= self.max_bytes:
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self._total -= len(old[0])
+                self._entries[key] = (data, st.st_mtime_ns, st.st_size)
+                self._total += len(data)
+                while self._total > self.max_bytes and self._entries:
+                    oldest = next(iter(self._entries))
+                    self._total -= len(self._entries.pop(oldest)[0])
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._total
+
+
+# Files served from Qt's resources rather than the avatar folder
+_QT_RESOURCES = {
+    '/qwebchannel.js': ':/qtwebchannel/qwebchannel.js',
+}
+_resource_cache = {}
+
+
+def _qt_resource(path: str):
+    if path not in _resource_cache:
+        f = QFile(_QT_RESOURCES[path])
+        if not f.open(QIODevice.ReadOnly):
+            return None
+        _resource_cache[path] = bytes(f.readAll())
+        f.close()
+    return _resource_cache[path]
+
+
+_HandlerBase = QWebEngineUrlSchemeHandler if QWebEngineUrlSchemeHandler is not None else object
+
+
+class AvatarSchemeHandler(_HandlerBase):
+    """Answers elpis://avatar/<path> requests from an AvatarAssetCache."""
+
+    def __init__(self, cache: AvatarAssetCache = None, parent=None):
+        super().__init__(parent)
+        self.cache = cache or AvatarAssetCache()
+
+    def requestStarted(self, job):
+        try:
+            url = job.requestUrl()
+            if url.host() != HOST:
+                job.fail(QWebEngineUrlRequestJob.UrlNotFound)
+                return
+            path = url.path() or '/'
+            if path.endswith('/'):
+                path += 'index.html'
+            if path.endswith(BUNDLE_SUFFIX):
+                full = self.cache.resolve(path)
+                if full is not None and os.path.isdir(os.path.dirname(full)):
+                    ensure_bundle(os.path.dirname(full))
+            data = _qt_resource(path) if path in _QT_RESOURCES else self.cache.get(path)
+            if data is None:
+                logger.warning(f"[AvatarScheme] Not found: {url.toString()}")
+                job.fail(QWebEngineUrlRequestJob.UrlNotFound)
+                return
+
+            # The buffer is parented to the job so it lives exactly as long as the reply
+            buffer = QBuffer(job)
+            buffer.setData(QByteArray(data))
+            buffer.open(QIODevice.ReadOnly)
+            job.reply(guess_mime_type(path).encode('ascii'), buffer)
+        except Exception as e:
+            logger.error(f"[AvatarScheme] Request failed: {e}")
+            try:
+                job.fail(QWebEngineUrlRequestJob.RequestFailed)
+            except Exception:
+                pass
+
+
+_registered = False
+_handler = None
+
+
+def register_avatar_scheme():
+    """Declare the elpis scheme to Chromium. Must run before QApplication is created."""
+    global _registered
+    if _registered or QWebEngineUrlScheme is None:
+        return
+    scheme = QWebEngineUrlScheme(SCHEME.encode('ascii'))
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    scheme.setDefaultPort(QWebEngineUrlScheme.PortUnspecified)
+    # Secure + CORS so fetch()/WebAssembly and the https CDN script behave like on http(s)
+    scheme.setFlags(QWebEngineUrlScheme.SecureScheme
+                    | QWebEngineUrlScheme.CorsEnabled
+                    | QWebEngineUrlScheme.LocalAccessAllowed
+                    | QWebEngineUrlScheme.ContentSecurityPolicyIgnored)
+    QWebEngineUrlScheme.registerScheme(scheme)
+    _registered = True
+
+
+def install_avatar_scheme(profile=None):
+    """Attach the shared scheme handler to profile (default profile if None). Safe to call repeatedly."""
+    global _handler
+    if QWebEngineUrlSchemeHandler is None:
+        return None
+    from PyQt5.QtWebEngineWidgets import QWebEngineProfile
+    profile = profile or QWebEngineProfile.defaultProfile()
+    if _handler is None:
+        _handler = AvatarSchemeHandler()
+    if profile.urlSchemeHandler(QByteArray(SCHEME.encode('ascii'))) is None:
+        profile.installUrlSchemeHandler(SCHEME.encode('ascii'), _handler)
+    return _handler
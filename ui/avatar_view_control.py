@@ -6,12 +6,13 @@ import os
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSlider, QPushButton, 
     QGroupBox, QFrame, QSpinBox, QCheckBox, QComboBox, QGridLayout, QSplitter,
-    QLineEdit, QMessageBox, QFileDialog
+    QLineEdit, QMessageBox, QFileDialog, QProgressDialog
 )
-from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QUrl
+from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon
-from PyQt5.QtWebEngineWidgets import QWebEngineView
-from config.avatar_config import AvatarConfig
+from config.avatar_config import avatar_config
+from .avatar_page_host import avatar_page_host
+from services.avatar_import import AvatarImporter, find_model_file
 
 
 class AvatarViewControl(QWidget):
@@ -38,7 +39,8 @@ class AvatarViewControl(QWidget):
         # Avatar configuration
         self.avatar_name = avatar_name
         self.chatbot_name = "AI Assistant"  # Default chatbot name
-        self.avatar_config = AvatarConfig()  # Load available avatars
+        self.avatar_config = avatar_config  # Shared, index-backed avatar catalog
+        self.avatar_config.refresh()
         
         # Default view settings for interactive dragging
         self.zoom_level = 100  # percentage
@@ -114,7 +116,14 @@ class AvatarViewControl(QWidget):
         preview_layout.addWidget(preview_title)
         
         # Create preview avatar - much larger and centered
-        self.preview_webview = QWebEngineView()
+        # The preview borrows the app-wide avatar view; the chat screen takes it over
+        # afterwards so the model is only loaded and initialized once
+        self._page_host = avatar_page_host()
+        self.preview_webview = self._page_host.view()
+        self._page_host.page_ready.connect(self._on_preview_loaded)
+        # Drag offsets/framing are pushed by the page over the bridge after every drag or zoom
+        self._bridge = self._page_host.bridge
+        self._bridge.preview_state_changed.connect(self._on_preview_state_changed)
         self.preview_webview.setMinimumSize(400, 500)  # Larger minimum size
         self.preview_webview.setStyleSheet("""
             border: 2px solid #bdc3c7; 
@@ -519,7 +528,7 @@ class AvatarViewControl(QWidget):
         </body>
         </html>
         """
-        self.preview_webview.setHtml(html_content)
+        self._page_host.show_html(html_content)
     
     def _upload_avatar_model(self):
         """Open file dialog to select and import a Live2D avatar model folder."""
@@ -535,10 +544,7 @@ class AvatarViewControl(QWidget):
             self._import_avatar_from_folder(folder_path)
     
     def _import_avatar_from_folder(self, source_folder):
-        """Import avatar model from a selected folder."""
-        import shutil
-        import os
-        
+        """Import avatar model from a selected folder (copied in the background)."""
         try:
             # Get folder name for avatar ID
             folder_name = os.path.basename(source_folder.rstrip('/\\'))
@@ -547,8 +553,7 @@ class AvatarViewControl(QWidget):
                 return
             
             # Check if folder contains a .model3.json file
-            model_files = [f for f in os.listdir(source_folder) if f.endswith('.model3.json')]
-            if not model_files:
+            if not find_model_file(source_folder):
                 QMessageBox.warning(
                     self, 
                     "Invalid Avatar Model", 
@@ -557,11 +562,8 @@ class AvatarViewControl(QWidget):
                 )
                 return
             
-            # Destination folder
-            assets_avatar_dir = os.path.join(os.getcwd(), 'assets', 'avatar')
-            dest_folder = os.path.join(assets_avatar_dir, folder_name)
-            
-            # Check if avatar already exists
+            # Check if avatar already exists (it is only replaced once the new copy is complete)
+            dest_folder = os.path.join(self.avatar_config.avatar_dir, folder_name)
             if os.path.exists(dest_folder):
                 reply = QMessageBox.question(
                     self,
@@ -573,26 +575,20 @@ class AvatarViewControl(QWidget):
                 )
                 if reply == QMessageBox.No:
                     return
-                    
-                # Remove existing folder
-                shutil.rmtree(dest_folder)
-            
-            # Copy the entire folder
-            shutil.copytree(source_folder, dest_folder)
             
-            QMessageBox.information(
-                self,
-                "Avatar Added Successfully",
-                f"Avatar '{folder_name}' has been added successfully!\n\n"
-                f"Location: assets/avatar/{folder_name}/\n"
-                f"Model files: {len(model_files)} found"
-            )
+            if not hasattr(self, '_importer'):
+                self._importer = AvatarImporter(self.avatar_config.avatar_dir, parent=self)
+                self._importer.progress.connect(self._on_import_progress)
+                self._importer.finished.connect(self._on_import_finished)
+                self._importer.failed.connect(self._on_import_failed)
+                self._importer.cancelled.connect(self._on_import_cancelled)
             
-            # Refresh the avatar list
-            self._refresh_avatars()
-            
-            # Select the newly added avatar
-            self.avatar_dropdown.setCurrentText(folder_name)
+            self._import_dialog = QProgressDialog(f"Importing '{folder_name}'...", "Cancel", 0, 1000, self)
+            self._import_dialog.setWindowTitle("Importing Avatar")
+            self._import_dialog.setWindowModality(Qt.WindowModal)
+            self._import_dialog.setMinimumDuration(300)
+            self._import_job = self._importer.submit(source_folder, folder_name)
+            self._import_dialog.canceled.connect(lambda: self._importer.cancel(self._import_job))
             
         except Exception as e:
             QMessageBox.critical(
@@ -601,6 +597,53 @@ class AvatarViewControl(QWidget):
                 f"Failed to import avatar model:\n\n{str(e)}"
             )
     
+    def _on_import_progress(self, job_id, current_file, done, total):
+        """Per-chunk progress from the import job."""
+        if job_id != getattr(self, '_import_job', None) or not hasattr(self, '_import_dialog'):
+            return
+        self._import_dialog.setValue(int(1000 * done / total) if total else 0)
+        self._import_dialog.setLabelText(f"Importing {current_file}\n{done / 1e6:.1f} / {total / 1e6:.1f} MB")
+    
+    def _end_import(self):
+        if hasattr(self, '_import_dialog'):
+            self._import_dialog.reset()
+            self._import_dialog.deleteLater()
+            del self._import_dialog
+    
+    def _on_import_finished(self, job_id, result):
+        """Import complete: update the catalog (only the new avatar is read) and select it."""
+        self._end_import()
+        methods = result.get('methods', {})
+        print(f"✅ Imported avatar {result['avatar_id']}: {result['files']} files, "
+              f"{result['bytes'] / 1e6:.1f} MB in {result['elapsed']:.2f}s {methods}")
+        warnings = result.get('warnings') or []
+        QMessageBox.information(
+            self,
+            "Avatar Added Successfully",
+            f"Avatar '{result['avatar_id']}' has been added successfully!\n\n"
+            f"Location: {result['path']}\n"
+            f"Model file: {result['model_file']}"
+            + ("\n\nWarnings:\n" + "\n".join(warnings[:10]) if warnings else "")
+        )
+        
+        # Refresh the avatar list
+        self._refresh_avatars()
+        
+        # Select the newly added avatar
+        self.avatar_dropdown.setCurrentText(result['avatar_id'])
+    
+    def _on_import_failed(self, job_id, message):
+        self._end_import()
+        QMessageBox.critical(
+            self,
+            "Import Error",
+            f"Failed to import avatar model:\n\n{message}"
+        )
+    
+    def _on_import_cancelled(self, job_id):
+        self._end_import()
+        print("⚠ Avatar import cancelled")
+    
     def _show_add_avatar_help(self):
         """Show instructions for adding new avatar models."""
         help_text = """<h3>🎭 How to Add Live2D Avatar Models</h3>
@@ -641,8 +684,8 @@ class AvatarViewControl(QWidget):
         """Refresh the avatar list and dropdown."""
         print("🔄 Refreshing avatar list...")
         
-        # Reload avatar configuration
-        self.avatar_config = AvatarConfig()
+        # Re-check the avatar folder; only changed avatars are re-read
+        self.avatar_config.refresh()
         
         # Remember current selection if possible
         current_selection = None
@@ -671,36 +714,9 @@ class AvatarViewControl(QWidget):
     def _reset_preview_position(self):
         """Reset the Live2D model position and scale in the preview."""
         try:
-            if hasattr(self, 'preview_webview'):
-                js_reset = """
-                (function() {
-                    if (!window.avatarModel || !window.originalModelPosition || !window.originalModelScale) {
-                        console.log('Cannot reset - model or original values not available');
-                        return false;
-                    }
-                    
-                    const model = window.avatarModel;
-                    
-                    // Reset position to original
-                    model.position.set(
-                        window.originalModelPosition.x,
-                        window.originalModelPosition.y
-                    );
-                    
-                    // Reset scale to original
-                    model.scale.set(
-                        window.originalModelScale.x,
-                        window.originalModelScale.y
-                    );
-                    
-                    console.log('Reset Live2D model to original position and scale');
-                    return true;
-                })()
-                """
-                self.preview_webview.page().runJavaScript(js_reset)
-                
-                # Also update the zoom display
-                self.zoom_slider.setValue(100)
+            self._bridge.request_preview_reset()
+            # Also update the zoom display
+            self.zoom_slider.setValue(100)
         except Exception as e:
             print(f"Error resetting preview position: {e}")
     
@@ -729,68 +745,28 @@ class AvatarViewControl(QWidget):
     def _capture_current_position(self):
         """Capture the current Live2D model position before transitioning to chat."""
         try:
-            # Wait for the page's avatarModel to initialize and return a full layout debug object
-            js_code = """
-            (async function(){
-                try{
-                    const wait = (ms)=>new Promise(r=>setTimeout(r,ms));
-                    let tries = 0;
-                    while((!window.avatarModel || !window.avatarModel.position || !window.avatarModel.scale) && tries < 30){
-                        if(typeof window._layoutModel === 'function') try{ window._layoutModel(); }catch(e){}
-                        await wait(100);
-                        tries++;
-                    }
-                    const model = window.avatarModel || null;
-                    const original = window.originalModelPosition || null;
-                    const root = document.getElementById('avatar-root');
-                    let rootW = null, rootH = null;
-                    try{ if(root){ const b = root.getBoundingClientRect(); rootW = Math.round(b.width); rootH = Math.round(b.height);} }catch(e){}
-
-                    // Try to compute preview center similar to layoutModel
-                    let previewCenterX = null, previewCenterY = null;
-                    try{
-                        if(model && model.parent){
-                            const app = model.parent;
-                            const isSmallCanvas = Math.min(app.renderer.width, app.renderer.height) < 420;
-                            const viewMode = (new URLSearchParams(window.location.search).get('view')) || '';
-                            const yNudgeFactor = (viewMode === 'upper') ? (isSmallCanvas ? 0.56 : 0.60) : 0.48;
-                            const basePosX = app.renderer.width / 2;
-                            const basePosY = app.renderer.height * yNudgeFactor;
-                            if(original){
-                                previewCenterX = Math.round(basePosX + (model.position.x - original.x));
-                                previewCenterY = Math.round(basePosY + (model.position.y - original.y));
-                            }
-                        }
-                    }catch(e){}
-
-                    const dbg = (function(){
-                        try{
-                            const d = window.__lastLayoutDebug || null;
-                            return {
-                                x: (model && original)? (model.position.x - original.x) : 0,
-                                y: (model && original)? (model.position.y - original.y) : 0,
-                                previewCenterX: previewCenterX,
-                                previewCenterY: previewCenterY,
-                                previewScaleX: model? (model.scale? model.scale.x : null) : null,
-                                previewScaleY: model? (model.scale? model.scale.y : null) : null,
-                                previewRootWidth: rootW,
-                                previewRootHeight: rootH,
-                                layoutDebug: d
-                            };
-                        }catch(e){ return { x:0,y:0, previewCenterX:null, previewCenterY:null, previewScaleX:null, previewScaleY:null, previewRootWidth:rootW, previewRootHeight:rootH, layoutDebug:null }; }
-                    })();
-
-                    return dbg;
-                }catch(e){ return { x:0,y:0, previewCenterX:null, previewCenterY:null, previewScaleX:null, previewScaleY:null, previewRootWidth:null, previewRootHeight:null, layoutDebug:null }; }
-            })()
-            """
-            self.preview_webview.page().runJavaScript(js_code, self._on_position_captured)
-            
+            state = self._bridge.preview_state
+            if state:
+                # Already pushed by the page after the last drag/zoom/layout
+                self._on_position_captured(dict(state))
+            else:
+                # Bridge not connected (or model not reported yet): ask the page once
+                self._page_host.run_js(
+                    "(function(){ try { return window.capturePreviewState ? window.capturePreviewState() : null; } "
+                    "catch(e) { return null; } })()",
+                    self._on_position_captured)
         except Exception as e:
             print(f"Error capturing position: {e}")
             # If capture fails, proceed anyway
             self.view_setup_complete.emit()
     
+    def _on_preview_state_changed(self, state):
+        """Keep the drag offsets in sync with the preview as the page reports them."""
+        if not self.isAncestorOf(self.preview_webview):
+            return
+        self.drag_offset_x = state.get('x', 0) or 0
+        self.drag_offset_y = state.get('y', 0) or 0
+    
     def _on_position_captured(self, result):
         """Handle the captured position result and proceed to chat."""
         try:
@@ -874,36 +850,11 @@ class AvatarViewControl(QWidget):
         }
     
     def _get_current_drag_offsets(self):
-        """Get current drag offsets from the preview webview."""
-        try:
-            # JavaScript to get current Live2D model position relative to original
-            js_code = """
-            (function() {
-                if (!window.avatarModel || !window.originalModelPosition) {
-                    return {x: 0, y: 0};
-                }
-                
-                const model = window.avatarModel;
-                const original = window.originalModelPosition;
-                
-                return {
-                    x: model.position.x - original.x,
-                    y: model.position.y - original.y
-                };
-            })()
-            """
-            
-            # Use callback to get the result asynchronously
-            def handle_offsets(result):
-                if result and isinstance(result, dict):
-                    self.drag_offset_x = result.get('x', 0)
-                    self.drag_offset_y = result.get('y', 0)
-            
-            self.preview_webview.page().runJavaScript(js_code, handle_offsets)
-        except Exception as e:
-            print(f"Error getting current drag offsets: {e}")
-        
-        # Return current stored offsets (will be updated by callback)
+        """Get current drag offsets from the preview (latest values pushed by the page)."""
+        state = self._bridge.preview_state
+        if state:
+            self.drag_offset_x = state.get('x', 0) or 0
+            self.drag_offset_y = state.get('y', 0) or 0
         return self.drag_offset_x, self.drag_offset_y
     
     def apply_view_settings(self, settings):
@@ -941,15 +892,15 @@ class AvatarViewControl(QWidget):
             print(f"🎭 Loading preview for avatar: {self.avatar_name}")
             # Always load full body view for interactive dragging
             # Enable debug overlay in preview (temporary diagnostic) so we can compare layout values
-            url = f"http://localhost:8080/index.html?avatar={self.avatar_name}&view=full&debug=1"
-            self.preview_webview.load(QUrl(url))
-            self.preview_webview.loadFinished.connect(self._on_preview_loaded)
+            if not self._page_host.load(self.avatar_name, view_mode='full', debug=True) and self._page_host.is_ready():
+                # Same avatar already running in the shared page: no reload, just re-arm the preview
+                self._on_preview_loaded(True)
         except Exception as e:
             print(f"Error loading preview avatar: {e}")
     
     def _on_preview_loaded(self, ok):
         """Called when preview avatar is loaded."""
-        if ok:
+        if ok and self.isAncestorOf(self.preview_webview):  # the chat screen may own the view by now
             # Enable interactive dragging on the preview
             self._setup_interactive_preview()
             # Apply current zoom settings
@@ -1098,6 +1049,8 @@ class AvatarViewControl(QWidget):
                     }
                     
                     dragData = null;
+                    // Push the new offsets to the app (no polling needed)
+                    if (typeof window.reportPreviewState === 'function') window.reportPreviewState();
                 }
                 
                 // Bind interaction events with error handling
@@ -1143,6 +1096,7 @@ class AvatarViewControl(QWidget):
                 indicator.style.fontSize = '10px';
                 indicator.style.borderRadius = '3px';
                 indicator.style.zIndex = '1000';
+                indicator.id = '__preview_drag_indicator';
                 indicator.textContent = 'DRAG MODEL';
                 document.body.appendChild(indicator);
             } catch (e) {
@@ -1165,52 +1119,14 @@ class AvatarViewControl(QWidget):
     def _update_preview(self):
         """Update the preview avatar Live2D model with current zoom level."""
         try:
-            zoom = self.zoom_level / 100.0
-            
-            # JavaScript to apply zoom directly to the Live2D model
-            js_code = f"""
-            (function() {{
-                // Wait for Live2D model to be available
-                if (!window.avatarModel || !window.avatarModel.scale) {{
-                    console.log('Live2D model not ready for zoom update');
-                    return false;
-                }}
-                
-                const model = window.avatarModel;
-                
-                // Store original scale if not already stored
-                if (!window.originalModelScale) {{
-                    window.originalModelScale = {{
-                        x: model.scale.x,
-                        y: model.scale.y
-                    }};
-                    console.log('Stored original model scale:', window.originalModelScale);
-                }}
-                
-                // Apply zoom to Live2D model scale
-                const newScale = window.originalModelScale.x * {zoom};
-                model.scale.set(newScale, newScale);
-                
-                console.log('Applied zoom to Live2D model:', newScale);
-                return true;
-            }})()
-            """
-            
-            self.preview_webview.page().runJavaScript(js_code, self._on_zoom_applied)
-            
+            # Coalesced per frame by the bridge; the page applies it once the model is ready
+            self._bridge.set_preview_zoom(self.zoom_level / 100.0)
         except Exception as e:
             print(f"Error updating preview zoom: {e}")
     
-    def _on_zoom_applied(self, result):
-        """Handle zoom application result."""
-        if not result:
-            # If model isn't ready, retry after a short delay
-            QTimer.singleShot(200, self._update_preview)
-    
     def _reload_preview_with_view_mode(self):
-        """Reload preview with new view mode."""
+        """Switch the preview to the new view mode (applied to the running page, no reload)."""
         try:
-            url = f"http://localhost:8080/index.html?avatar={self.avatar_name}&view={self.view_mode}"
-            self.preview_webview.load(QUrl(url))
+            self._page_host.load(self.avatar_name, view_mode=self.view_mode)
         except Exception as e:
             print(f"Error reloading preview: {e}")
@@ -2,8 +2,9 @@ import os
 import json
 import time
 from PyQt5.QtWidgets import QFrame, QVBoxLayout
-from PyQt5.QtCore import QTimer, Qt, QUrl
-from PyQt5.QtWebEngineWidgets import QWebEngineView
+from PyQt5.QtCore import QTimer, QUrl
+from .avatar_page_host import avatar_page_host
+from .avatar_render_policy import AvatarRenderPolicy
 
 
 class AvatarWidget(QFrame):
@@ -20,20 +21,30 @@ class AvatarWidget(QFrame):
         self.setLayout(QVBoxLayout())
         self.layout().setContentsMargins(0, 0, 0, 0)
 
-        self.webview = QWebEngineView()
-        self.webview.setContextMenuPolicy(Qt.NoContextMenu)
-        self.layout().addWidget(self.webview)
+        # Take over the shared avatar view (already showing the model if the setup
+        # preview loaded it) instead of starting a second page
+        self._page_host = avatar_page_host()
+        self.webview = self._page_host.attach(self.layout())
+        self.webview.setMinimumSize(0, 0)
+        self.webview.setStyleSheet("")
+        self._page_host.leave_preview()
+        # Frame-rate policy for the page (idle/synthesis caps, paused while hidden)
+        self.render_policy = AvatarRenderPolicy(self._page_host, parent=self)
 
-        url = self.view_settings.get('avatar_page_url') or 'http://localhost:8080/index.html'
         try:
-            self.webview.load(QUrl(url))
+            url = self.view_settings.get('avatar_page_url')
+            if url:
+                self.webview.load(QUrl(url))
+            else:
+                self._page_host.load(self.avatar_name or self._page_host.avatar_name or 'ANIYA')
         except Exception:
             pass
 
         try:
-            self.webview.page().loadFinished.connect(lambda ok: QTimer.singleShot(50, self._apply_view_settings))
+            self._page_host.page_ready.connect(lambda ok: QTimer.singleShot(50, self._apply_view_settings))
         except Exception:
             pass
+        self._apply_view_settings()
 
     def update_view_settings(self, vs: dict):
         self.view_settings = vs or {}
@@ -57,12 +68,8 @@ class AvatarWidget(QFrame):
             if self.view_settings.get('debug_avatar', False) or self.view_settings.get('preview_root_width'):
                 external['debug'] = True
 
-            inject_code = f"(function(){{ try {{ window._externalViewParams = {json.dumps(external)}; if (typeof window._layoutModel === 'function') {{ window._layoutModel(); }} return true; }} catch(e) {{ return false; }} }})()"
-
-            try:
-                self.webview.page().runJavaScript(inject_code, lambda res: None)
-            except Exception:
-                pass
+            # Pushed into the running page; nothing is reloaded when the settings change
+            self._page_host.apply_view_params(external, replace=True)
         except Exception:
             pass
 
@@ -76,13 +83,16 @@ class AvatarWidget(QFrame):
         except Exception:
             pass
 
+    def play_lip_sync(self, payload: dict):
+        """Queue one chunk's mouth envelope for the page; the page plays it against its clock."""
+        try:
+            self._page_host.bridge.queue_lip_sync(payload)
+        except Exception:
+            pass
+
     def set_volume(self, v: float):
         try:
-            js = f"(function(){{ try{{ if(window.avatarModel && window.avatarModel.setVolume) {{ window.avatarModel.setVolume({float(v)}) }}; }}catch(e){{}} }})()"
-            try:
-                self.webview.page().runJavaScript(js)
-            except Exception:
-                pass
+            self._page_host.bridge.set_volume(float(v))
         except Exception:
             pass
     # file intentionally ends here (minimal safe implementation)
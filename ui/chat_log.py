@@ -0,0 +1,261 @@
+"""
+Model/view chat history.
+
+Messages live in a QAbstractListModel and are painted by a delegate, so only the rows
+that are visible get laid out and drawn. Bubbles and their shadows are painted directly
+(no per-message widgets or QGraphicsDropShadowEffect). The message that is currently
+being spoken keeps its typing state in a TypingRenderer.
+"""
+import itertools
+from PyQt5.QtWidgets import QListView, QStyledItemDelegate, QAbstractItemView, QFrame
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QRect, QRectF, QTimer
+from PyQt5.QtGui import QFont, QColor, QPainter, QPainterPath, QPen, QFontMetrics
+from .typing_renderer import TypingRenderer
+
+TextRole = Qt.UserRole + 1
+SenderRole = Qt.UserRole + 2
+TypingRole = Qt.UserRole + 3
+IdRole = Qt.UserRole + 4
+DocumentRole = Qt.UserRole + 5
+
+
+class ChatLogModel(QAbstractListModel):
+    """Append-only list of chat messages; the active bot message animates its text."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._messages = []
+        self._ids = itertools.count(1)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._messages)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not (0 <= index.row() < len(self._messages)):
+            return None
+        msg = self._messages[index.row()]
+        renderer = msg['renderer']
+        if role in (Qt.DisplayRole, TextRole):
+            return renderer.visible_text() if renderer is not None else msg['text']
+        if role == SenderRole:
+            return msg['sender']
+        if role == TypingRole:
+            return renderer is not None
+        if role == IdRole:
+            return msg['id']
+        if role == DocumentRole:
+            return renderer.document() if renderer is not None else None
+        return None
+
+    def add_message(self, text: str, sender: str = "user") -> int:
+        """Append a message and return its row. Bot messages start typing their text."""
+        row = len(self._messages)
+        msg = {'id': next(self._ids), 'text': text, 'sender': sender, 'renderer': None}
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._messages.append(msg)
+        self.endInsertRows()
+        if sender != "user":
+            self._start_typing(row, text)
+        return row
+
+    def update_message(self, row: int, text: str, is_complete: bool = False):
+        """Update a message's text; already-typed text is kept and only new words animate."""
+        if not (0 <= row < len(self._messages)):
+            return
+        msg = self._messages[row]
+        msg['text'] = text
+        renderer = msg['renderer']
+        if renderer is None:
+            if is_complete:
+                self._emit_changed(row)
+                return
+            renderer = self._start_typing(row, "")
+        renderer.set_target(text, is_complete)
+        if is_complete:
+            renderer.finish()
+
+    def message_text(self, row: int) -> str:
+        return self._messages[row]['text']
+
+    def is_typing(self, row: int) -> bool:
+        return self._messages[row]['renderer'] is not None
+
+    def clear(self):
+        self.beginResetModel()
+        for msg in self._messages:
+            if msg['renderer'] is not None:
+                msg['renderer'].stop()
+                msg['renderer'].deleteLater()
+        self._messages = []
+        self.endResetModel()
+
+    def _start_typing(self, row: int, text: str):
+        renderer = TypingRenderer(parent=self)
+        renderer.document().setDocumentMargin(0)
+        renderer.document().setDefaultFont(MessageBubbleDelegate.FONT)
+        self._messages[row]['renderer'] = renderer
+        renderer.updated.connect(lambda _text, r=row: self._emit_changed(r))
+        renderer.finished.connect(lambda r=row: self._on_typing_finished(r))
+        if text:
+            renderer.set_target(text)
+        return renderer
+
+    def _on_typing_finished(self, row: int):
+        msg = self._messages[row]
+        renderer = msg['renderer']
+        if renderer is None:
+            return
+        msg['text'] = renderer.target_text()
+        msg['renderer'] = None
+        renderer.deleteLater()
+        self._emit_changed(row)
+
+    def _emit_changed(self, row: int):
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [TextRole, TypingRole])
+
+
+class MessageBubbleDelegate(QStyledItemDelegate):
+    """Paints chat bubbles with a cheap layered shadow instead of a blur effect."""
+
+    FONT = QFont("Segoe UI", 11)
+    MAX_BUBBLE_WIDTH = 400
+    PADDING = 10
+    RADIUS = 15
+    SPACING = 6
+    SHADOW_OFFSET = 3
+    STYLES = {
+        'user': (QColor(220, 248, 198, 200), QColor(255, 255, 255, 102)),
+        'bot': (QColor(255, 255, 255, 200), QColor(0, 0, 0, 25)),
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._metrics = QFontMetrics(self.FONT)
+        # (message id, text length, available width) -> QSize for finished messages
+        self._size_cache = {}
+
+    def _text_size(self, index, available: int) -> QSize:
+        """Size of the wrapped text block for the bubble."""
+        max_text = max(20, min(self.MAX_BUBBLE_WIDTH, available) - 2 * self.PADDING)
+        doc = index.data(DocumentRole)
+        if doc is not None:
+            # Typing message: the renderer's document lays out incrementally
+            doc.setTextWidth(max_text)
+            width = min(max_text, int(doc.idealWidth()) + 1)
+            return QSize(max(width, 1), int(doc.size().height()))
+        text = index.data(TextRole) or ""
+        key = (index.data(IdRole), len(text), max_text)
+        size = self._size_cache.get(key)
+        if size is None:
+            rect = self._metrics.boundingRect(QRect(0, 0, max_text, 100000), Qt.TextWordWrap, text)
+            size = QSize(min(max_text, rect.width() + 1), rect.height())
+            self._size_cache[key] = size
+        return size
+
+    def _available_width(self, option) -> int:
+        view = self.parent()
+        if isinstance(view, QAbstractItemView):
+            return view.viewport().width()
+        return option.rect.width()
+
+    def _bubble_rect(self, option, index) -> QRect:
+        text_size = self._text_size(index, self._available_width(option) - 2 * self.SPACING)
+        w = text_size.width() + 2 * self.PADDING
+        h = text_size.height() + 2 * self.PADDING
+        top = option.rect.top() + self.SPACING // 2
+        if index.data(SenderRole) == 'user':
+            left = option.rect.right() - self.SPACING - self.SHADOW_OFFSET - w
+        else:
+            left = option.rect.left() + self.SPACING
+        return QRect(left, top, w, h)
+
+    def sizeHint(self, option, index):
+        available = self._available_width(option)
+        text_size = self._text_size(index, available - 2 * self.SPACING)
+        height = text_size.height() + 2 * self.PADDING + self.SPACING + self.SHADOW_OFFSET
+        return QSize(available, height)
+
+    def paint(self, painter, option, index):
+        sender = index.data(SenderRole)
+        fill, border = self.STYLES.get(sender, self.STYLES['bot'])
+        bubble = QRectF(self._bubble_rect(option, index))
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # Soft shadow: a few translucent offset layers approximate the old blur
+        painter.setPen(Qt.NoPen)
+        for grow, alpha in ((2.0, 12), (1.0, 20), (0.0, 28)):
+            shadow = bubble.translated(self.SHADOW_OFFSET, self.SHADOW_OFFSET).adjusted(-grow, -grow, grow, grow)
+            painter.setBrush(QColor(0, 0, 0, alpha))
+            painter.drawRoundedRect(shadow, self.RADIUS + grow, self.RADIUS + grow)
+
+        path = QPainterPath()
+        path.addRoundedRect(bubble, self.RADIUS, self.RADIUS)
+        painter.fillPath(path, fill)
+        painter.setPen(QPen(border, 1))
+        painter.drawPath(path)
+
+        text_rect = bubble.adjusted(self.PADDING, self.PADDING, -self.PADDING, -self.PADDING)
+        painter.setPen(option.palette.color(option.palette.Text))
+        painter.setFont(self.FONT)
+        doc = index.data(DocumentRole)
+        if doc is not None:
+            painter.translate(text_rect.topLeft())
+            doc.drawContents(painter, QRectF(0, 0, text_rect.width(), text_rect.height()))
+        else:
+            align = Qt.AlignRight if sender == 'user' else Qt.AlignLeft
+            painter.drawText(text_rect, Qt.TextWordWrap | align, index.data(TextRole) or "")
+        painter.restore()
+
+
+class ChatLogView(QListView):
+    """Virtualized chat history that stays pinned to the newest message."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._model = ChatLogModel(self)
+        self.setModel(self._model)
+        self.setItemDelegate(MessageBubbleDelegate(self))
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setUniformItemSizes(False)
+        self.setResizeMode(QListView.Adjust)
+        self.setFrameShape(QFrame.NoFrame)
+        self.verticalScrollBar().setSingleStep(20)
+        self.setStyleSheet("QListView { background: transparent; border: none; }")
+
+        self._row_heights = {}
+        self._model.rowsInserted.connect(lambda *args: self._scroll_if_pinned(force=True))
+        self._model.dataChanged.connect(self._on_data_changed)
+
+    def chat_model(self) -> ChatLogModel:
+        return self._model
+
+    def add_message(self, text: str, sender: str = "user") -> int:
+        return self._model.add_message(text, sender)
+
+    def update_message(self, row: int, text: str, is_complete: bool = False):
+        self._model.update_message(row, text, is_complete)
+
+    def _on_data_changed(self, top_left, bottom_right, roles=None):
+        # Repainting the row is handled by the view; only re-layout when a row grew a line
+        row = top_left.row()
+        height = self.sizeHintForIndex(top_left).height()
+        if self._row_heights.get(row) != height:
+            self._row_heights[row] = height
+            self._scroll_if_pinned()
+            self.scheduleDelayedItemsLayout()
+
+    def _scroll_if_pinned(self, force=False):
+        bar = self.verticalScrollBar()
+        if force or bar.value() >= bar.maximum() - 30:
+            # after the pending layout has updated the scroll range
+            QTimer.singleShot(0, self.scrollToBottom)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._row_heights.clear()
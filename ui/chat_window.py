@@ -1,11 +1,12 @@
 import os
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QScrollArea, QFrame,
+    QWidget, QVBoxLayout, QHBoxLayout, QFrame,
     QLineEdit, QPushButton, QLabel, QSlider, QSizePolicy, QSplitter, QComboBox
 )
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QIcon
 from .message_widget import MessageWidget
+from .chat_log import ChatLogView
 from .avatar_widget import AvatarWidget
 from .enhanced_voice_setup import EnhancedVoiceSetup
 from .avatar_view_control import AvatarViewControl
@@ -105,16 +106,11 @@ class ChatApp(QWidget):
         """)
         chat_layout = QVBoxLayout(chat_frame)
 
-        # Scrollable chat area
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_content = QWidget()
-        self.scroll_layout = QVBoxLayout(self.scroll_content)
-        self.scroll_layout.setAlignment(Qt.AlignTop)
-        self.scroll_area.setWidget(self.scroll_content)
-        chat_layout.addWidget(self.scroll_area)
+        # Chat history: model/view list that only lays out and paints visible messages
+        self.chat_log = ChatLogView()
+        chat_layout.addWidget(self.chat_log)
         
-        # Store reference to current bot message for typing animation
+        # Row of the current bot message for typing animation
         self.current_bot_message = None
 
         # Input field
@@ -163,10 +159,23 @@ class ChatApp(QWidget):
             if self.avatar_widget and self._avatar_view_settings:
                 self.avatar_widget.update_view_settings(self._avatar_view_settings)
 
+        # Drive the avatar's mouth from the audio that is actually being played
+        try:
+            self._voice_service.lip_sync_ready.connect(self._avatar_controller.play_lip_sync)
+        except Exception as e:
+            print(f"Lip sync not available: {e}")
+
         if self.avatar_widget is not None:
             self.avatar_widget.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
             top_layout.addWidget(self.avatar_widget, alignment=Qt.AlignHCenter)
 
+            # Keep the avatar's renderer out of synthesis' way and paused while minimized
+            render_policy = getattr(self.avatar_widget, 'render_policy', None)
+            if render_policy is not None:
+                render_policy.watch(self)
+                self._voice_service.speaking_progress.connect(render_policy.on_speaking_progress)
+                self._voice_service.speaking_finished.connect(render_policy.on_speaking_finished)
+
         # Prepare icon paths (resolve relative to repository root so cwd doesn't matter)
         icons_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'assets', 'icons'))
         play_icon_path = os.path.join(icons_dir, 'play.png')
@@ -212,39 +221,28 @@ class ChatApp(QWidget):
         main_layout.addWidget(splitter)
 
     def add_message(self, text, sender="user"):
-        msg = MessageWidget(text, sender)
-        h_layout = QHBoxLayout()
-        if sender == "user":
-            h_layout.addStretch()
-            h_layout.addWidget(msg)
-        else:
-            h_layout.addWidget(msg)
-            h_layout.addStretch()
-            self.current_bot_message = msg
-            
-        self.scroll_layout.addLayout(h_layout)
-        self.scroll_area.verticalScrollBar().setValue(
-            self.scroll_area.verticalScrollBar().maximum()
-        )
+        row = self.chat_log.add_message(text, sender)
+        if sender != "user":
+            self.current_bot_message = row
 
         if sender == "bot":
             # Use enhanced voice service with typing animation
             try:
-                self._voice_service.speak_with_voice(text, typing_callback=self._update_bot_message)
+                # Speech is queued on a worker thread; bind the callback to this row so
+                # replies queued behind each other update their own bubble
+                self._voice_service.speak_with_voice(
+                    text, typing_callback=lambda t, done, r=row: self._update_bot_message(t, done, r))
             except Exception:
                 # fallback to avatar widget speak if available
                 if hasattr(self, 'avatar_widget') and self.avatar_widget:
                     self.avatar_widget.speak(text)
                     
-    def _update_bot_message(self, text, is_complete):
+    def _update_bot_message(self, text, is_complete, row=None):
         """Callback to update the bot's message during typing/speech."""
-        if self.current_bot_message:
-            # Use the thread-safe method to update text
-            self.current_bot_message.safe_set_text(text, is_complete)
-            # Schedule scroll update on the main thread
-            self.scroll_area.verticalScrollBar().setValue(
-                self.scroll_area.verticalScrollBar().maximum()
-            )
+        row = self.current_bot_message if row is None else row
+        if row is not None:
+            # Already-typed text is kept; the view scrolls along if pinned to the bottom
+            self.chat_log.update_message(row, text, is_complete)
 
     def send_message(self):
         user_text = self.input_field.text().strip()
@@ -257,6 +255,15 @@ class ChatApp(QWidget):
         bot_reply = get_bot_response(user_text)
         self.add_message(bot_reply, "bot")
 
+    def closeEvent(self, event):
+        """Stop the speech worker thread before the window goes away."""
+        try:
+            if hasattr(self._voice_service, 'shutdown'):
+                self._voice_service.shutdown()
+        except Exception as e:
+            print(f"Error stopping voice service: {e}")
+        super().closeEvent(event)
+
     def change_volume(self, value):
         """Adjust volume and update mute button automatically."""
         volume = value / 100.0
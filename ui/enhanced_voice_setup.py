@@ -35,6 +35,7 @@ class EnhancedVoiceSetup(QWidget):
         self.voice_service.processing_started.connect(self._on_processing_started)
         self.voice_service.processing_finished.connect(self._on_processing_finished)
         self.voice_service.processing_progress.connect(self._on_processing_progress)
+        self.voice_service.processing_stage.connect(self._on_processing_stage)
         self.voice_service.voice_ready.connect(self._on_voice_ready)
         
         self.setWindowTitle('Voice Setup - Select Your Character Voice')
@@ -77,9 +78,16 @@ class EnhancedVoiceSetup(QWidget):
         status_frame = QFrame()
         status_layout = QVBoxLayout(status_frame)
         
+        progress_layout = QHBoxLayout()
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
-        status_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.progress_bar)
+        
+        self.cancel_btn = QPushButton("✖ Cancel")
+        self.cancel_btn.clicked.connect(self._cancel_processing)
+        self.cancel_btn.setVisible(False)
+        progress_layout.addWidget(self.cancel_btn)
+        status_layout.addLayout(progress_layout)
         
         self.status_label = QLabel("Select a voice sample to get started")
         self.status_label.setStyleSheet("color: #666; font-style: italic; padding: 10px; border-radius: 4px;")
@@ -303,7 +311,9 @@ class EnhancedVoiceSetup(QWidget):
         """Handle processing started."""
         self._processing = True
         self.progress_bar.setVisible(True)
-        self.progress_bar.setRange(0, 0)  # Indeterminate
+        self.progress_bar.setRange(0, 0)  # Indeterminate until the first stage reports
+        self.cancel_btn.setVisible(True)
+        self.cancel_btn.setEnabled(True)
         self.upload_btn.setEnabled(False)
         self.sample_list.setEnabled(False)
         
@@ -312,6 +322,7 @@ class EnhancedVoiceSetup(QWidget):
         """Handle processing finished."""
         self._processing = False
         self.progress_bar.setVisible(False)
+        self.cancel_btn.setVisible(False)
         self.upload_btn.setEnabled(True)
         self.sample_list.setEnabled(True)
         
@@ -332,6 +343,18 @@ class EnhancedVoiceSetup(QWidget):
         """Handle processing progress updates."""
         self.status_label.setText(f"🔄 {message}")
     
+    @pyqtSlot(str, float)
+    def _on_processing_stage(self, stage: str, fraction: float):
+        """Show real stage progress from the voice preparation job."""
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(int(fraction * 100))
+    
+    def _cancel_processing(self):
+        """Cancel the running voice preparation job."""
+        if self.voice_service.cancel_voice_processing():
+            self.cancel_btn.setEnabled(False)
+            self.status_label.setText("🔄 Cancelling...")
+    
     @pyqtSlot()
     def _on_voice_ready(self):
         """Handle voice ready signal."""
@@ -1,34 +1,45 @@
-from PyQt5.QtWidgets import QLabel, QGraphicsDropShadowEffect
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QObject
-from PyQt5.QtGui import QFont, QColor
+from PyQt5.QtWidgets import QTextBrowser, QGraphicsDropShadowEffect, QFrame, QSizePolicy
+from PyQt5.QtCore import Qt, pyqtSignal, QSize
+from PyQt5.QtGui import QFont, QColor, QTextOption
+from .typing_renderer import TypingRenderer
 
-class MessageWidget(QLabel):
+
+class MessageWidget(QTextBrowser):
     textUpdated = pyqtSignal(str)
-    
+
     def __init__(self, text, sender="user"):
-        super().__init__("")  # Start empty for typing animation
+        super().__init__()
         self.full_text = text
-        self.current_text = ""
         self.is_typing = False
-        self.typing_timer = QTimer(self)  # Parent the timer to this widget
-        self.typing_timer.timeout.connect(self._update_typing)
-        
-        # Connect our own text update signal to setText
-        self.textUpdated.connect(self.setText)
-        
-        self.setWordWrap(True)
+
+        # Read-only bubble that sizes itself to its document (no scrollbars)
+        self.setReadOnly(True)
+        self.setFrameStyle(QFrame.NoFrame)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
         self.setMaximumWidth(400)
-        
+
+        # Typing animation appends to the document instead of re-setting the whole string
+        self._renderer = TypingRenderer(self.document(), parent=self)
+        self._renderer.updated.connect(self._on_text_revealed)
+        self._renderer.updated.connect(self.textUpdated.emit)
+        self._renderer.finished.connect(self._on_typing_finished)
+        self._natural_width = 0
+        self._measured_text = ""
+
+        # ✅ Font (programmatic control)
+        font = QFont("Segoe UI", 11)
+        self.setFont(font)
+        self.document().setDefaultFont(font)
+
         if sender != "user":
             # Start typing animation for bot messages
             self.start_typing()
         else:
             # Show user messages immediately
-            self.setText(text)
-
-        # ✅ Font (programmatic control)
-        font = QFont("Segoe UI", 11)
-        self.setFont(font)
+            self._renderer.set_target(text, True)
+            self._renderer.finish()
 
         # ✅ Style depends on sender
         if sender == "user":
@@ -39,7 +50,7 @@ class MessageWidget(QLabel):
                 "padding: 10px;"
                 "border: 1px solid rgba(255, 255, 255, 0.4);"
             )
-            self.setAlignment(Qt.AlignRight)
+            self.document().setDefaultTextOption(QTextOption(Qt.AlignRight))
         else:
             # white/gray acrylic bubble
             self.setStyleSheet(
@@ -48,7 +59,7 @@ class MessageWidget(QLabel):
                 "padding: 10px;"
                 "border: 1px solid rgba(0, 0, 0, 0.1);"
             )
-            self.setAlignment(Qt.AlignLeft)
+            self.document().setDefaultTextOption(QTextOption(Qt.AlignLeft))
 
         # ✅ Drop shadow for depth
         shadow = QGraphicsDropShadowEffect(self)
@@ -57,44 +68,92 @@ class MessageWidget(QLabel):
         shadow.setYOffset(3)
         shadow.setColor(QColor(0, 0, 0, 80))  # soft shadow
         self.setGraphicsEffect(shadow)
-        
+
+    def text(self):
+        """Currently visible text (QLabel compatibility)."""
+        return self._renderer.visible_text()
+
+    def setText(self, text):
+        """Replace the content without animation (QLabel compatibility)."""
+        self.full_text = text
+        self._renderer.reset()
+        self._renderer.set_target(text, True)
+        self._renderer.finish()
+
     def start_typing(self):
         """Start the typing animation."""
         self.is_typing = True
-        self.current_text = ""
-        self.typing_timer.start(50)  # Update every 50ms
-        
+        self._renderer.reset()
+        self._renderer.set_target(self.full_text)
+
     def stop_typing(self):
         """Stop the typing animation and show full text."""
-        self.is_typing = False
-        self.typing_timer.stop()
-        self.setText(self.full_text)
-        
+        self._renderer.set_target(self.full_text, True)
+        self._renderer.finish()
+
     def set_text(self, text, is_complete=False):
         """Update the text content with optional typing animation."""
         self.full_text = text
         if is_complete:
             self.stop_typing()
         else:
-            self.current_text = ""
-            self.start_typing()
-            
-    def _update_typing(self):
-        """Update the typing animation."""
-        if len(self.current_text) < len(self.full_text):
-            # Add one character at a time
-            self.current_text = self.full_text[:len(self.current_text) + 1]
-            self.textUpdated.emit(self.current_text)
-        else:
-            self.typing_timer.stop()
-            
+            self.is_typing = True
+            self._renderer.set_target(text)
+
     def safe_set_text(self, text, is_complete=False):
-        """Thread-safe method to update text content."""
+        """Update the text to reveal; already-typed text is kept, only new words are animated."""
         self.full_text = text
         if is_complete:
-            self.textUpdated.emit(text)
-            self.typing_timer.stop()
+            self.stop_typing()
+        else:
+            self.is_typing = True
+            self._renderer.set_target(text)
+
+    def _on_typing_finished(self):
+        self.is_typing = False
+
+    # ---- Sizing: fit the bubble to its text like a word-wrapped label ----
+    def _on_text_revealed(self, text):
+        """Track the unwrapped text width incrementally as words are appended."""
+        fm = self.fontMetrics()
+        if text.startswith(self._measured_text) and self._measured_text:
+            # Only the last measured line and any new lines can have changed
+            tail = text[self._measured_text.rfind('\n') + 1:]
         else:
-            self.current_text = ""
-            if not self.typing_timer.isActive():
-                self.typing_timer.start(30)  # Faster typing speed (30ms)
+            self._natural_width = 0
+            tail = text
+        if self._natural_width < self.maximumWidth():
+            for line in tail.split('\n'):
+                self._natural_width = max(self._natural_width, fm.horizontalAdvance(line))
+        self._measured_text = text
+        self.updateGeometry()
+
+    def _frame_extra(self):
+        # Stylesheet border + padding sit between the widget edge and the viewport
+        extra_w = self.width() - self.viewport().width()
+        extra_h = self.height() - self.viewport().height()
+        if extra_w <= 0 or extra_h <= 0:
+            extra_w = extra_h = 22
+        return extra_w, extra_h
+
+    def hasHeightForWidth(self):
+        return True
+
+    def heightForWidth(self, width):
+        extra_w, extra_h = self._frame_extra()
+        text_width = max(1, width - extra_w)
+        doc = self.document()
+        if abs(doc.textWidth() - text_width) > 0.5:
+            # Layout for a width other than the current one: measure on a copy
+            doc = doc.clone()
+            doc.setTextWidth(text_width)
+        return int(doc.size().height()) + extra_h
+
+    def sizeHint(self):
+        extra_w, _ = self._frame_extra()
+        margin = 2 * self.document().documentMargin()
+        width = int(min(self.maximumWidth(), self._natural_width + margin + extra_w + 2))
+        return QSize(width, self.heightForWidth(width))
+
+    def minimumSizeHint(self):
+        return self.sizeHint()
@@ -0,0 +1,128 @@
+"""
+Incremental typing animation for chat messages.
+
+Instead of re-setting the whole string every tick, the renderer appends the next
+word-sized chunk to a QTextDocument through a cursor, so each frame only lays out the
+text that was added. Text that is already on screen is kept when a longer version of
+the message arrives.
+"""
+import re
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from PyQt5.QtGui import QTextDocument, QTextCursor
+
+_WORD_END = re.compile(r'\S+\s*')
+
+
+class TypingRenderer(QObject):
+    """Reveals target text into a QTextDocument at a frame-rate-bounded cadence."""
+
+    # Emitted after each reveal step with the full visible text
+    updated = pyqtSignal(str)
+    # Emitted once everything in a complete message is visible
+    finished = pyqtSignal()
+
+    def __init__(self, document: QTextDocument = None, fps: int = 30,
+                 chars_per_second: float = 40.0, catch_up_seconds: float = 1.5, parent=None):
+        super().__init__(parent)
+        self._document = document if document is not None else QTextDocument(self)
+        self._fps = max(1, int(fps))
+        self._chars_per_frame = max(1.0, chars_per_second / self._fps)
+        # When far behind (e.g. a whole sentence arrives at once), reveal faster so the
+        # backlog is cleared within roughly this many seconds
+        self._catch_up_frames = max(1, int(catch_up_seconds * self._fps))
+        self._target = ""
+        self._shown = 0
+        self._complete = False
+        self._timer = QTimer(self)
+        self._timer.setInterval(int(1000 / self._fps))
+        self._timer.timeout.connect(self._tick)
+
+    def document(self) -> QTextDocument:
+        return self._document
+
+    def visible_text(self) -> str:
+        return self._target[:self._shown]
+
+    def target_text(self) -> str:
+        return self._target
+
+    def is_typing(self) -> bool:
+        return self._timer.isActive()
+
+    def set_target(self, text: str, is_complete: bool = False):
+        """Update the text to reveal, keeping whatever prefix is already visible."""
+        text = text or ""
+        keep = self._common_prefix(self.visible_text(), text)
+        if keep < self._shown:
+            # New text diverges from what is shown: drop only the differing tail
+            cursor = QTextCursor(self._document)
+            cursor.setPosition(keep)
+            cursor.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
+            cursor.removeSelectedText()
+            self._shown = keep
+        self._target = text
+        self._complete = is_complete
+        if self._shown < len(self._target):
+            if not self._timer.isActive():
+                self._timer.start()
+        elif is_complete:
+            self._finish()
+
+    def finish(self):
+        """Reveal the rest of the target immediately."""
+        self._complete = True
+        self._append(len(self._target))
+        self._finish()
+
+    def reset(self, text: str = ""):
+        """Clear the document and start over with new text."""
+        self._timer.stop()
+        self._document.clear()
+        self._target = ""
+        self._shown = 0
+        self._complete = False
+        if text:
+            self.set_target(text)
+
+    def stop(self):
+        self._timer.stop()
+
+    @staticmethod
+    def _common_prefix(a: str, b: str) -> int:
+        n = min(len(a), len(b))
+        i = 0
+        while i < n and a[i] == b[i]:
+            i += 1
+        return i
+
+    def _tick(self):
+        backlog = len(self._target) - self._shown
+        if backlog <= 0:
+            self._timer.stop()
+            if self._complete:
+                self._finish()
+            return
+        budget = max(self._chars_per_frame, backlog / self._catch_up_frames)
+        end = self._shown
+        limit = self._shown + budget
+        # Reveal whole words: always at least one, then more while within budget
+        for match in _WORD_END.finditer(self._target, self._shown):
+            if end > self._shown and match.end() > limit:
+                break
+            end = match.end()
+        if end == self._shown:
+            end = len(self._target)
+        self._append(end)
+
+    def _append(self, end: int):
+        if end <= self._shown:
+            return
+        cursor = QTextCursor(self._document)
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(self._target[self._shown:end])
+        self._shown = end
+        self.updated.emit(self.visible_text())
+
+    def _finish(self):
+        self._timer.stop()
+        self.finished.emit()
@@ -5,7 +5,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, pyqtSignal, QTimer
 import threading
-import time
+from services.voice_job_runner import VoiceJobRunner
 
 
 class VoiceSetup(QWidget):
@@ -20,6 +20,8 @@ class VoiceSetup(QWidget):
         self.setWindowTitle('Select peer voice')
         self._engine_se_path = None
         self._poll_timer = None
+        self._job_runner = None
+        self._service_connected = False
         self.setup_ui()
 
     def setup_ui(self):
@@ -194,30 +196,51 @@ class VoiceSetup(QWidget):
             return
         self.status_label.setText(f'Selected reference: {os.path.basename(pth)}')
         self.progress.setVisible(True)
-        self.progress.setValue(5)
-        if self.tts_service:
+        self.progress.setValue(0)
+        if self.tts_service is not None and hasattr(self.tts_service, 'processing_stage'):
+            # VoiceEngineService-based services prepare the voice with their own job runner
+            if not self._service_connected:
+                self.tts_service.processing_stage.connect(self._on_job_stage)
+                self.tts_service.processing_finished.connect(self._on_service_processing_finished)
+                self._service_connected = True
             self.tts_service.set_voice_reference(pth)
-        # Launch background cloning (embedding extraction warm-up)
-        threading.Thread(target=self._run_cloning, daemon=True).start()
+        else:
+            self._start_cloning_job(pth)
 
-    def _run_cloning(self):
-        # Simulate staged work; actual embedding extracted on first synth call
-        stages = [15, 35, 55, 75, 90, 100]
-        for v in stages:
-            time.sleep(0.2)
-            self.progress.setValue(v)
-        # Trigger a tiny warm-up synthesis (not played) to build embedding cache
+    def _start_cloning_job(self, pth):
+        """Decode, trim, extract the embedding and verify the voice in the background."""
+        if self._job_runner is None:
+            self._job_runner = VoiceJobRunner(
+                lambda: getattr(getattr(self.tts_service, '_engine', None), 'openvoice', None), self)
+            self._job_runner.stage.connect(lambda job_id, stage, fraction: self._on_job_stage(stage, fraction))
+            self._job_runner.finished.connect(self._on_job_finished)
+            self._job_runner.failed.connect(self._on_job_failed)
         try:
-            if self.tts_service and getattr(self.tts_service, 'openvoice', None):
-                import tempfile, os
-                tmpd = tempfile.mkdtemp(prefix='clone_warm_')
-                out = os.path.join(tmpd, 'warm.wav')
-                self.tts_service.openvoice.synthesize(text='testing', reference_audio=self.tts_service._ref_audio, output_path=out)
-        except Exception:
-            pass
+            self._job_runner.submit(pth)
+        except Exception as e:
+            self._on_job_failed(0, str(e))
+
+    def _on_job_stage(self, stage, fraction):
+        self.progress.setValue(int(fraction * 100))
+        self.status_label.setText(f'Preparing voice: {stage}...')
+
+    def _on_job_finished(self, job_id, result):
+        if self.tts_service:
+            self.tts_service.set_voice_reference(result['reference_audio'])
+        self._on_service_processing_finished(True)
+
+    def _on_job_failed(self, job_id, message):
         self.progress.setVisible(False)
-        self.proceed_btn.setEnabled(True)
-        self.status_label.setText('Reference voice ready')
+        self.status_label.setText(f'Voice preparation failed: {message}')
+
+    def _on_service_processing_finished(self, ok):
+        self.progress.setVisible(False)
+        if ok:
+            self.proceed_btn.setEnabled(True)
+            self.test_btn.setEnabled(True)
+            self.status_label.setText('Reference voice ready')
+        else:
+            self.status_label.setText('Voice preparation failed')
 
     def open_engine_dir(self):
         pth = QFileDialog.getExistingDirectory(self, 'Select exported engine folder', os.path.expanduser('~'))
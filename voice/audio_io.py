@@ -0,0 +1,112 @@
+"""
+Audio ingest shared by reference extraction, conversion and the services.
+
+load_audio() reads the file once, decodes it with soundfile (WAV, FLAC, OGG and,
+with libsndfile >= 1.1, MP3) and only falls back to librosa/audioread for formats
+soundfile cannot read. Resampling is skipped when the rates already match and
+otherwise uses a polyphase filter whose taps are designed once per rate pair.
+The result is always float32.
+
+Decoded audio is kept in a small LRU cache keyed by the file's content hash, the
+target rate and channel layout, so the same reference loaded by several paths (or
+several times per session) is decoded once. Callers get their own copy.
+"""
+import io
+import math
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+import soundfile
+
+# Decoded-audio cache budget (float32 bytes)
+CACHE_BYTES = 64 << 20
+
+_cache = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=32)
+def _filter(up, down):
+    """Low-pass taps for resample_poly (its own default design: Kaiser, beta 5, 10 zero crossings)."""
+    from scipy.signal import firwin
+    max_rate = max(up, down)
+    taps = firwin(2 * 10 * max_rate + 1, 1.0 / max_rate, window=('kaiser', 5.0))
+    taps.setflags(write=False)
+    return taps
+
+
+def resample(audio, orig_sr, target_sr):
+    """Polyphase resampling along the first axis; a no-op when the rates match."""
+    audio = np.asarray(audio, dtype=np.float32)
+    if orig_sr == target_sr:
+        return audio
+    from scipy.signal import resample_poly
+    g = math.gcd(int(orig_sr), int(target_sr))
+    up, down = int(target_sr) // g, int(orig_sr) // g
+    return resample_poly(audio, up, down, axis=0, window=_filter(up, down)).astype(np.float32, copy=False)
+
+
+def _decode(data, path):
+    try:
+        return soundfile.read(io.BytesIO(data), dtype='float32', always_2d=True)
+    except RuntimeError:  # soundfile's errors; formats libsndfile cannot read
+        if path is None:
+            raise
+    import librosa
+    audio, sr = librosa.load(path, sr=None, mono=False)
+    return np.atleast_2d(audio).T.astype(np.float32, copy=False), sr
+
+
+def load_audio(source, sr=None, mono=True):
+    """
+    Decode source (a path, bytes or a binary file object) to float32.
+
+    Returns (audio, sr): audio is [samples] when mono, else [samples, channels], at sr
+    when given, otherwise at the file's own rate.
+    """
+    global _cache_bytes
+    path = None
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        data = bytes(source)
+    elif hasattr(source, 'read'):
+        data = source.read()
+    else:
+        path = source
+        with open(source, 'rb') as f:
+            data = f.read()
+
+    key = (hashlib.sha1(data).hexdigest(), sr, mono)
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None:
+            _cache.move_to_end(key)
+            return hit[0].copy(), hit[1]
+
+    audio, file_sr = _decode(data, path)
+    if mono:
+        audio = audio.mean(axis=1) if audio.shape[1] > 1 else audio[:, 0]
+    if sr is not None and sr != file_sr:
+        audio = resample(audio, file_sr, sr)
+        file_sr = sr
+    audio = np.ascontiguousarray(audio, dtype=np.float32)
+
+    if audio.nbytes <= CACHE_BYTES // 4:
+        with _cache_lock:
+            if key not in _cache:
+                _cache[key] = (audio.copy(), file_sr)
+                _cache_bytes += audio.nbytes
+            while _cache_bytes > CACHE_BYTES:
+                _, (old, _) = _cache.popitem(last=False)
+                _cache_bytes -= old.nbytes
+    return audio, file_sr
+
+
+def clear_cache():
+    global _cache_bytes
+    with _cache_lock:
+        _cache.clear()
+        _cache_bytes = 0
@@ -0,0 +1,286 @@
+"""
+Bulk synthesis of prompt libraries.
+
+Reads a JSONL or CSV manifest of items with the fields
+
+    id, text, voice (reference clip path, empty for the base voice), style (base speaker,
+    default 'default'), speed (default 1.0)
+
+and writes ``<out>/<id>.wav`` for each item using BaseSpeakerTTS + ToneColorConverter
+in a pool of worker processes. Each worker loads the models once and caps its torch
+threads, and the pool size defaults to cores // threads.
+
+Speaker embeddings are extracted once per distinct voice before synthesis starts and
+stored content-addressed under ``<out>/.voices/`` (so a restarted job reuses them too);
+workers only load them. Outputs are written to a temporary file and renamed into place,
+so a finished .wav is always complete and restarting the job skips every id that
+already has one. Failed items are listed in ``<out>/failed.jsonl`` and retried on the
+next run. Throughput (utterances per second) and real-time factor are printed while
+running and saved to ``<out>/summary.json``.
+
+Usage:
+    python -m voice.bulk_synth prompts.jsonl out/ [--workers N] [--threads 1]
+        [--checkpoints DIR] [--precision fp32|bf16|auto]
+"""
+import os
+import re
+import sys
+import csv
+import json
+import time
+import hashlib
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+FIELDS = ('id', 'text', 'voice', 'style', 'speed')
+_UNSAFE = re.compile(r'[^A-Za-z0-9_.-]')
+
+# state of a worker process (set by _init_worker)
+_worker = {}
+
+
+def read_manifest(path: str) -> list:
+    """Items of a .jsonl or .csv manifest as dicts with all FIELDS filled in."""
+    items = []
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.csv'):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+    seen = set()
+    for n, row in enumerate(rows, 1):
+        item_id = str(row.get('id') or '').strip()
+        text = str(row.get('text') or '').strip()
+        if not item_id or not text:
+            raise ValueError(f"{path}: item {n} needs an id and text")
+        if item_id in seen:
+            raise ValueError(f"{path}: duplicate id {item_id!r}")
+        seen.add(item_id)
+        items.append({
+            'id': item_id,
+            'text': text,
+            'voice': str(row.get('voice') or '').strip() or None,
+            'style': str(row.get('style') or '').strip() or 'default',
+            'speed': float(row.get('speed') or 1.0),
+        })
+    return items
+
+
+def output_name(item_id: str) -> str:
+    """File name for an id (unsafe characters replaced, a short hash keeps names unique)."""
+    safe = _UNSAFE.sub('_', item_id)
+    if safe != item_id:
+        safe += '-' + hashlib.sha1(item_id.encode('utf-8')).hexdigest()[:8]
+    return safe + '.wav'
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _atomic_write_wav(path: str, audio, sr: int):
+    import soundfile
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        soundfile.write(tmp, audio, sr, format='WAV')
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _init_worker(checkpoints_dir: str, device: str, threads: int, precision: str, roles):
+    """Process pool initializer: cap threads, then load the models once."""
+    for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[var] = str(threads)
+    import torch
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # already fixed for this process
+    from voice.openvoice.api import BaseSpeakerTTS, ToneColorConverter
+
+    base_dir = os.path.join(checkpoints_dir, 'base_speakers', 'EN')
+    conv_dir = os.path.join(checkpoints_dir, 'converter')
+    state = {'device': device, 'se': {}}
+    if 'tts' in roles:
+        base = BaseSpeakerTTS(os.path.join(base_dir, 'config.json'), device=device)
+        base.load_ckpt(os.path.join(base_dir, 'checkpoint.pth'))
+        state['base'] = base
+        state['source_se'] = {}
+        for name in ('default', 'style'):
+            path = os.path.join(base_dir, f'en_{name}_se.pth')
+            if os.path.exists(path):
+                state['source_se'][name] = torch.load(path, map_location=device)
+    converter_roles = tuple(r for r in roles if r in ('conversion', 'se'))
+    if converter_roles:
+        converter = ToneColorConverter(os.path.join(conv_dir, 'config.json'), device=device,
+                                       enable_watermark=False, roles=converter_roles)
+        converter.load_ckpt(os.path.join(conv_dir, 'checkpoint.pth'))
+        state['converter'] = converter
+    for part in ('base', 'converter'):
+        if precision and precision != 'fp32' and part in state:
+            state[part].set_precision(precision)
+    _worker.clear()
+    _worker.update(state)
+
+
+def _extract_voice(voice_path: str, se_path: str) -> str:
+    """Worker job: speaker embedding of one reference clip, saved to se_path."""
+    import torch
+    se = _worker['converter'].extract_se([voice_path])
+    tmp = f"{se_path}.{os.getpid()}.tmp"
+    torch.save(se.cpu(), tmp)
+    os.replace(tmp, se_path)
+    return se_path
+
+
+def _synthesize(item: dict, se_path: str, out_path: str) -> dict:
+    """Worker job: synthesize one item and write it atomically."""
+    import torch
+    started = time.perf_counter()
+    base = _worker['base']
+    audio = base.tts(item['text'], None, item['style'], speed=item['speed'])
+    sr = base.hps.data.sampling_rate
+    if se_path:
+        converter = _worker['converter']
+        target_se = _worker['se'].get(se_path)
+        if target_se is None:
+            target_se = _worker['se'][se_path] = torch.load(se_path, map_location=_worker['device'])
+        if converter.hps.data.sampling_rate != sr:
+            from voice.audio_io import resample
+            audio = resample(audio, sr, converter.hps.data.sampling_rate)
+            sr = converter.hps.data.sampling_rate
+        sources = _worker['source_se']
+        source_se = sources.get('default' if item['style'] == 'default' else 'style', sources.get('default'))
+        audio = converter.convert_batch([audio], source_se, [target_se])[0]
+    _atomic_write_wav(out_path, audio, sr)
+    return {'id': item['id'], 'audio_seconds': len(audio) / sr, 'compute_seconds': time.perf_counter() - started}
+
+
+def _pool(workers: int, checkpoints_dir: str, device: str, threads: int, precision: str, roles):
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=_init_worker,
+                               initargs=(checkpoints_dir, device, threads, precision, roles))
+
+
+def run_job(manifest: str, out_dir: str, checkpoints_dir: str = None, workers: int = None, threads: int = 1,
+            device: str = 'cpu', precision: str = 'fp32', log=print) -> dict:
+    """Synthesize every item of manifest that has no output yet. Returns the summary."""
+    if checkpoints_dir is None:
+        checkpoints_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'checkpoints')
+    threads = max(1, int(threads))
+    workers = workers or max(1, (os.cpu_count() or 1) // threads)
+    items = read_manifest(manifest)
+    for item in items:
+        # voice paths in the manifest may be relative to the manifest itself
+        if item['voice'] and not os.path.isabs(item['voice']) and not os.path.exists(item['voice']):
+            item['voice'] = os.path.join(os.path.dirname(os.path.abspath(manifest)), item['voice'])
+    missing_voices = sorted(set(i['voice'] for i in items if i['voice'] and not os.path.isfile(i['voice'])))
+    if missing_voices:
+        raise FileNotFoundError(f"voice files not found: {', '.join(missing_voices)}")
+    voices_dir = os.path.join(out_dir, '.voices')
+    os.makedirs(voices_dir, exist_ok=True)
+
+    todo = [item for item in items if not os.path.exists(os.path.join(out_dir, output_name(item['id'])))]
+    skipped = len(items) - len(todo)
+    log(f"📋 {len(items)} items, {skipped} already done, {len(todo)} to synthesize with {workers} x {threads} threads")
+
+    # One embedding per distinct voice, content-addressed so restarts and renamed copies reuse it
+    se_paths = {}
+    missing = {}
+    for voice in sorted(set(item['voice'] for item in todo if item['voice'])):
+        se_path = os.path.join(voices_dir, file_digest(voice)[:32] + '.pth')
+        se_paths[voice] = se_path
+        if not os.path.exists(se_path):
+            missing[voice] = se_path
+    if missing:
+        started = time.perf_counter()
+        with _pool(min(workers, len(missing)), checkpoints_dir, device, threads, precision, ('se',)) as pool:
+            for future in [pool.submit(_extract_voice, voice, se_path) for voice, se_path in missing.items()]:
+                future.result()
+        log(f"🎙️ Extracted {len(missing)} voice embeddings in {time.perf_counter() - started:.1f}s")
+
+    summary = {'items': len(items), 'skipped': skipped, 'done': 0, 'failed': 0, 'audio_seconds': 0.0,
+               'compute_seconds': 0.0, 'workers': workers, 'threads': threads}
+    failures = []
+    started = time.perf_counter()
+    if todo:
+        roles = ('tts', 'conversion') if se_paths else ('tts',)
+        with _pool(workers, checkpoints_dir, device, threads, precision, roles) as pool:
+            queue = iter(todo)
+            running = {}
+            while True:
+                # keep a bounded number of items in flight so huge manifests are not all queued at once
+                while len(running) < workers * 2:
+                    item = next(queue, None)
+                    if item is None:
+                        break
+                    out_path = os.path.join(out_dir, output_name(item['id']))
+                    running[pool.submit(_synthesize, item, se_paths.get(item['voice']), out_path)] = item
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    item = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        summary['failed'] += 1
+                        failures.append({'id': item['id'], 'error': f"{type(e).__name__}: {e}"})
+                        log(f"❌ {item['id']}: {e}")
+                        continue
+                    summary['done'] += 1
+                    summary['audio_seconds'] += result['audio_seconds']
+                    summary['compute_seconds'] += result['compute_seconds']
+                    if summary['done'] % max(1, workers * 4) == 0:
+                        elapsed = time.perf_counter() - started
+                        log(f"⏱️ {summary['done']}/{len(todo)} done, {summary['done'] / elapsed:.2f} utt/s, "
+                            f"RTF {elapsed / max(summary['audio_seconds'], 1e-9):.3f}")
+
+    elapsed = time.perf_counter() - started
+    summary['wall_seconds'] = elapsed
+    # utterances per second of wall time, and wall time per second of audio produced (< 1 is faster than real time)
+    summary['utterances_per_second'] = summary['done'] / elapsed if elapsed > 0 else 0.0
+    summary['rtf'] = elapsed / summary['audio_seconds'] if summary['audio_seconds'] else None
+    # per-process compute time per second of audio (wall RTF x workers, minus scheduling overhead)
+    summary['compute_rtf'] = (summary['compute_seconds'] / summary['audio_seconds']
+                              if summary['audio_seconds'] else None)
+    failed_path = os.path.join(out_dir, 'failed.jsonl')
+    if failures:
+        with open(failed_path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(entry) + '\n' for entry in failures)
+    elif os.path.exists(failed_path):
+        os.remove(failed_path)
+    with open(os.path.join(out_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    rtf = f"{summary['rtf']:.3f}" if summary['rtf'] is not None else '-'
+    log(f"✅ {summary['done']} synthesized, {summary['failed']} failed, {skipped} skipped: "
+        f"{summary['utterances_per_second']:.2f} utt/s, RTF {rtf}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthesize a JSONL/CSV prompt library")
+    parser.add_argument('manifest', help='.jsonl or .csv with id, text, voice, style, speed')
+    parser.add_argument('out', help='output folder (re-running skips finished ids)')
+    parser.add_argument('--checkpoints', help='OpenVoice checkpoints folder (default: ./checkpoints)')
+    parser.add_argument('--workers', type=int, help='processes (default: cores // threads)')
+    parser.add_argument('--threads', type=int, default=1, help='torch threads per process')
+    parser.add_argument('--device', default='cpu')
+    parser.add_argument('--precision', default='fp32', help='vocoder/flow precision: fp32, bf16, fp16 or auto')
+    args = parser.parse_args()
+    os.makedirs(args.out, exist_ok=True)
+    summary = run_job(args.manifest, args.out, args.checkpoints, args.workers, args.threads,
+                      args.device, args.precision)
+    sys.exit(1 if summary['failed'] else 0)
+
+
+if __name__ == '__main__':
+    main()
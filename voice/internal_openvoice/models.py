@@ -7,6 +7,7 @@ from torch.nn import functional as F
 from voice.internal_openvoice import commons
 from voice.internal_openvoice import modules
 from voice.internal_openvoice import attentions
+from voice import metrics
 from torch.nn import Conv1d, ConvTranspose1d
 from .weight_norm_compat import weight_norm, remove_weight_norm
 from voice.internal_openvoice.commons import init_weights, get_padding
@@ -212,29 +213,33 @@ class SynthesizerTrn(nn.Module):
     @torch.no_grad()
     def infer(self, x, x_lengths, sid=None, noise_scale=1, length_scale=1, noise_scale_w=1., sdp_ratio=0.2, max_len=None, g_latent=None, duration_bias=None):
         # Upstream behavior with optional external g_latent override.
-        x, m_p, logs_p, x_mask = self.enc_p(x, x_lengths)
+        with metrics.span('encoder'):
+            x, m_p, logs_p, x_mask = self.enc_p(x, x_lengths)
         if g_latent is not None:
             g = g_latent.unsqueeze(-1)
         elif self.n_speakers > 0 and hasattr(self, 'emb_g') and sid is not None:
             g = self.emb_g(sid).unsqueeze(-1)
         else:
             g = None
-        logw = self.sdp(x, x_mask, g=g, reverse=True, noise_scale=noise_scale_w) * sdp_ratio \
-            + self.dp(x, x_mask, g=g) * (1 - sdp_ratio)
-        if duration_bias is not None:
-            # duration_bias expected shape (B,1,Tx) broadcast-safe
-            logw = logw + duration_bias.to(logw.device, logw.dtype)
-        w = torch.exp(logw) * x_mask * length_scale
-        w_ceil = torch.ceil(w)
-        # Ensure every text token gets at least one frame (improves articulation for very short durations)
-        w_ceil = torch.clamp(w_ceil, min=1.0) * (w_ceil > 0).to(w_ceil.dtype)
-        y_lengths = torch.clamp_min(torch.sum(w_ceil, [1, 2]), 1).long()
-        y_mask = torch.unsqueeze(commons.sequence_mask(y_lengths, None), 1).to(x_mask.dtype)
-        attn_mask = torch.unsqueeze(x_mask, 2) * torch.unsqueeze(y_mask, -1)
-        attn = commons.generate_path(w_ceil, attn_mask)
-        m_p = torch.matmul(attn.squeeze(1), m_p.transpose(1, 2)).transpose(1, 2)
-        logs_p = torch.matmul(attn.squeeze(1), logs_p.transpose(1, 2)).transpose(1, 2)
-        z_p = m_p + torch.randn_like(m_p) * torch.exp(logs_p) * noise_scale
-        z = self.flow(z_p, y_mask, g=g, reverse=True)
-        o = self.dec((z * y_mask)[:, :, :max_len], g=g)
+        with metrics.span('duration'):
+            logw = self.sdp(x, x_mask, g=g, reverse=True, noise_scale=noise_scale_w) * sdp_ratio \
+                + self.dp(x, x_mask, g=g) * (1 - sdp_ratio)
+            if duration_bias is not None:
+                # duration_bias expected shape (B,1,Tx) broadcast-safe
+                logw = logw + duration_bias.to(logw.device, logw.dtype)
+            w = torch.exp(logw) * x_mask * length_scale
+            w_ceil = torch.ceil(w)
+            # Ensure every text token gets at least one frame (improves articulation for very short durations)
+            w_ceil = torch.clamp(w_ceil, min=1.0) * (w_ceil > 0).to(w_ceil.dtype)
+            y_lengths = torch.clamp_min(torch.sum(w_ceil, [1, 2]), 1).long()
+            y_mask = torch.unsqueeze(commons.sequence_mask(y_lengths, None), 1).to(x_mask.dtype)
+            attn_mask = torch.unsqueeze(x_mask, 2) * torch.unsqueeze(y_mask, -1)
+            attn = commons.generate_path(w_ceil, attn_mask)
+        with metrics.span('flow'):
+            m_p = torch.matmul(attn.squeeze(1), m_p.transpose(1, 2)).transpose(1, 2)
+            logs_p = torch.matmul(attn.squeeze(1), logs_p.transpose(1, 2)).transpose(1, 2)
+            z_p = m_p + torch.randn_like(m_p) * torch.exp(logs_p) * noise_scale
+            z = self.flow(z_p, y_mask, g=g, reverse=True)
+        with metrics.span('vocoder'):
+            o = self.dec((z * y_mask)[:, :, :max_len], g=g)
         return o, attn, y_mask, (z, z_p, m_p, logs_p)
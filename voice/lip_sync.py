@@ -0,0 +1,92 @@
+"""
+Audio-driven lip-sync envelopes for the Live2D avatar.
+
+Each synthesized chunk is reduced to one mouth-open value (RMS loudness) and one
+mouth-form value (a rough viseme cue from zero-crossing rate) per avatar frame. The
+values are quantized to uint8 and sent to the page in a single payload with the
+playback start time, so the page can interpolate against its clock instead of
+running timers.
+"""
+import time
+import base64
+import logging
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+AVATAR_FPS = 60
+SILENCE_DB = -45.0   # at or below this level the mouth is closed
+FULL_OPEN_DB = -12.0  # at or above this level the mouth is fully open
+
+
+def frame_audio(audio: np.ndarray, sample_rate: int, fps: int = AVATAR_FPS) -> np.ndarray:
+    """Split audio into one row per avatar frame (zero padded at the end)."""
+    audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+    hop = max(1, int(round(sample_rate / float(fps))))
+    n_frames = max(1, int(np.ceil(len(audio) / float(hop))))
+    padded = np.zeros(n_frames * hop, dtype=np.float32)
+    padded[:len(audio)] = audio
+    return padded.reshape(n_frames, hop)
+
+
+def compute_envelope(audio: np.ndarray, sample_rate: int, fps: int = AVATAR_FPS,
+                     smoothing_frames: int = 3):
+    """
+    Compute mouth-open and mouth-form envelopes at the avatar frame rate.
+
+    Returns:
+        (open, form): float32 arrays in [0, 1], one value per frame. form is high for
+        bright/fricative frames (wide mouth) and low for voiced vowels (round mouth).
+    """
+    frames = frame_audio(audio, sample_rate, fps)
+
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    db = 20.0 * np.log10(rms + 1e-8)
+    mouth_open = np.clip((db - SILENCE_DB) / (FULL_OPEN_DB - SILENCE_DB), 0.0, 1.0)
+
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / float(max(1, frames.shape[1] - 1))
+    # ~0.02 for low vowels, ~0.3+ for fricatives
+    mouth_form = np.clip((zcr - 0.02) / 0.25, 0.0, 1.0)
+    mouth_form[mouth_open <= 0.0] = 0.5
+
+    if smoothing_frames > 1 and len(mouth_open) >= smoothing_frames:
+        kernel = np.ones(smoothing_frames) / smoothing_frames
+        mouth_open = np.convolve(mouth_open, kernel, mode='same')
+        mouth_form = np.convolve(mouth_form, kernel, mode='same')
+
+    return mouth_open.astype(np.float32), mouth_form.astype(np.float32)
+
+
+def quantize(values: np.ndarray) -> bytes:
+    """Quantize [0, 1] floats to uint8 bytes."""
+    return np.round(np.clip(values, 0.0, 1.0) * 255.0).astype(np.uint8).tobytes()
+
+
+def build_payload(audio: np.ndarray, sample_rate: int, fps: int = AVATAR_FPS,
+                  start_time: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Build the JSON-serializable payload for the page's playLipSyncEnvelope().
+
+    Args:
+        audio: Mono audio for one chunk
+        sample_rate: Sample rate of the audio
+        fps: Envelope frame rate
+        start_time: Playback start (seconds since the epoch); defaults to now
+    """
+    mouth_open, mouth_form = compute_envelope(audio, sample_rate, fps)
+    start_time = time.time() if start_time is None else start_time
+    return {
+        'fps': int(fps),
+        't0': int(start_time * 1000),
+        'frames': int(len(mouth_open)),
+        'open': base64.b64encode(quantize(mouth_open)).decode('ascii'),
+        'form': base64.b64encode(quantize(mouth_form)).decode('ascii'),
+    }
+
+
+def decode_channel(data: str) -> np.ndarray:
+    """Inverse of the payload encoding (for tests and debugging)."""
+    return np.frombuffer(base64.b64decode(data), dtype=np.uint8).astype(np.float32) / 255.0
@@ -0,0 +1,340 @@
+"""
+Per-request timing for the voice pipeline.
+
+A speech request runs on one thread (see services/speech_worker.py), so the request
+being timed is kept in a thread-local RequestTrace. Pipeline code wraps its stages in
+``with metrics.span('encoder'):`` blocks; outside a traced request a span only costs
+a thread-local lookup. Span times are wall-clock: on CUDA they include kernel launch
+only, and the wait for the GPU lands in whichever span first copies results to the CPU.
+
+Finished requests become plain dict records (stage totals, queue wait, time to first
+audio, real-time factor) that are handed to subscribers and kept by the registry,
+which can render them in the Prometheus text format for the optional local endpoint
+started by start_metrics_server() (or ELPIS_METRICS_PORT).
+
+Setting ELPIS_TORCH_PROFILE=<trace.json> (or calling request_torch_profile()) captures
+a torch profiler trace of the next request only.
+"""
+import os
+import time
+import logging
+import threading
+import collections
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Stage names used by the pipeline, in pipeline order (records may contain others)
+STAGES = ('tokenize', 'encoder', 'duration', 'flow', 'vocoder', 'se_extract', 'conversion',
+          'synthesis', 'playback')
+
+_local = threading.local()
+
+
+class RequestTrace:
+    """Timings collected for one speech request."""
+
+    def __init__(self, request_id=None, queued_at: float = None):
+        self.request_id = request_id
+        self.started_at = time.time()
+        self.queued_at = queued_at if queued_at is not None else self.started_at
+        self._start = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.first_audio_at: Optional[float] = None
+        self.audio_seconds = 0.0
+        self.chunks = 0
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def mark_audio_start(self):
+        """Playback of a chunk is about to start (the first call sets time to first audio)."""
+        if self.first_audio_at is None:
+            self.first_audio_at = time.time()
+
+    def add_audio(self, samples: int, sample_rate: int):
+        """Account for a synthesized chunk of audio."""
+        if sample_rate:
+            self.audio_seconds += samples / float(sample_rate)
+            self.chunks += 1
+
+    def record(self, success: bool = True) -> dict:
+        """Plain-dict summary of the request."""
+        total = time.perf_counter() - self._start
+        synthesis = self.stages.get('synthesis')
+        return {
+            'request_id': self.request_id,
+            'success': bool(success),
+            'queued_at': self.queued_at,
+            'started_at': self.started_at,
+            'queue_wait': self.started_at - self.queued_at,
+            'time_to_first_audio': (self.first_audio_at - self.started_at) if self.first_audio_at else None,
+            'total': total,
+            'audio_seconds': self.audio_seconds,
+            'chunks': self.chunks,
+            # synthesis time per second of speech (< 1 is faster than real time)
+            'rtf': (synthesis / self.audio_seconds) if synthesis is not None and self.audio_seconds > 0 else None,
+            'stages': dict(self.stages),
+            'counts': dict(self.counts),
+        }
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return getattr(_local, 'trace', None)
+
+
+class span:
+    """
+    Time a block and add it to the current request's stage totals.
+
+    Usage: ``with span('vocoder'): ...``. Does nothing outside a traced request.
+    """
+    __slots__ = ('name', 'trace', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.trace = getattr(_local, 'trace', None)
+        if self.trace is not None:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.trace is not None:
+            self.trace.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def mark_audio_start():
+    trace = current_trace()
+    if trace is not None:
+        trace.mark_audio_start()
+
+
+def add_audio(samples: int, sample_rate: int):
+    trace = current_trace()
+    if trace is not None:
+        trace.add_audio(samples, sample_rate)
+
+
+class trace_request:
+    """
+    Make a RequestTrace current on this thread for the duration of the block.
+
+    Nested use keeps the outer trace, so spans always land in the request being served.
+    """
+
+    def __init__(self, request_id=None, queued_at: float = None):
+        self.trace = RequestTrace(request_id, queued_at)
+        self._outer = None
+
+    def __enter__(self) -> RequestTrace:
+        self._outer = current_trace()
+        if self._outer is not None:
+            return self._outer
+        _local.trace = self.trace
+        return self.trace
+
+    def __exit__(self, *exc):
+        if self._outer is None:
+            _local.trace = None
+        return False
+
+
+class MetricsRegistry:
+    """
+    Keeps the most recent request records and running totals, and notifies subscribers.
+
+    Thread-safe: records arrive from the speech worker, the HTTP endpoint reads them
+    from its own thread.
+    """
+
+    def __init__(self, keep: int = 100):
+        self._lock = threading.Lock()
+        self._recent = collections.deque(maxlen=keep)
+        self._subscribers: List[Callable[[dict], None]] = []
+        self.requests = 0
+        self.failures = 0
+        self.stage_seconds: Dict[str, float] = {}
+        self.stage_count: Dict[str, int] = {}
+        self.audio_seconds = 0.0
+        self.synthesis_seconds = 0.0
+
+    def subscribe(self, callback: Callable[[dict], None]):
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[dict], None]):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def add(self, record: dict):
+        with self._lock:
+            self._recent.append(record)
+            self.requests += 1
+            if not record.get('success', True):
+                self.failures += 1
+            for name, seconds in record.get('stages', {}).items():
+                self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + seconds
+                self.stage_count[name] = self.stage_count.get(name, 0) + record.get('counts', {}).get(name, 1)
+            self.audio_seconds += record.get('audio_seconds') or 0.0
+            self.synthesis_seconds += record.get('stages', {}).get('synthesis', 0.0)
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(record)
+            except Exception as e:
+                logger.debug(f"[Metrics] Subscriber failed: {e}")
+
+    def recent(self) -> List[dict]:
+        with self._lock:
+            return list(self._recent)
+
+    def render_text(self) -> str:
+        """Totals and the latest request in the Prometheus text exposition format."""
+        with self._lock:
+            latest = self._recent[-1] if self._recent else None
+            lines = [
+                '# TYPE elpis_tts_requests_total counter',
+                f'elpis_tts_requests_total {self.requests}',
+                '# TYPE elpis_tts_failures_total counter',
+                f'elpis_tts_failures_total {self.failures}',
+                '# TYPE elpis_tts_audio_seconds_total counter',
+                f'elpis_tts_audio_seconds_total {self.audio_seconds:.6f}',
+                '# TYPE elpis_tts_stage_seconds_total counter',
+            ]
+            for name in sorted(self.stage_seconds):
+                lines.append(f'elpis_tts_stage_seconds_total{{stage="{name}"}} {self.stage_seconds[name]:.6f}')
+            lines.append('# TYPE elpis_tts_stage_calls_total counter')
+            for name in sorted(self.stage_count):
+                lines.append(f'elpis_tts_stage_calls_total{{stage="{name}"}} {self.stage_count[name]}')
+            if self.audio_seconds > 0:
+                lines += ['# TYPE elpis_tts_rtf gauge',
+                          f'elpis_tts_rtf {self.synthesis_seconds / self.audio_seconds:.6f}']
+        if latest is not None:
+            for key in ('queue_wait', 'time_to_first_audio', 'total', 'rtf'):
+                if latest.get(key) is not None:
+                    lines += [f'# TYPE elpis_tts_last_{key} gauge', f'elpis_tts_last_{key} {latest[key]:.6f}']
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+class _MetricsServer:
+    """Local-only HTTP endpoint serving registry.render_text() at /metrics."""
+
+    def __init__(self, port: int, host: str = '127.0.0.1', source: MetricsRegistry = None):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        source = source or registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = source.render_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='elpis-metrics', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+_server = None
+
+
+def start_metrics_server(port: int = None) -> Optional[int]:
+    """
+    Serve /metrics on 127.0.0.1. port defaults to ELPIS_METRICS_PORT; without either
+    nothing is started. Returns the bound port (0 picks a free one), or None.
+    """
+    global _server
+    if _server is not None:
+        return _server.port
+    if port is None:
+        value = os.environ.get('ELPIS_METRICS_PORT', '')
+        if not value.isdigit():
+            return None
+        port = int(value)
+    try:
+        _server = _MetricsServer(port)
+    except OSError as e:
+        logger.warning(f"[Metrics] Could not start metrics endpoint on port {port}: {e}")
+        return None
+    logger.info(f"[Metrics] Serving voice metrics on http://127.0.0.1:{_server.port}/metrics")
+    return _server.port
+
+
+def stop_metrics_server():
+    global _server
+    if _server is not None:
+        _server.stop()
+        _server = None
+
+
+_profile_lock = threading.Lock()
+_profile_path = os.environ.get('ELPIS_TORCH_PROFILE') or None
+
+
+def request_torch_profile(path: str):
+    """Capture a torch profiler (Chrome) trace of the next speech request into path."""
+    global _profile_path
+    with _profile_lock:
+        _profile_path = path
+
+
+class torch_profile_once:
+    """
+    Wrap a request in torch.profiler if a capture was requested, then clear the request.
+
+    Only one request is ever profiled per request_torch_profile() call.
+    """
+
+    def __init__(self):
+        self.path = None
+        self.profiler = None
+
+    def __enter__(self):
+        global _profile_path
+        with _profile_lock:
+            self.path, _profile_path = _profile_path, None
+        if self.path:
+            try:
+                import torch
+                activities = [torch.profiler.ProfilerActivity.CPU]
+                if torch.cuda.is_available():
+                    activities.append(torch.profiler.ProfilerActivity.CUDA)
+                self.profiler = torch.profiler.profile(activities=activities, record_shapes=True)
+                self.profiler.__enter__()
+            except Exception as e:
+                logger.warning(f"[Metrics] Torch profiler unavailable: {e}")
+                self.profiler = None
+        return self
+
+    def __exit__(self, *exc):
+        if self.profiler is not None:
+            self.profiler.__exit__(*exc)
+            try:
+                self.profiler.export_chrome_trace(self.path)
+                logger.info(f"[Metrics] Torch profiler trace written to {self.path}")
+            except Exception as e:
+                logger.warning(f"[Metrics] Could not write profiler trace: {e}")
+        return False
@@ -15,13 +15,17 @@ import soundfile as sf
 import hashlib
 import librosa
 import numpy as np
-import warnings
 from typing import Optional, Tuple
 from typing import List
 from pathlib import Path
 
 from ..internal_openvoice.models import SynthesizerTrn
 from ..internal_openvoice import commons
+from ..openvoice import timeline as alignment_timeline
+from ..openvoice.mel_processing import get_frontend
+from .. import metrics
+from .. import audio_io
+from .. import precision as _precision
 from .text.symbols import symbols as default_symbols
 from .text import text_to_sequence, cleaned_text_to_sequence
 try:
@@ -77,10 +81,19 @@ class VoiceSynthesizer:
             'ː': ['ː', '']           # Try long vowel marker, then skip if missing
         }
         self._load_model(model_path)
+        # Vocoder/flow precision (config 'precision' or ELPIS_TTS_PRECISION); see voice/precision.py
+        self.precision_report = None
+        if self.model is not None:
+            precision = self.config.get('precision') if isinstance(self.config, dict) else None
+            self.precision_report = _precision.apply_precision(
+                self.model, precision or _precision.default_precision(), self.device)
         self._g2p = None
         # Runtime tuning flags
         self.clarity_mode = True  # reduce noise & normalize output
         self.enable_prosody_heuristics = True
+        # Token/word/character timings of the last synthesize_audio call (see openvoice.timeline)
+        self.last_timeline = None
+        self._last_alignment = None
 
     def set_clarity_mode(self, enabled: bool):
         self.clarity_mode = bool(enabled)
@@ -406,11 +419,9 @@ class VoiceSynthesizer:
             return self._ref_cache[reference_audio]
             
         try:
-            import librosa
-            
             # Load audio using the same parameters as OpenVoice
             sampling_rate = self.config.get('sampling_rate', 22050)
-            audio_ref, sr = librosa.load(reference_audio, sr=sampling_rate)
+            audio_ref, sr = audio_io.load_audio(reference_audio, sr=sampling_rate)
             
             # Convert to tensor
             y = torch.FloatTensor(audio_ref).to(self.device)
@@ -422,7 +433,7 @@ class VoiceSynthesizer:
             win_length = self.config.get('win_length', 1024)
             
             # Create spectrogram using OpenVoice-style processing
-            spec = self._spectrogram_torch(y, filter_length, sampling_rate, hop_length, win_length, center=False)
+            spec = get_frontend(filter_length, hop_length, win_length, device=y.device, eps=0)(y)
             
             # Extract reference embedding using model's ref_enc
             with torch.no_grad():
@@ -441,51 +452,6 @@ class VoiceSynthesizer:
             logger.warning(f"[VoiceSynth] Improved reference embedding extraction failed: {e}, falling back to basic method")
             return self._extract_reference_embedding(reference_audio)
     
-    def _spectrogram_torch(self, y, n_fft, sampling_rate, hop_size, win_size, center=False):
-        """OpenVoice-style spectrogram computation."""
-        if torch.min(y) < -1.1:
-            logger.debug("Audio min value is %f", torch.min(y))
-        if torch.max(y) > 1.1:
-            logger.debug("Audio max value is %f", torch.max(y))
-
-        # Create hann window
-        dtype_device = str(y.dtype) + "_" + str(y.device)
-        wnsize_dtype_device = str(win_size) + "_" + dtype_device
-        if not hasattr(self, '_hann_windows'):
-            self._hann_windows = {}
-        if wnsize_dtype_device not in self._hann_windows:
-            self._hann_windows[wnsize_dtype_device] = torch.hann_window(win_size).to(
-                dtype=y.dtype, device=y.device
-            )
-
-        # Padding
-        y = torch.nn.functional.pad(
-            y.unsqueeze(1),
-            (int((n_fft - hop_size) / 2), int((n_fft - hop_size) / 2)),
-            mode="reflect",
-        )
-        y = y.squeeze(1)
-
-        # STFT with proper complex tensor handling for newer PyTorch versions
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore", UserWarning)
-            spec = torch.stft(
-                y,
-                n_fft,
-                hop_length=hop_size,
-                win_length=win_size,
-                window=self._hann_windows[wnsize_dtype_device],
-                center=center,
-                pad_mode="reflect",
-                normalized=False,
-                onesided=True,
-                return_complex=True,  # Use new PyTorch API
-            )
-
-        # Convert complex to magnitude
-        spec = torch.abs(spec)
-        return spec
-    
     def _create_enhanced_pseudo_embedding(self, audio_ref, sampling_rate):
         """Create an enhanced pseudo embedding when no trained reference encoder is available."""
         try:
@@ -615,7 +581,7 @@ class VoiceSynthesizer:
                 self._ref_cache = {}
             if reference_audio in self._ref_cache:
                 return self._ref_cache[reference_audio]
-            wav, sr = librosa.load(reference_audio, sr=self.config.get('sampling_rate', 22050))
+            wav, sr = audio_io.load_audio(reference_audio, sr=self.config.get('sampling_rate', 22050))
             # Compute mel spectrogram matching expected spec_channels if possible
             n_fft = 1024
             hop = 256
@@ -716,10 +682,11 @@ class VoiceSynthesizer:
         g_latent = None
         use_reference_embedding = False
         if reference_audio:
-            g_latent = self._extract_reference_embedding_improved(reference_audio)
-            if g_latent is None:
-                logger.debug("[VoiceSynth] Falling back to basic reference embedding")
-                g_latent = self._extract_reference_embedding(reference_audio)
+            with metrics.span('se_extract'):
+                g_latent = self._extract_reference_embedding_improved(reference_audio)
+                if g_latent is None:
+                    logger.debug("[VoiceSynth] Falling back to basic reference embedding")
+                    g_latent = self._extract_reference_embedding(reference_audio)
             if g_latent is not None:
                 use_reference_embedding = True
         
@@ -730,10 +697,14 @@ class VoiceSynthesizer:
         
         audio_segments = []
         sampling_rate = self.config.get('sampling_rate', 22050)
+        hop_length = self.config.get('hop_length', 256)
+        timeline_segments = []
+        offset = 0
         
         for i, sentence in enumerate(sentences):
             # 1. Text -> ids
-            seq = self._text_to_ids(sentence, language=language, force_chars=False)
+            with metrics.span('tokenize'):
+                seq = self._text_to_ids(sentence, language=language, force_chars=False)
             logger.info(f'[VoiceSynth] Sentence {i+1}: "{sentence}" -> {len(seq)} tokens: {seq[:20]}{"..." if len(seq) > 20 else ""}')
             if seq and self.enable_prosody_heuristics:
                 vowel_chars = set('aeiou')
@@ -761,18 +732,31 @@ class VoiceSynthesizer:
             
             if audio_segment is not None:
                 audio_segments.append(audio_segment)
+                if self._last_alignment is not None:
+                    used_seq, durations = self._last_alignment
+                    token_symbols = [None if j == self.blank_id else self.symbols[j] for j in used_seq]
+                    timeline_segments.append(alignment_timeline.align_tokens(
+                        token_symbols, durations, hop_length, offset_samples=offset))
+                offset += len(audio_segment)
                 
                 # Add pause between sentences (50ms)
                 if i < len(sentences) - 1:
                     pause_samples = int(0.05 * sampling_rate)  # 50ms pause
                     silence = np.zeros(pause_samples, dtype=np.float32)
                     audio_segments.append(silence)
+                    offset += pause_samples
 
         if not audio_segments:
             raise RuntimeError("Failed to synthesize any audio")
         
         # Concatenate all audio segments
         final_audio = np.concatenate(audio_segments)
+        try:
+            self.last_timeline = alignment_timeline.build_timeline(
+                text, timeline_segments, sampling_rate, num_samples=len(final_audio))
+        except Exception as e:
+            logger.debug(f"[VoiceSynth] Timeline build failed: {e}")
+            self.last_timeline = None
         return final_audio, sampling_rate
 
     def _synthesize_sequence(self, seq: List[int], g_latent, noise_scale: float = 0.667, 
@@ -789,6 +773,7 @@ class VoiceSynthesizer:
         Returns:
             Audio array or None if failed
         """
+        self._last_alignment = None
         if not seq:
             return None
             
@@ -854,9 +839,15 @@ class VoiceSynthesizer:
                         new_scale = length_scale * 1.15
                         logger.debug(f"[VoiceSynth] Adjusting length_scale to {new_scale}")
                         infer_kwargs['length_scale'] = new_scale
-                        y_hat, _, _, _ = self.model.infer(x, x_lengths, **infer_kwargs)
+                        y_hat, attn, _, _ = self.model.infer(x, x_lengths, **infer_kwargs)
             except Exception as e:
                 logger.debug(f"[VoiceSynth] Duration smoothing failed: {e}")
+            
+            # Keep the alignment so synthesize_audio can build a timeline
+            try:
+                self._last_alignment = (seq, alignment_timeline.token_durations(attn))
+            except Exception as e:
+                logger.debug(f"[VoiceSynth] Alignment capture failed: {e}")
                 
             audio_segment = y_hat[0, 0].data.cpu().numpy()
             
@@ -902,10 +893,11 @@ class VoiceSynthesizer:
         # Get reference embedding once for all sentences - try improved method first
         g_latent = None
         if reference_audio:
-            g_latent = self._extract_reference_embedding_improved(reference_audio)
-            if g_latent is None:
-                logger.debug("[VoiceSynth] Falling back to basic reference embedding")
-                g_latent = self._extract_reference_embedding(reference_audio)
+            with metrics.span('se_extract'):
+                g_latent = self._extract_reference_embedding_improved(reference_audio)
+                if g_latent is None:
+                    logger.debug("[VoiceSynth] Falling back to basic reference embedding")
+                    g_latent = self._extract_reference_embedding(reference_audio)
         
         # Speaker / style conditioning setup
         speakers_map = self.config.get('speakers', {}) if isinstance(self.config, dict) else {}
@@ -929,7 +921,8 @@ class VoiceSynthesizer:
         
         for i, sentence in enumerate(sentences):
             # 1. Text -> ids
-            seq = self._text_to_ids(sentence, language=language, force_chars=False)
+            with metrics.span('tokenize'):
+                seq = self._text_to_ids(sentence, language=language, force_chars=False)
             logger.info(f'[VoiceSynth] Sentence {i+1}: "{sentence}" -> {len(seq)} tokens: {seq[:20]}{"..." if len(seq) > 20 else ""}')
             if seq and self.enable_prosody_heuristics:
                 vowel_chars = set('aeiou')
@@ -5,25 +5,47 @@ import soundfile
 from . import utils
 from . import commons
 import os
-import librosa
-from .text import text_to_sequence
-from .mel_processing import spectrogram_torch
+from concurrent.futures import ThreadPoolExecutor
+from .text import text_to_sequence, _clean_text
+from . import timeline
+from .mel_processing import get_frontend
 from .models import SynthesizerTrn
+from .. import metrics
+from ..audio_io import load_audio
+from .. import precision as _precision
+
+
+def _tensor_bytes(tensors):
+    return sum(t.numel() * t.element_size() for t in tensors)
 
 
 class OpenVoiceBaseClass(object):
+    """
+    Loads one SynthesizerTrn from a config and checkpoint.
+
+    roles selects the graph that is built (see models.ROLE_MODULES): 'tts' for the base
+    speaker, 'conversion' and/or 'se' for the converter, 'full' for everything. The
+    default is the subclass's default_roles.
+    load_ckpt() then only loads the state-dict keys of the built submodules.
+    """
+
+    default_roles = None
+
     def __init__(self, 
                 config_path, 
-                device='cuda:0'):
+                device='cuda:0',
+                roles=None):
         if 'cuda' in device:
             assert torch.cuda.is_available()
 
         hps = utils.get_hparams_from_file(config_path)
+        roles = roles or self.default_roles
 
         model = SynthesizerTrn(
             len(getattr(hps, 'symbols', [])),
             hps.data.filter_length // 2 + 1,
             n_speakers=hps.data.n_speakers,
+            roles=roles,
             **hps.model,
         ).to(device)
 
@@ -31,15 +53,57 @@ class OpenVoiceBaseClass(object):
         self.model = model
         self.hps = hps
         self.device = device
+        self.roles = model.roles
+        # filled by load_ckpt: bytes of checkpoint tensors loaded / skipped for this role
+        self.memory_report = None
+        # filled by set_precision: effective precision and fp32 parity of the converted modules
+        self.precision_report = None
+
+    def resident_bytes(self) -> int:
+        """Bytes held by the model's parameters and buffers."""
+        return _tensor_bytes(list(self.model.parameters()) + list(self.model.buffers()))
 
     def load_ckpt(self, ckpt_path):
-        checkpoint_dict = torch.load(ckpt_path, map_location=torch.device(self.device))
-        a, b = self.model.load_state_dict(checkpoint_dict['model'], strict=False)
+        try:
+            # mmap keeps the skipped submodules' tensors out of memory entirely
+            checkpoint_dict = torch.load(ckpt_path, map_location=torch.device(self.device), mmap=True)
+        except (TypeError, RuntimeError):
+            # torch < 2.1 or a legacy (non-zip) checkpoint
+            checkpoint_dict = torch.load(ckpt_path, map_location=torch.device(self.device))
+        state = checkpoint_dict['model']
+        built = set(name for name, _ in self.model.named_children())
+        if self.roles is not None:
+            skipped = {k: v for k, v in state.items() if k.split('.', 1)[0] not in built}
+            state = {k: v for k, v in state.items() if k.split('.', 1)[0] in built}
+        else:
+            skipped = {}
+        a, b = self.model.load_state_dict(state, strict=False)
         print("Loaded checkpoint '{}'".format(ckpt_path))
         print('missing/unexpected keys:', a, b)
 
+        self.memory_report = {
+            'roles': self.roles,
+            'loaded_bytes': _tensor_bytes(state.values()),
+            'skipped_bytes': _tensor_bytes(skipped.values()),
+            'skipped_modules': sorted(set(k.split('.', 1)[0] for k in skipped)),
+        }
+        if skipped:
+            print("Role {}: skipped {} ({:.1f} MB), {:.1f} MB resident".format(
+                '+'.join(self.roles), ', '.join(self.memory_report['skipped_modules']),
+                self.memory_report['skipped_bytes'] / 2**20, self.resident_bytes() / 2**20))
+        del checkpoint_dict, skipped
+
+    def set_precision(self, precision='fp32', check=True):
+        """
+        Run the vocoder and flow in 'bf16'/'fp16' (or 'auto'); see voice/precision.py.
+        Call after load_ckpt. Falls back to fp32 if the parity check fails.
+        """
+        self.precision_report = _precision.apply_precision(self.model, precision, self.device, check=check)
+        return self.precision_report
+
 
 class BaseSpeakerTTS(OpenVoiceBaseClass):
+    default_roles = ('tts',)
     language_marks = {
         "english": "EN",
         "chinese": "ZH",
@@ -94,27 +158,82 @@ class BaseSpeakerTTS(OpenVoiceBaseClass):
         print(" > ===========================")
         return texts
 
-    def tts(self, text, output_path, speaker, language='English', speed=1.0):
+    def _symbols_for_piece(self, t):
+        """Cleaned symbols and token ids for one marked text piece (same ids as get_text)."""
+        symbol_to_id = {s: i for i, s in enumerate(self.hps.symbols)}
+        cleaned = _clean_text(t, self.hps.data.text_cleaners)
+        kept = [s for s in cleaned if s in symbol_to_id]
+        ids = [symbol_to_id[s] for s in kept]
+        token_symbols = list(kept)
+        if self.hps.data.add_blank:
+            ids = commons.intersperse(ids, 0)
+            token_symbols = commons.intersperse(token_symbols, None)
+        return torch.LongTensor(ids), token_symbols
+
+    def tts_with_timeline(self, text, speaker, language='English', speed=1.0):
+        """
+        Synthesize text piece by piece and return the audio with a timeline built from the
+        duration predictor's alignment. tts() is this without the timeline.
+
+        Returns:
+            (audio, timeline): float32 audio and a dict with per-token sample ranges and
+            word/character timings over ``text`` (see timeline.build_timeline).
+        """
         mark = self.language_marks.get(language.lower(), None)
         assert mark is not None, f"language {language} is not supported"
 
         texts = self.split_sentences_into_pieces(text, mark)
+        sr = self.hps.data.sampling_rate
+        hop = self.hps.data.hop_length
+        gap = int((sr * 0.05) / speed)
 
         audio_list = []
+        segments = []
+        offset = 0
         for t in texts:
             t = re.sub(r'([a-z])([A-Z])', r'\1 \2', t)
-            t = f'[{mark}]{t}[{mark}]'
-            stn_tst = self.get_text(t, self.hps, False)
+            with metrics.span('tokenize'):
+                stn_tst, token_symbols = self._symbols_for_piece(f'[{mark}]{t}[{mark}]')
             device = self.device
             speaker_id = self.hps.speakers[speaker]
             with torch.no_grad():
                 x_tst = stn_tst.unsqueeze(0).to(device)
                 x_tst_lengths = torch.LongTensor([stn_tst.size(0)]).to(device)
                 sid = torch.LongTensor([speaker_id]).to(device)
-                audio = self.model.infer(x_tst, x_tst_lengths, sid=sid, noise_scale=0.667, noise_scale_w=0.6,
-                                    length_scale=1.0 / speed)[0][0, 0].data.cpu().float().numpy()
+                o, attn, _, _ = self.model.infer(x_tst, x_tst_lengths, sid=sid, noise_scale=0.667, noise_scale_w=0.6,
+                                                 length_scale=1.0 / speed)
+                audio = o[0, 0].data.cpu().float().numpy()
+            segments.append(timeline.align_tokens(token_symbols, timeline.token_durations(attn), hop,
+                                                  offset_samples=offset))
             audio_list.append(audio)
-        audio = self.audio_numpy_concat(audio_list, sr=self.hps.data.sampling_rate, speed=speed)
+            offset += len(audio) + gap
+        audio = self.audio_numpy_concat(audio_list, sr=sr, speed=speed)
+        return audio, timeline.build_timeline(text, segments, sr, num_samples=len(audio))
+
+    def infer_batch(self, phoneme_list, speakers, speed=1.0, noise_scale=0.667, noise_scale_w=0.6):
+        """
+        Padded batched inference over several token sequences (as returned by get_text).
+
+        speakers has one speaker name per sequence. Returns one float32 array per
+        sequence, trimmed to its own predicted length.
+        """
+        device = self.device
+        lengths = [int(p.shape[0]) for p in phoneme_list]
+        x = torch.zeros(len(phoneme_list), max(lengths), dtype=torch.long)
+        for i, p in enumerate(phoneme_list):
+            x[i, :lengths[i]] = p
+        sid = torch.LongTensor([self.hps.speakers[s] for s in speakers])
+        with torch.no_grad():
+            o, _, y_mask, _ = self.model.infer(x.to(device), torch.LongTensor(lengths).to(device),
+                                               sid=sid.to(device), noise_scale=noise_scale,
+                                               noise_scale_w=noise_scale_w, length_scale=1.0 / speed)
+            frames = y_mask.sum([1, 2]).long().tolist()
+            o = o[:, 0].data.cpu().float().numpy()
+        hop = self.hps.data.hop_length
+        return [o[i, :frames[i] * hop].copy() for i in range(len(lengths))]
+
+    def tts(self, text, output_path, speaker, language='English', speed=1.0):
+        audio, _ = self.tts_with_timeline(text, speaker, language=language, speed=speed)
 
         if output_path is None:
             return audio
@@ -123,6 +242,9 @@ class BaseSpeakerTTS(OpenVoiceBaseClass):
 
 
 class ToneColorConverter(OpenVoiceBaseClass):
+    # roles=('se',) gives an embedding extractor without the conversion graph
+    default_roles = ('conversion', 'se')
+
     def __init__(self, *args, enable_watermark=True, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -136,29 +258,37 @@ class ToneColorConverter(OpenVoiceBaseClass):
         else:
             self.watermark_model = None
         self.version = getattr(self.hps, '_version_', "v1")
+        data = self.hps.data
+        self.frontend = get_frontend(data.filter_length, data.hop_length, data.win_length,
+                                     device=torch.device(self.device))
+
 
 
+    def extract_se(self, ref_wav_list, se_save_path=None, batch_size=8, workers=4):
+        """
+        Mean speaker embedding of one or more reference files.
 
-    def extract_se(self, ref_wav_list, se_save_path=None):
+        Files are decoded by a thread pool (the next batch while the current one runs)
+        and embedded batch_size at a time, so memory stays bounded for many clips.
+        """
         if isinstance(ref_wav_list, str):
             ref_wav_list = [ref_wav_list]
-        
-        device = self.device
-        hps = self.hps
-        gs = []
-        
-        for fname in ref_wav_list:
-            audio_ref, sr = librosa.load(fname, sr=hps.data.sampling_rate)
-            y = torch.FloatTensor(audio_ref)
-            y = y.to(device)
-            y = y.unsqueeze(0)
-            y = spectrogram_torch(y, hps.data.filter_length,
-                                        hps.data.sampling_rate, hps.data.hop_length, hps.data.win_length,
-                                        center=False).to(device)
-            with torch.no_grad():
-                g = self.model.ref_enc(y.transpose(1, 2)).unsqueeze(-1)
-                gs.append(g.detach())
-        gs = torch.stack(gs).mean(0)
+        sr = self.hps.data.sampling_rate
+
+        def load(fname):
+            return load_audio(fname, sr=sr)[0]
+
+        total, count = None, 0
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(ref_wav_list)))) as pool:
+            chunks = [ref_wav_list[i:i + batch_size] for i in range(0, len(ref_wav_list), batch_size)]
+            pending = [pool.submit(load, f) for f in chunks[0]] if chunks else []
+            for i in range(len(chunks)):
+                audios = [f.result() for f in pending]
+                pending = [pool.submit(load, f) for f in chunks[i + 1]] if i + 1 < len(chunks) else []
+                g = self.extract_se_batch(audios)
+                total = g.sum(0) if total is None else total + g.sum(0)
+                count += g.size(0)
+        gs = (total / count)[None, :, None]
 
         if se_save_path is not None:
             os.makedirs(os.path.dirname(se_save_path), exist_ok=True)
@@ -166,18 +296,36 @@ class ToneColorConverter(OpenVoiceBaseClass):
 
         return gs
 
+    def extract_se_batch(self, audios):
+        """
+        Speaker embeddings [N, gin] of clips of any length, in one padded spectrogram and
+        ref_enc pass. Each clip's frames match a single-clip spectrogram (see
+        SpectrogramFrontend.batch), and ref_enc masks the padding.
+        """
+        with metrics.span('se_extract'):
+            spec, lengths = self.frontend.batch(audios)
+            with torch.no_grad():
+                g = self.model.ref_enc(spec.transpose(1, 2), lengths=lengths)
+        return g.detach()
+
+    def extract_se_from_audio(self, audio_ref):
+        """Speaker embedding for audio already decoded at the model sampling rate."""
+        with metrics.span('se_extract'):
+            y = self.frontend(torch.FloatTensor(audio_ref).to(self.device).unsqueeze(0))
+            with torch.no_grad():
+                g = self.model.ref_enc(y.transpose(1, 2)).unsqueeze(-1)
+        return g.detach()
+
     def convert(self, audio_src_path, src_se, tgt_se, output_path=None, tau=0.3, message="default"):
         hps = self.hps
         # load audio
-        audio, sample_rate = librosa.load(audio_src_path, sr=hps.data.sampling_rate)
+        audio, sample_rate = load_audio(audio_src_path, sr=hps.data.sampling_rate)
         audio = torch.tensor(audio).float()
         
-        with torch.no_grad():
+        with torch.no_grad(), metrics.span('conversion'):
             y = torch.FloatTensor(audio).to(self.device)
             y = y.unsqueeze(0)
-            spec = spectrogram_torch(y, hps.data.filter_length,
-                                    hps.data.sampling_rate, hps.data.hop_length, hps.data.win_length,
-                                    center=False).to(self.device)
+            spec = self.frontend(y)
             spec_lengths = torch.LongTensor([spec.size(-1)]).to(self.device)
             audio = self.model.voice_conversion(spec, spec_lengths, sid_src=src_se, sid_tgt=tgt_se, tau=tau)[0][
                         0, 0].data.cpu().float().numpy()
@@ -187,6 +335,26 @@ class ToneColorConverter(OpenVoiceBaseClass):
             else:
                 soundfile.write(output_path, audio, hps.data.sampling_rate)
     
+    def convert_batch(self, audios, src_se, tgt_ses, tau=0.3, message="default"):
+        """
+        Convert several clips (float arrays at the model sampling rate) in one padded batch.
+
+        src_se is shared by all clips, tgt_ses has one embedding per clip. Returns one
+        float32 array per clip, as long as the input clip's whole frames.
+        """
+        hps = self.hps
+        device = self.device
+        with torch.no_grad(), metrics.span('conversion'):
+            spec, spec_lengths = self.frontend.batch(audios)
+            lengths = spec_lengths.tolist()
+            g_src = src_se.to(device).expand(len(audios), -1, -1)
+            g_tgt = torch.cat([se.to(device) for se in tgt_ses], 0)
+            o = self.model.voice_conversion(spec, spec_lengths.to(device),
+                                            sid_src=g_src, sid_tgt=g_tgt, tau=tau)[0]
+            o = o[:, 0].data.cpu().float().numpy()
+        hop = hps.data.hop_length
+        return [self.add_watermark(o[i, :lengths[i] * hop].copy(), message) for i in range(len(lengths))]
+
     def add_watermark(self, audio, message):
         if self.watermark_model is None:
             return audio
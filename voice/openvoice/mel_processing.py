@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import torch
 import torch.utils.data
 from librosa.filters import mel as librosa_mel_fn
@@ -33,102 +35,157 @@ def spectral_de_normalize_torch(magnitudes):
     return output
 
 
-mel_basis = {}
-hann_window = {}
+class SpectrogramFrontend(torch.nn.Module):
+    """
+    Linear magnitude spectrogram for one STFT config, shared by embedding extraction and
+    conversion.
+
+    The Hann window (method='stft') or the windowed Fourier basis (method='conv') is
+    built once and kept as a buffer, and nothing reads tensor values back to the host,
+    so calls never synchronize with the device. The signal is reflect-padded by
+    (n_fft - hop) / 2 on both sides (plus n_fft / 2 with center=True), as OpenVoice
+    expects. eps is added under the square root (0 gives the plain magnitude).
+
+    forward() takes [T] or [B, T]. batch() takes clips of different lengths and pads
+    each one on its own, so every row matches forward() on that clip. stream() returns
+    a Streamer that yields the same frames chunk by chunk.
+    """
+
+    def __init__(self, n_fft, hop_size, win_size, center=False, eps=1e-6, method='stft'):
+        super().__init__()
+        if method not in ('stft', 'conv'):
+            raise ValueError(f"method must be 'stft' or 'conv', got {method!r}")
+        self.n_fft = n_fft
+        self.hop_size = hop_size
+        self.win_size = win_size
+        self.center = center
+        self.eps = eps
+        self.method = method
+        self.freqs = n_fft // 2 + 1
+        self.pad = (n_fft - hop_size) // 2
+        window = torch.hann_window(win_size)
+        self.register_buffer('window', window, persistent=False)
+        if method == 'conv':
+            left = (n_fft - win_size) // 2
+            window = torch.nn.functional.pad(window, (left, n_fft - win_size - left))
+            fourier = torch.view_as_real(torch.fft.fft(torch.eye(n_fft)))[:self.freqs]  # [F, n_fft, 2]
+            basis = fourier.permute(2, 0, 1).reshape(-1, 1, n_fft) * window
+            self.register_buffer('basis', basis, persistent=False)
+
+    def _pad(self, y):
+        """Reflect padding of [B, T]."""
+        total = self.pad + (self.n_fft // 2 if self.center else 0)
+        return torch.nn.functional.pad(y.unsqueeze(1), (total, total), mode='reflect').squeeze(1)
+
+    def _frames(self, y):
+        """Magnitudes [B, F, frames] of already padded [B, T]."""
+        if self.method == 'conv':
+            out = torch.nn.functional.conv1d(y.unsqueeze(1), self.basis, stride=self.hop_size)
+            power = out[:, :self.freqs].pow(2) + out[:, self.freqs:].pow(2)
+        else:
+            spec = torch.stft(y, self.n_fft, hop_length=self.hop_size, win_length=self.win_size,
+                              window=self.window, center=False, normalized=False, onesided=True,
+                              return_complex=True)
+            power = torch.view_as_real(spec).pow(2).sum(-1)
+        return torch.sqrt(power + self.eps) if self.eps else torch.sqrt(power)
+
+    def forward(self, y):
+        squeeze = y.dim() == 1
+        spec = self._frames(self._pad(y[None] if squeeze else y))
+        return spec[0] if squeeze else spec
+
+    def num_frames(self, samples):
+        """Frames of a clip of this many samples (int or LongTensor)."""
+        total = self.pad + (self.n_fft // 2 if self.center else 0)
+        return (samples + 2 * total - self.n_fft) // self.hop_size + 1
+
+    def batch(self, clips):
+        """
+        Spectrograms of 1-D clips (arrays or tensors) of any length, in one pass.
+
+        Returns (spec [B, F, max_frames] with frames past each clip's end zeroed,
+        lengths [B] as a CPU LongTensor).
+        """
+        ref = self.window
+        clips = [torch.as_tensor(c).to(device=ref.device, dtype=ref.dtype) for c in clips]
+        padded = [self._pad(c[None])[0] for c in clips]
+        y = torch.zeros(len(padded), max(p.numel() for p in padded), dtype=ref.dtype, device=ref.device)
+        for row, p in zip(y, padded):
+            row[:p.numel()] = p
+        lengths = torch.LongTensor([self.num_frames(c.numel()) for c in clips])
+        spec = self._frames(y)
+        mask = torch.arange(spec.size(-1), device=ref.device)[None, :] < lengths.to(ref.device)[:, None]
+        return spec * mask[:, None, :].to(spec.dtype), lengths
+
+    def stream(self):
+        return Streamer(self)
+
+
+class Streamer:
+    """
+    Incremental spectrogram of one signal: push() returns the frames completed by each
+    chunk and flush() the rest, together exactly the frames of forward() on the whole
+    signal. The first chunk must be longer than the padding; center=True is not supported.
+    """
+
+    def __init__(self, frontend):
+        if frontend.center:
+            raise ValueError("streaming needs center=False")
+        self.frontend = frontend
+        self.buffer = None
+
+    def push(self, chunk):
+        f = self.frontend
+        chunk = chunk if chunk.dim() == 2 else chunk[None]
+        if self.buffer is None:
+            self.buffer = torch.nn.functional.pad(chunk.unsqueeze(1), (f.pad, 0), mode='reflect').squeeze(1)
+        else:
+            self.buffer = torch.cat([self.buffer, chunk], dim=-1)
+        return self._emit()
+
+    def flush(self):
+        f = self.frontend
+        if self.buffer is None:
+            return None
+        self.buffer = torch.nn.functional.pad(self.buffer.unsqueeze(1), (0, f.pad), mode='reflect').squeeze(1)
+        frames = self._emit()
+        self.buffer = None
+        return frames
+
+    def _emit(self):
+        f = self.frontend
+        n = max(0, (self.buffer.size(-1) - f.n_fft) // f.hop_size + 1)
+        if n == 0:
+            return self.buffer.new_zeros(self.buffer.size(0), f.freqs, 0)
+        frames = f._frames(self.buffer[:, :(n - 1) * f.hop_size + f.n_fft])
+        self.buffer = self.buffer[:, n * f.hop_size:]
+        return frames
+
+
+@lru_cache(maxsize=None)
+def get_frontend(n_fft, hop_size, win_size, center=False, device='cpu', dtype=torch.float32, eps=1e-6,
+                 method='stft'):
+    """The shared SpectrogramFrontend for a config, built once per device and dtype."""
+    frontend = SpectrogramFrontend(n_fft, hop_size, win_size, center=center, eps=eps, method=method)
+    return frontend.to(device=device, dtype=dtype)
+
+
+@lru_cache(maxsize=None)
+def _mel_basis(sampling_rate, n_fft, num_mels, fmin, fmax, device, dtype):
+    mel = librosa_mel_fn(sr=sampling_rate, n_fft=n_fft, n_mels=num_mels, fmin=fmin, fmax=fmax)
+    return torch.from_numpy(mel).to(dtype=dtype, device=device)
 
 
 def spectrogram_torch(y, n_fft, sampling_rate, hop_size, win_size, center=False):
-    if torch.min(y) < -1.1:
-        print("min value is ", torch.min(y))
-    if torch.max(y) > 1.1:
-        print("max value is ", torch.max(y))
-
-    global hann_window
-    dtype_device = str(y.dtype) + "_" + str(y.device)
-    wnsize_dtype_device = str(win_size) + "_" + dtype_device
-    if wnsize_dtype_device not in hann_window:
-        hann_window[wnsize_dtype_device] = torch.hann_window(win_size).to(
-            dtype=y.dtype, device=y.device
-        )
-
-    y = torch.nn.functional.pad(
-        y.unsqueeze(1),
-        (int((n_fft - hop_size) / 2), int((n_fft - hop_size) / 2)),
-        mode="reflect",
-    )
-    y = y.squeeze(1)
-
-    spec = torch.stft(
-        y,
-        n_fft,
-        hop_length=hop_size,
-        win_length=win_size,
-        window=hann_window[wnsize_dtype_device],
-        center=center,
-        pad_mode="reflect",
-        normalized=False,
-        onesided=True,
-        return_complex=False,
-    )
-
-    spec = torch.sqrt(spec.pow(2).sum(-1) + 1e-6)
-    return spec
+    return get_frontend(n_fft, hop_size, win_size, center, y.device, y.dtype)(y)
 
 
 def spectrogram_torch_conv(y, n_fft, sampling_rate, hop_size, win_size, center=False):
-    # if torch.min(y) < -1.:
-    #     print('min value is ', torch.min(y))
-    # if torch.max(y) > 1.:
-    #     print('max value is ', torch.max(y))
-
-    global hann_window
-    dtype_device = str(y.dtype) + '_' + str(y.device)
-    wnsize_dtype_device = str(win_size) + '_' + dtype_device
-    if wnsize_dtype_device not in hann_window:
-        hann_window[wnsize_dtype_device] = torch.hann_window(win_size).to(dtype=y.dtype, device=y.device)
-
-    y = torch.nn.functional.pad(y.unsqueeze(1), (int((n_fft-hop_size)/2), int((n_fft-hop_size)/2)), mode='reflect')
-    
-    # ******************** original ************************#
-    # y = y.squeeze(1)
-    # spec1 = torch.stft(y, n_fft, hop_length=hop_size, win_length=win_size, window=hann_window[wnsize_dtype_device],
-    #                   center=center, pad_mode='reflect', normalized=False, onesided=True, return_complex=False)
-
-    # ******************** ConvSTFT ************************#
-    freq_cutoff = n_fft // 2 + 1
-    fourier_basis = torch.view_as_real(torch.fft.fft(torch.eye(n_fft)))
-    forward_basis = fourier_basis[:freq_cutoff].permute(2, 0, 1).reshape(-1, 1, fourier_basis.shape[1])
-    forward_basis = forward_basis * torch.as_tensor(librosa.util.pad_center(torch.hann_window(win_size), size=n_fft)).float()
-
-    import torch.nn.functional as F
-
-    # if center:
-    #     signal = F.pad(y[:, None, None, :], (n_fft // 2, n_fft // 2, 0, 0), mode = 'reflect').squeeze(1)
-    assert center is False
-
-    forward_transform_squared = F.conv1d(y, forward_basis.to(y.device), stride = hop_size)
-    spec2 = torch.stack([forward_transform_squared[:, :freq_cutoff, :], forward_transform_squared[:, freq_cutoff:, :]], dim = -1)
-
-
-    # ******************** Verification ************************#
-    spec1 = torch.stft(y.squeeze(1), n_fft, hop_length=hop_size, win_length=win_size, window=hann_window[wnsize_dtype_device],
-                      center=center, pad_mode='reflect', normalized=False, onesided=True, return_complex=False)
-    assert torch.allclose(spec1, spec2, atol=1e-4)
-
-    spec = torch.sqrt(spec2.pow(2).sum(-1) + 1e-6)
-    return spec
+    return get_frontend(n_fft, hop_size, win_size, center, y.device, y.dtype, method='conv')(y)
 
 
 def spec_to_mel_torch(spec, n_fft, num_mels, sampling_rate, fmin, fmax):
-    global mel_basis
-    dtype_device = str(spec.dtype) + "_" + str(spec.device)
-    fmax_dtype_device = str(fmax) + "_" + dtype_device
-    if fmax_dtype_device not in mel_basis:
-        mel = librosa_mel_fn(sampling_rate, n_fft, num_mels, fmin, fmax)
-        mel_basis[fmax_dtype_device] = torch.from_numpy(mel).to(
-            dtype=spec.dtype, device=spec.device
-        )
-    spec = torch.matmul(mel_basis[fmax_dtype_device], spec)
+    spec = torch.matmul(_mel_basis(sampling_rate, n_fft, num_mels, fmin, fmax, spec.device, spec.dtype), spec)
     spec = spectral_normalize_torch(spec)
     return spec
 
@@ -136,48 +193,5 @@ def spec_to_mel_torch(spec, n_fft, num_mels, sampling_rate, fmin, fmax):
 def mel_spectrogram_torch(
     y, n_fft, num_mels, sampling_rate, hop_size, win_size, fmin, fmax, center=False
 ):
-    if torch.min(y) < -1.0:
-        print("min value is ", torch.min(y))
-    if torch.max(y) > 1.0:
-        print("max value is ", torch.max(y))
-
-    global mel_basis, hann_window
-    dtype_device = str(y.dtype) + "_" + str(y.device)
-    fmax_dtype_device = str(fmax) + "_" + dtype_device
-    wnsize_dtype_device = str(win_size) + "_" + dtype_device
-    if fmax_dtype_device not in mel_basis:
-        mel = librosa_mel_fn(sampling_rate, n_fft, num_mels, fmin, fmax)
-        mel_basis[fmax_dtype_device] = torch.from_numpy(mel).to(
-            dtype=y.dtype, device=y.device
-        )
-    if wnsize_dtype_device not in hann_window:
-        hann_window[wnsize_dtype_device] = torch.hann_window(win_size).to(
-            dtype=y.dtype, device=y.device
-        )
-
-    y = torch.nn.functional.pad(
-        y.unsqueeze(1),
-        (int((n_fft - hop_size) / 2), int((n_fft - hop_size) / 2)),
-        mode="reflect",
-    )
-    y = y.squeeze(1)
-
-    spec = torch.stft(
-        y,
-        n_fft,
-        hop_length=hop_size,
-        win_length=win_size,
-        window=hann_window[wnsize_dtype_device],
-        center=center,
-        pad_mode="reflect",
-        normalized=False,
-        onesided=True,
-        return_complex=False,
-    )
-
-    spec = torch.sqrt(spec.pow(2).sum(-1) + 1e-6)
-
-    spec = torch.matmul(mel_basis[fmax_dtype_device], spec)
-    spec = spectral_normalize_torch(spec)
-
-    return spec
\ No newline at end of file
+    spec = spectrogram_torch(y, n_fft, sampling_rate, hop_size, win_size, center)
+    return spec_to_mel_torch(spec, n_fft, num_mels, sampling_rate, fmin, fmax)
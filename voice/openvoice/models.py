@@ -6,6 +6,7 @@ from torch.nn import functional as F
 from . import commons
 from . import modules
 from . import attentions
+from .. import metrics
 
 from torch.nn import Conv1d, ConvTranspose1d, Conv2d
 from torch.nn.utils import weight_norm, remove_weight_norm, spectral_norm
@@ -336,17 +337,27 @@ class ReferenceEncoder(nn.Module):
         else:
             self.layernorm = None
 
-    def forward(self, inputs, mask=None):
+    def forward(self, inputs, mask=None, lengths=None):
+        """
+        lengths --- [N] valid frames of each zero-padded input (CPU LongTensor); padded
+        frames are zeroed after every layer and left out of the GRU, so each row matches
+        the unpadded input.
+        """
         N = inputs.size(0)
 
         out = inputs.view(N, 1, -1, self.spec_channels)  # [N, 1, Ty, n_freqs]
         if self.layernorm is not None:
             out = self.layernorm(out)
+        if lengths is not None:
+            out = out * self._time_mask(lengths, out)
 
         for conv in self.convs:
             out = conv(out)
             # out = wn(out)
             out = F.relu(out)  # [N, 128, Ty//2^K, n_mels//2^K]
+            if lengths is not None:
+                lengths = (lengths - 1) // 2 + 1
+                out = out * self._time_mask(lengths, out)
 
         out = out.transpose(1, 2)  # [N, Ty//2^K, 128, n_mels//2^K]
         T = out.size(1)
@@ -354,10 +365,17 @@ class ReferenceEncoder(nn.Module):
         out = out.contiguous().view(N, T, -1)  # [N, Ty//2^K, 128*n_mels//2^K]
 
         self.gru.flatten_parameters()
+        if lengths is not None:
+            out = nn.utils.rnn.pack_padded_sequence(out, lengths, batch_first=True, enforce_sorted=False)
         memory, out = self.gru(out)  # out --- [1, N, 128]
 
         return self.proj(out.squeeze(0))
 
+    @staticmethod
+    def _time_mask(lengths, out):
+        frames = torch.arange(out.size(2), device=out.device)
+        return (frames[None, :] < lengths.to(out.device)[:, None]).to(out.dtype)[:, None, :, None]
+
     def calculate_channels(self, L, kernel_size, stride, pad, n_convs):
         for i in range(n_convs):
             L = (L - kernel_size + 2 * pad) // stride + 1
@@ -396,9 +414,35 @@ class ResidualCouplingBlock(nn.Module):
                 x = flow(x, x_mask, g=g, reverse=reverse)
         return x
 
+# Submodules each inference role needs. A model built for a subset of roles skips the
+# rest (e.g. the base speaker never runs the 16-layer posterior encoder enc_q).
+ROLE_MODULES = {
+    'tts': ('enc_p', 'sdp', 'dp', 'emb_g', 'flow', 'dec'),
+    'conversion': ('enc_q', 'flow', 'dec'),
+    'se': ('ref_enc',),
+}
+
+
+def role_modules(roles):
+    """Names of the submodules needed for roles, or None (everything) for None/'full'."""
+    if roles is None or roles == 'full':
+        return None
+    if isinstance(roles, str):
+        roles = (roles,)
+    names = set()
+    for role in roles:
+        if role not in ROLE_MODULES:
+            raise ValueError(f"Unknown model role: {role} (expected one of {sorted(ROLE_MODULES)})")
+        names.update(ROLE_MODULES[role])
+    return names
+
+
 class SynthesizerTrn(nn.Module):
     """
     Synthesizer for Training
+
+    roles limits the graph to what those inference roles use (see ROLE_MODULES);
+    None or 'full' builds every submodule, as for training.
     """
 
     def __init__(
@@ -421,75 +465,101 @@ class SynthesizerTrn(nn.Module):
         n_speakers=256,
         gin_channels=256,
         zero_g=False,
+        roles=None,
         **kwargs
     ):
         super().__init__()
+        wanted = role_modules(roles)
+        self.roles = None if wanted is None else ((roles,) if isinstance(roles, str) else tuple(roles))
 
-        self.dec = Generator(
-            inter_channels,
-            resblock,
-            resblock_kernel_sizes,
-            resblock_dilation_sizes,
-            upsample_rates,
-            upsample_initial_channel,
-            upsample_kernel_sizes,
-            gin_channels=gin_channels,
-        )
-        self.enc_q = PosteriorEncoder(
-            spec_channels,
-            inter_channels,
-            hidden_channels,
-            5,
-            1,
-            16,
-            gin_channels=gin_channels,
-        )
+        def build(name):
+            return wanted is None or name in wanted
 
-        self.flow = ResidualCouplingBlock(inter_channels, hidden_channels, 5, 1, 4, gin_channels=gin_channels)
+        if build('dec'):
+            self.dec = Generator(
+                inter_channels,
+                resblock,
+                resblock_kernel_sizes,
+                resblock_dilation_sizes,
+                upsample_rates,
+                upsample_initial_channel,
+                upsample_kernel_sizes,
+                gin_channels=gin_channels,
+            )
+        if build('enc_q'):
+            self.enc_q = PosteriorEncoder(
+                spec_channels,
+                inter_channels,
+                hidden_channels,
+                5,
+                1,
+                16,
+                gin_channels=gin_channels,
+            )
+
+        if build('flow'):
+            self.flow = ResidualCouplingBlock(inter_channels, hidden_channels, 5, 1, 4, gin_channels=gin_channels)
 
         self.n_speakers = n_speakers
         if n_speakers == 0:
-            self.ref_enc = ReferenceEncoder(spec_channels, gin_channels)
+            if build('ref_enc'):
+                self.ref_enc = ReferenceEncoder(spec_channels, gin_channels)
         else:
-            self.enc_p = TextEncoder(n_vocab,
-                inter_channels,
-                hidden_channels,
-                filter_channels,
-                n_heads,
-                n_layers,
-                kernel_size,
-                p_dropout)
-            self.sdp = StochasticDurationPredictor(hidden_channels, 192, 3, 0.5, 4, gin_channels=gin_channels)
-            self.dp = DurationPredictor(hidden_channels, 256, 3, 0.5, gin_channels=gin_channels)
-            self.emb_g = nn.Embedding(n_speakers, gin_channels)
+            if build('enc_p'):
+                self.enc_p = TextEncoder(n_vocab,
+                    inter_channels,
+                    hidden_channels,
+                    filter_channels,
+                    n_heads,
+                    n_layers,
+                    kernel_size,
+                    p_dropout)
+            if build('sdp'):
+                self.sdp = StochasticDurationPredictor(hidden_channels, 192, 3, 0.5, 4, gin_channels=gin_channels)
+            if build('dp'):
+                self.dp = DurationPredictor(hidden_channels, 256, 3, 0.5, gin_channels=gin_channels)
+            if build('emb_g'):
+                self.emb_g = nn.Embedding(n_speakers, gin_channels)
         self.zero_g = zero_g
 
+    def _require(self, role):
+        missing = [name for name in ROLE_MODULES[role] if name != 'emb_g' and not hasattr(self, name)]
+        if missing:
+            raise RuntimeError(f"Model was built for roles {self.roles} and has no {', '.join(missing)} "
+                               f"needed for '{role}'")
+
     def infer(self, x, x_lengths, sid=None, noise_scale=1, length_scale=1, noise_scale_w=1., sdp_ratio=0.2, max_len=None):
-        x, m_p, logs_p, x_mask = self.enc_p(x, x_lengths)
+        self._require('tts')
+        with metrics.span('encoder'):
+            x, m_p, logs_p, x_mask = self.enc_p(x, x_lengths)
         if self.n_speakers > 0:
             g = self.emb_g(sid).unsqueeze(-1) # [b, h, 1]
         else:
             g = None
 
-        logw = self.sdp(x, x_mask, g=g, reverse=True, noise_scale=noise_scale_w) * sdp_ratio \
-            + self.dp(x, x_mask, g=g) * (1 - sdp_ratio)
-
-        w = torch.exp(logw) * x_mask * length_scale
-        w_ceil = torch.ceil(w)
-        y_lengths = torch.clamp_min(torch.sum(w_ceil, [1, 2]), 1).long()
-        y_mask = torch.unsqueeze(commons.sequence_mask(y_lengths, None), 1).to(x_mask.dtype)
-        attn_mask = torch.unsqueeze(x_mask, 2) * torch.unsqueeze(y_mask, -1)
-        attn = commons.generate_path(w_ceil, attn_mask)
-
-        m_p = torch.matmul(attn.squeeze(1), m_p.transpose(1, 2)).transpose(1, 2) # [b, t', t], [b, t, d] -> [b, d, t']
-        logs_p = torch.matmul(attn.squeeze(1), logs_p.transpose(1, 2)).transpose(1, 2) # [b, t', t], [b, t, d] -> [b, d, t']
-
-        z_p = m_p + torch.randn_like(m_p) * torch.exp(logs_p) * noise_scale
-        z = self.flow(z_p, y_mask, g=g, reverse=True)
-        o = self.dec((z * y_mask)[:,:,:max_len], g=g)
+        with metrics.span('duration'):
+            logw = self.sdp(x, x_mask, g=g, reverse=True, noise_scale=noise_scale_w) * sdp_ratio \
+                + self.dp(x, x_mask, g=g) * (1 - sdp_ratio)
+
+            w = torch.exp(logw) * x_mask * length_scale
+            w_ceil = torch.ceil(w)
+            y_lengths = torch.clamp_min(torch.sum(w_ceil, [1, 2]), 1).long()
+            y_mask = torch.unsqueeze(commons.sequence_mask(y_lengths, None), 1).to(x_mask.dtype)
+            attn_mask = torch.unsqueeze(x_mask, 2) * torch.unsqueeze(y_mask, -1)
+            attn = commons.generate_path(w_ceil, attn_mask)
+
+        with metrics.span('flow'):
+            m_p = torch.matmul(attn.squeeze(1), m_p.transpose(1, 2)).transpose(1, 2) # [b, t', t], [b, t, d] -> [b, d, t']
+            logs_p = torch.matmul(attn.squeeze(1), logs_p.transpose(1, 2)).transpose(1, 2) # [b, t', t], [b, t, d] -> [b, d, t']
+
+            z_p = m_p + torch.randn_like(m_p) * torch.exp(logs_p) * noise_scale
+            z = self.flow(z_p, y_mask, g=g, reverse=True)
+        with metrics.span('vocoder'):
+            o = self.dec((z * y_mask)[:,:,:max_len], g=g)
         return o, attn, y_mask, (z, z_p, m_p, logs_p)
 
     def voice_conversion(self, y, y_lengths, sid_src, sid_tgt, tau=1.0):
+        self._require('conversion')
         g_src = sid_src
         g_tgt = sid_tgt
         z, m_q, logs_q, y_mask = self.enc_q(y, y_lengths, g=g_src if not self.zero_g else torch.zeros_like(g_src), tau=tau)
@@ -2,15 +2,16 @@ import os
 import glob
 import torch
 import hashlib
-import librosa
 import base64
 from glob import glob
 import numpy as np
+from .. import metrics
+from ..audio_io import load_audio, resample
 # Optional dependencies - will fall back gracefully if not available
 try:
     from pydub import AudioSegment
     from faster_whisper import WhisperModel
-    from whisper_timestamped.transcribe import get_audio_tensor, get_vad_segments
+    from whisper_timestamped.transcribe import get_vad_segments
     HAS_WHISPER = True
 except ImportError:
     HAS_WHISPER = False
@@ -78,49 +79,163 @@ def split_audio_whisper(audio_path, audio_name, target_dir='processed'):
     return wavs_folder
 
 
-def split_audio_vad(audio_path, audio_name, target_dir, split_seconds=10.0):
-    SAMPLE_RATE = 16000
-    audio_vad = get_audio_tensor(audio_path)
+# Reference selection: at most this much speech goes through ref_enc, in pieces of about split_seconds
+MAX_SPEECH_SECONDS = 30.0
+SPLIT_SECONDS = 10.0
+# VAD looks at no more than this much of a long recording, in evenly spaced windows
+MAX_SCAN_SECONDS = 120.0
+SCAN_WINDOW_SECONDS = 30.0
+
+
+def load_reference(audio_path, sampling_rate):
+    """Decode a reference clip once, mono float32 at the converter's sampling rate."""
+    return load_audio(audio_path, sr=sampling_rate)[0]
+
+
+def _frame_db(audio, sr, frame_ms=30.0):
+    frame = max(1, int(sr * frame_ms / 1000.0))
+    n = len(audio) // frame
+    frames = audio[:n * frame].reshape(n, frame)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1)) + 1e-10
+    return 20.0 * np.log10(rms), frame
+
+
+def energy_segments(audio, sr, threshold_db=-35.0, min_speech=0.1, min_silence=1.0):
+    """(start, end) sample ranges of speech, by frame energy relative to the loudest frame."""
+    db, frame = _frame_db(audio, sr)
+    if len(db) == 0:
+        return []
+    voiced = db > db.max() + threshold_db
+    segments = []
+    start = None
+    for i, v in enumerate(np.append(voiced, False)):
+        if v and start is None:
+            start = i
+        elif not v and start is not None:
+            if segments and (start - segments[-1][1]) * frame < min_silence * sr:
+                segments[-1] = (segments[-1][0], i)
+            else:
+                segments.append((start, i))
+            start = None
+    return [(s * frame, e * frame) for s, e in segments if (e - s) * frame >= min_speech * sr]
+
+
+def _silero_segments(audio, sr):
+    audio16 = resample(audio, sr, 16000) if sr != 16000 else audio
     segments = get_vad_segments(
-        audio_vad,
+        torch.from_numpy(np.ascontiguousarray(audio16)),
         output_sample=True,
         min_speech_duration=0.1,
         min_silence_duration=1,
         method="silero",
     )
-    segments = [(seg["start"], seg["end"]) for seg in segments]
-    segments = [(float(s) / SAMPLE_RATE, float(e) / SAMPLE_RATE) for s,e in segments]
-    print(segments)
-    audio_active = AudioSegment.silent(duration=0)
-    audio = AudioSegment.from_file(audio_path)
+    scale = sr / 16000.0
+    return [(int(seg["start"] * scale), int(seg["end"] * scale)) for seg in segments]
 
-    for start_time, end_time in segments:
-        audio_active += audio[int( start_time * 1000) : int(end_time * 1000)]
-    
-    audio_dur = audio_active.duration_seconds
-    print(f'after vad: dur = {audio_dur}')
-    target_folder = os.path.join(target_dir, audio_name)
-    wavs_folder = os.path.join(target_folder, 'wavs')
+
+def vad_segments(audio, sr, max_scan_seconds=MAX_SCAN_SECONDS, window_seconds=SCAN_WINDOW_SECONDS):
+    """
+    Speech ranges of audio (silero VAD when whisper_timestamped is installed, energy otherwise).
+
+    Recordings longer than max_scan_seconds are only scanned in evenly spaced windows,
+    so the cost stays bounded.
+    """
+    detect = _silero_segments if HAS_WHISPER else energy_segments
+    if len(audio) <= max_scan_seconds * sr:
+        return detect(audio, sr)
+    window = int(window_seconds * sr)
+    n_windows = max(1, int(max_scan_seconds // window_seconds))
+    starts = np.linspace(0, len(audio) - window, n_windows).astype(int)
+    segments = []
+    for offset in starts:
+        segments += [(offset + s, offset + e) for s, e in detect(audio[offset:offset + window], sr)]
+    return segments
+
+
+def select_speech(audio, sr, segments, max_seconds=MAX_SPEECH_SECONDS):
+    """
+    The best speech segments (views of audio, in time order) totalling at most max_seconds.
+
+    Segments are ranked by their level above the recording's noise floor, with clipped
+    and very short segments penalised.
+    """
+    if not segments:
+        return []
+    db, _ = _frame_db(audio, sr)
+    noise_floor = np.percentile(db, 10) if len(db) else -100.0
+    scored = []
+    for start, end in segments:
+        seg = audio[start:end]
+        seg_db, _ = _frame_db(seg, sr)
+        if len(seg_db) == 0:
+            continue
+        score = np.median(seg_db) - noise_floor
+        score -= 100.0 * np.mean(np.abs(seg) > 0.99)
+        score -= 10.0 * max(0.0, 1.0 - (end - start) / sr)
+        scored.append((score, start, end))
+    budget = int(max_seconds * sr)
+    chosen = []
+    for score, start, end in sorted(scored, reverse=True):
+        if budget <= 0:
+            break
+        end = min(end, start + budget)
+        chosen.append((start, end))
+        budget -= end - start
+    return [audio[start:end] for start, end in sorted(chosen)]
+
+
+def split_pieces(speech, sr, split_seconds=SPLIT_SECONDS):
+    """Join the selected speech once and split it into equal pieces: a [n, samples] array of views."""
+    active = np.concatenate(speech) if len(speech) > 1 else speech[0]
+    num_splits = max(1, int(np.round(len(active) / (split_seconds * sr))))
+    piece = len(active) // num_splits
+    return active[:num_splits * piece].reshape(num_splits, piece)
+
+
+def speech_pieces(audio, sr, max_seconds=MAX_SPEECH_SECONDS, split_seconds=SPLIT_SECONDS):
+    """VAD, selection and splitting; falls back to the start of the clip if no speech is found."""
+    speech = select_speech(audio, sr, vad_segments(audio, sr), max_seconds)
+    if not speech:
+        speech = [audio[:int(max_seconds * sr)]]
+    if sum(len(s) for s in speech) == 0:
+        raise ValueError('input audio is too short')
+    return split_pieces(speech, sr, split_seconds)
+
+
+def extract_se_from_pieces(vc_model, pieces):
+    """Mean tone color embedding of equal-length pieces, in one batched ref_enc pass."""
+    with torch.no_grad(), metrics.span('se_extract'):
+        y = torch.from_numpy(np.ascontiguousarray(pieces)).to(vc_model.device)
+        spec = vc_model.frontend(y)
+        g = vc_model.model.ref_enc(spec.transpose(1, 2))
+    return g.mean(0, keepdim=True).unsqueeze(-1).detach()
+
+
+def split_audio_vad(audio_path, audio_name, target_dir, split_seconds=10.0, sampling_rate=None):
+    """
+    Write the selected speech pieces of audio_path as WAV files (for tools that want files),
+    at sampling_rate or, by default, the file's own rate.
+    """
+    import soundfile
+    audio, sr = load_audio(audio_path, sr=sampling_rate)
+    pieces = speech_pieces(audio, sr, split_seconds=split_seconds)
+    wavs_folder = os.path.join(target_dir, audio_name, 'wavs')
     os.makedirs(wavs_folder, exist_ok=True)
-    start_time = 0.
-    count = 0
-    num_splits = int(np.round(audio_dur / split_seconds))
-    assert num_splits > 0, 'input audio is too short'
-    interval = audio_dur / num_splits
-
-    for i in range(num_splits):
-        end_time = min(start_time + interval, audio_dur)
-        if i == num_splits - 1:
-            end_time = audio_dur
-        output_file = f"{wavs_folder}/{audio_name}_seg{count}.wav"
-        audio_seg = audio_active[int(start_time * 1000): int(end_time * 1000)]
-        audio_seg.export(output_file, format='wav')
-        start_time = end_time
-        count += 1
+    for count, piece in enumerate(pieces):
+        soundfile.write(f"{wavs_folder}/{audio_name}_seg{count}.wav", piece, sr)
     return wavs_folder
 
+
+def file_hash(audio_path, chunk_size=1 << 20):
+    """Content hash of the file bytes, in the same 16-character form as hash_numpy_array."""
+    digest = hashlib.sha256()
+    with open(audio_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return base64.b64encode(digest.digest()).decode('utf-8')[:16].replace('/', '_^')
+
 def hash_numpy_array(audio_path):
-    array, _ = librosa.load(audio_path, sr=None, mono=True)
+    array, _ = load_audio(audio_path)
     # Convert the array to bytes
     array_bytes = array.tobytes()
     # Calculate the hash of the array bytes
@@ -130,28 +245,38 @@ def hash_numpy_array(audio_path):
     base64_value = base64.b64encode(hash_value)
     return base64_value.decode('utf-8')[:16].replace('/', '_^')
 
-def get_se(audio_path, vc_model, target_dir='processed', vad=True):
+def get_se(audio_path, vc_model, target_dir='processed', vad=True, max_seconds=MAX_SPEECH_SECONDS):
+    """
+    Tone color embedding of a reference recording, cached by content under target_dir
+    (one file per extraction mode and max_seconds).
+
+    With vad=True the clip is decoded once, at most max_seconds of the best speech is
+    selected and it goes through ref_enc in one batch, so long recordings cost about
+    the same as short ones. vad=False uses the whisper segmentation instead.
+    """
     device = vc_model.device
     version = vc_model.version
     print("OpenVoice version:", version)
 
-    audio_name = f"{os.path.basename(audio_path).rsplit('.', 1)[0]}_{version}_{hash_numpy_array(audio_path)}"
-    se_path = os.path.join(target_dir, audio_name, 'se.pth')
+    audio_name = f"{os.path.basename(audio_path).rsplit('.', 1)[0]}_{version}_{file_hash(audio_path)}"
+    se_name = f'se_vad_{max_seconds:g}s.pth' if vad else 'se_whisper.pth'
+    se_path = os.path.join(target_dir, audio_name, se_name)
+
+    if os.path.isfile(se_path):
+        se = torch.load(se_path, map_location=device)
+        return se, audio_name
 
-    # if os.path.isfile(se_path):
-    #     se = torch.load(se_path).to(device)
-    #     return se, audio_name
-    # if os.path.isdir(audio_path):
-    #     wavs_folder = audio_path
-    
     if vad:
-        wavs_folder = split_audio_vad(audio_path, target_dir=target_dir, audio_name=audio_name)
-    else:
-        wavs_folder = split_audio_whisper(audio_path, target_dir=target_dir, audio_name=audio_name)
-    
+        sr = vc_model.hps.data.sampling_rate
+        pieces = speech_pieces(load_reference(audio_path, sr), sr, max_seconds=max_seconds)
+        se = extract_se_from_pieces(vc_model, pieces)
+        os.makedirs(os.path.dirname(se_path), exist_ok=True)
+        torch.save(se.cpu(), se_path)
+        return se, audio_name
+
+    wavs_folder = split_audio_whisper(audio_path, target_dir=target_dir, audio_name=audio_name)
     audio_segs = glob(f'{wavs_folder}/*.wav')
     if len(audio_segs) == 0:
         raise NotImplementedError('No audio segments found!')
     
     return vc_model.extract_se(audio_segs, se_save_path=se_path), audio_name
-
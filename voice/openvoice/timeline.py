@@ -0,0 +1,166 @@
+"""
+Token/word/character timelines from the duration predictor's hard alignment.
+
+SynthesizerTrn.infer returns ``attn`` ([b, 1, t_y, t_x]), the monotonic path built by
+commons.generate_path. Summing it over output frames gives the number of spectrogram
+frames each input token lasts; times the hop length that is a sample range per token.
+Tokens are grouped into spoken words at the space symbol and mapped back onto the words
+and characters of the input text, so the UI can schedule text reveal, mouth shapes or
+interruption points without analysing the audio.
+"""
+import re
+import bisect
+import numpy as np
+
+_WORD_RE = re.compile(r'\S+')
+
+
+def token_durations(attn) -> np.ndarray:
+    """Frames per input token for the first item of a batch: attn [b, 1, t_y, t_x] -> [t_x]."""
+    if hasattr(attn, 'detach'):
+        attn = attn.detach().float().cpu().numpy()
+    attn = np.asarray(attn)
+    return attn[0, 0].sum(axis=0).astype(np.int64)
+
+
+def align_tokens(token_symbols, durations, hop_length: int, offset_samples: int = 0):
+    """
+    Turn per-token frame counts into sample ranges and spoken words.
+
+    Args:
+        token_symbols: Symbol per token; None for interspersed blanks
+        durations: Frames per token (same length as token_symbols)
+        hop_length: Samples per spectrogram frame
+        offset_samples: Where this segment starts in the final audio
+
+    Returns:
+        (tokens, words): tokens are dicts with index/symbol/start/end, words are dicts
+        with the spoken (phonemized) word and its start/end sample.
+    """
+    durations = np.asarray(durations, dtype=np.int64).reshape(-1)
+    n = min(len(token_symbols), len(durations))
+    ends = offset_samples + np.cumsum(durations[:n]) * hop_length
+    starts = np.concatenate([[offset_samples], ends[:-1]]) if n else ends
+
+    tokens = []
+    words = []
+    current = None
+    for i in range(n):
+        symbol = token_symbols[i]
+        start, end = int(starts[i]), int(ends[i])
+        tokens.append({'index': i, 'symbol': symbol, 'start': start, 'end': end})
+        if symbol is None:
+            continue  # blanks belong to whatever surrounds them
+        if symbol.isspace():
+            current = None
+            continue
+        if current is None:
+            current = {'word': '', 'start': start, 'end': end, 'tokens': []}
+            words.append(current)
+        current['word'] += symbol
+        current['end'] = end
+        current['tokens'].append(i)
+    return tokens, words
+
+
+def _map_words(n_spoken: int, n_text: int):
+    """Map spoken word index -> text word index (1:1 if counts match, else proportional)."""
+    if n_spoken == n_text:
+        return list(range(n_spoken))
+    return [min(n_text - 1, int((j + 0.5) * n_text / n_spoken)) for j in range(n_spoken)]
+
+
+def build_timeline(text: str, segments, sample_rate: int, num_samples: int = None) -> dict:
+    """
+    Combine aligned segments into a timeline over the original input text.
+
+    Args:
+        text: The text that was passed to synthesis
+        segments: List of (tokens, words) from align_tokens, in playback order
+        sample_rate: Output sample rate
+        num_samples: Total length of the synthesized audio, if known
+
+    Returns:
+        dict with 'tokens', 'words' (word, char_start, char_end, start, end),
+        'char_starts' (start sample per character of text) and 'sample_rate'.
+    """
+    tokens, spoken = [], []
+    for seg_tokens, seg_words in segments:
+        base = len(tokens)
+        tokens.extend(dict(t, index=base + t['index']) for t in seg_tokens)
+        spoken.extend(dict(w, tokens=[base + i for i in w['tokens']]) for w in seg_words)
+
+    text_words = [(m.start(), m.end()) for m in _WORD_RE.finditer(text)]
+    words = []
+    if text_words and spoken:
+        mapping = _map_words(len(spoken), len(text_words))
+        spans = {}
+        for j, w in enumerate(spoken):
+            k = mapping[j]
+            if k in spans:
+                spans[k]['end'] = max(spans[k]['end'], w['end'])
+                spans[k]['tokens'].extend(w['tokens'])
+            else:
+                spans[k] = {'start': w['start'], 'end': w['end'], 'tokens': list(w['tokens'])}
+        last_end = 0
+        for k, (cs, ce) in enumerate(text_words):
+            span = spans.get(k)
+            if span is None:
+                # Text word with no spoken counterpart (e.g. a lone symbol): zero length
+                span = {'start': last_end, 'end': last_end, 'tokens': []}
+            words.append({'word': text[cs:ce], 'char_start': cs, 'char_end': ce,
+                          'start': span['start'], 'end': span['end'], 'tokens': span['tokens']})
+            last_end = span['end']
+
+    # Spread each word's time span over its characters; gaps take the previous word's end
+    char_starts = [0] * len(text)
+    pos = 0
+    prev_end = 0
+    for w in words:
+        for c in range(pos, w['char_start']):
+            char_starts[c] = prev_end
+        length = max(1, w['char_end'] - w['char_start'])
+        step = (w['end'] - w['start']) / float(length)
+        for c in range(w['char_start'], w['char_end']):
+            char_starts[c] = int(w['start'] + step * (c - w['char_start']))
+        pos = w['char_end']
+        prev_end = w['end']
+    for c in range(pos, len(text)):
+        char_starts[c] = prev_end
+
+    if num_samples is None:
+        num_samples = tokens[-1]['end'] if tokens else 0
+    return {
+        'text': text,
+        'sample_rate': int(sample_rate),
+        'num_samples': int(num_samples),
+        'tokens': tokens,
+        'words': words,
+        'char_starts': char_starts,
+    }
+
+
+def chars_revealed_at(timeline: dict, sample: int) -> int:
+    """Number of leading characters of the text that have started by this sample."""
+    return bisect.bisect_right(timeline['char_starts'], sample)
+
+
+def word_at(timeline: dict, sample: int):
+    """The word being spoken at this sample (or the last one before it), or None."""
+    words = timeline['words']
+    if not words:
+        return None
+    i = bisect.bisect_right([w['start'] for w in words], sample) - 1
+    return words[max(0, i)]
+
+
+def interruption_point(timeline: dict, sample: int) -> dict:
+    """
+    Where to cut playback at or after ``sample`` without splitting a word.
+
+    Returns dict with 'sample' (cut position) and 'char' (text spoken up to the cut).
+    """
+    for w in timeline['words']:
+        if w['end'] >= sample:
+            return {'sample': w['end'], 'char': w['char_end']}
+    return {'sample': timeline['num_samples'], 'char': len(timeline['text'])}
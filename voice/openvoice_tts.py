@@ -5,6 +5,8 @@ This integrates OpenVoice directly without external dependencies.
 
 import os
 import torch
+import threading
+import functools
 import numpy as np
 import logging
 from typing import Optional, Tuple
@@ -13,26 +15,48 @@ import tempfile
 # Import our integrated OpenVoice classes
 from .openvoice.api import BaseSpeakerTTS, ToneColorConverter
 from .openvoice import se_extractor
+from .precision import default_precision
 
 logger = logging.getLogger(__name__)
 
 
+def _serialized(method):
+    """Run the method under the instance lock: the models are not safe for concurrent forward passes."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class OpenVoiceTTS:
     """Two-stage OpenVoice TTS implementation following the official approach."""
     
-    def __init__(self, device: str = None):
+    def __init__(self, device: str = None, checkpoints_dir: str = None, precision: str = None):
         self.device = device or ('cuda:0' if torch.cuda.is_available() else 'cpu')
+        # Vocoder/flow precision: fp32, bf16, fp16 or auto (default ELPIS_TTS_PRECISION)
+        self.precision = precision or default_precision()
         
         # Get absolute paths to checkpoints (fixes issue when cwd changes)
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.ckpt_base = os.path.join(project_root, 'checkpoints/base_speakers/EN')
-        self.ckpt_converter = os.path.join(project_root, 'checkpoints/converter')
+        if checkpoints_dir is None:
+            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            checkpoints_dir = os.path.join(project_root, 'checkpoints')
+        self.ckpt_base = os.path.join(checkpoints_dir, 'base_speakers/EN')
+        self.ckpt_converter = os.path.join(checkpoints_dir, 'converter')
         
         # Initialize components
         self.base_speaker_tts = None
         self.tone_color_converter = None
         self.source_se = None
         
+        # Target speaker embeddings keyed by (path, mtime, size) so a reference
+        # clip is only analysed once instead of on every synthesis call
+        self._target_se_cache = {}
+        
+        # Speech playback and voice preparation jobs run on different threads but
+        # share these models, so every model call goes through this lock
+        self._lock = threading.RLock()
+        
         self._initialize_models()
     
     def _initialize_models(self):
@@ -66,12 +90,20 @@ class OpenVoiceTTS:
             else:
                 logger.warning(f"Source speaker embedding not found: {source_se_path}")
             
-            logger.info("[OpenVoiceTTS] Successfully initialized two-stage OpenVoice TTS")
+            if self.precision != 'fp32':
+                for part in (self.base_speaker_tts, self.tone_color_converter):
+                    part.set_precision(self.precision)
+            
+            report = self.memory_report()
+            logger.info("[OpenVoiceTTS] Successfully initialized two-stage OpenVoice TTS "
+                        f"({report['resident_bytes'] / 2**20:.1f} MB resident, "
+                        f"{report['skipped_bytes'] / 2**20:.1f} MB of unused submodules not loaded)")
             
         except Exception as e:
             logger.error(f"[OpenVoiceTTS] Failed to initialize models: {e}")
             raise
     
+    @_serialized
     def synthesize_audio(self, text: str, reference_audio: Optional[str] = None, 
                         speaker: str = 'default', language: str = 'English', 
                         speed: float = 1.0) -> Tuple[np.ndarray, int]:
@@ -116,7 +148,7 @@ class OpenVoiceTTS:
             
             # Use simple extraction method without VAD if whisper dependencies are not available
             try:
-                target_se = self.tone_color_converter.extract_se([reference_audio])
+                target_se = self.get_target_se(reference_audio)
                 if target_se is None:
                     raise RuntimeError("Failed to extract speaker embedding")
             except Exception as e:
@@ -150,6 +182,97 @@ class OpenVoiceTTS:
             logger.info(f"[OpenVoiceTTS] Success: Generated {len(audio)} samples at {sr} Hz")
             return audio, sr
     
+    @_serialized
+    def synthesize_with_timeline(self, text: str, reference_audio: Optional[str] = None,
+                                 speaker: str = 'default', language: str = 'English',
+                                 speed: float = 1.0) -> Tuple[np.ndarray, int, dict]:
+        """
+        Synthesize speech and return the alignment timeline alongside the audio.
+        
+        Tone color conversion keeps the frame count, so the timeline from the base
+        speaker applies to the converted audio as well.
+        
+        Returns:
+            Tuple[np.ndarray, int, dict]: (audio_data, sample_rate, timeline)
+        """
+        audio, timeline = self.base_speaker_tts.tts_with_timeline(
+            text, speaker=speaker, language=language, speed=speed)
+        sr = self.base_speaker_tts.hps.data.sampling_rate
+        
+        if not reference_audio or not os.path.exists(reference_audio):
+            return audio, sr, timeline
+        
+        try:
+            target_se = self.get_target_se(reference_audio)
+            with tempfile.TemporaryDirectory() as temp_dir:
+                base_audio_path = os.path.join(temp_dir, 'base_audio.wav')
+                import soundfile as sf
+                sf.write(base_audio_path, audio, sr)
+                converted = self.tone_color_converter.convert(
+                    audio_src_path=base_audio_path,
+                    src_se=self.source_se,
+                    tgt_se=target_se,
+                    output_path=None,
+                    message="@peer-elpis"
+                )
+            return converted, self.tone_color_converter.hps.data.sampling_rate, timeline
+        except Exception as e:
+            logger.warning(f"[OpenVoiceTTS] Tone color conversion failed: {e}, using base audio")
+            return audio, sr, timeline
+    
+    @staticmethod
+    def _se_cache_key(reference_audio: str):
+        st = os.stat(reference_audio)
+        return (os.path.abspath(reference_audio), st.st_mtime_ns, st.st_size)
+    
+    @_serialized
+    def get_target_se(self, reference_audio: str):
+        """Return the speaker embedding for a reference clip, extracting it only once."""
+        key = self._se_cache_key(reference_audio)
+        target_se = self._target_se_cache.get(key)
+        if target_se is None:
+            target_se = self.tone_color_converter.extract_se([reference_audio])
+            self._target_se_cache[key] = target_se
+        else:
+            logger.info("[OpenVoiceTTS] Using cached tone color embedding")
+        return target_se
+    
+    @_serialized
+    def extract_target_se(self, audio: np.ndarray):
+        """Extract a speaker embedding from audio decoded at the converter sampling rate."""
+        return self.tone_color_converter.extract_se_from_audio(audio)
+    
+    def set_target_se(self, reference_audio: str, target_se):
+        """Register a precomputed embedding (e.g. from a voice preparation job) for a reference clip."""
+        self._target_se_cache[self._se_cache_key(reference_audio)] = target_se
+    
+    @_serialized
+    def forget_target_se(self, reference_audio: str):
+        """Drop every cached embedding of a reference path (call before deleting or replacing the file)."""
+        path = os.path.abspath(reference_audio)
+        for key in [k for k in self._target_se_cache if k[0] == path]:
+            del self._target_se_cache[key]
+    
+    def memory_report(self) -> dict:
+        """Resident model bytes and the checkpoint bytes skipped by role-pruned loading."""
+        parts = {'base_speaker': self.base_speaker_tts, 'converter': self.tone_color_converter}
+        report = {'resident_bytes': 0, 'skipped_bytes': 0}
+        for name, part in parts.items():
+            if part is None:
+                continue
+            loaded = part.memory_report or {}
+            report[name] = {'roles': part.roles, 'resident_bytes': part.resident_bytes(),
+                            'skipped_bytes': loaded.get('skipped_bytes', 0),
+                            'skipped_modules': loaded.get('skipped_modules', [])}
+            report[name]['precision'] = (part.precision_report or {}).get('precision', 'fp32')
+            report['resident_bytes'] += report[name]['resident_bytes']
+            report['skipped_bytes'] += report[name]['skipped_bytes']
+        return report
+    
+    @property
+    def sampling_rate(self) -> int:
+        return self.tone_color_converter.hps.data.sampling_rate
+    
     def set_speaker_style(self, style: str = 'default'):
         """
         Set the speaker style and update source embedding accordingly.
@@ -0,0 +1,271 @@
+"""
+Reduced-precision inference for the vocoder and flow stacks.
+
+apply_precision() converts a synthesizer's ``dec`` (Generator) and ``flow``
+(ResidualCouplingBlock) to bfloat16 or float16, which halves the memory traffic of
+the vocoder, the largest share of CPU time per reply. Everything else stays fp32:
+the text encoder and its layer norms, the duration predictors (including the spline
+flows of the SDP and the ``exp``/``ceil`` duration math), the posterior and reference
+encoders. Inputs are cast down on entry to the converted modules and outputs cast
+back to fp32, so callers never see reduced-precision tensors.
+
+Precision is one of 'fp32', 'bf16', 'fp16' or 'auto'. 'auto' picks bf16 on CPUs
+where it is measurably faster than fp32 (checked once per machine and torch version,
+cached under .cache/) and bf16/fp16 on CUDA. After converting, a parity report
+compares the converted modules against their fp32 originals on fixed inputs; if
+the signal-to-noise ratio falls below min_snr_db the model is put back to fp32.
+
+Works with both voice.openvoice and voice.internal_openvoice models.
+"""
+import os
+import re
+import json
+import copy
+import time
+import logging
+import platform
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = ('fp32', 'bf16', 'fp16', 'auto')
+DTYPES = {'bf16': torch.bfloat16, 'fp16': torch.float16}
+
+# Submodules run in reduced precision
+REDUCED_MODULES = ('dec', 'flow')
+
+# Parity guardrail: output SNR against fp32 below this reverts to fp32
+MIN_SNR_DB = 25.0
+
+# bf16 must beat fp32 by this much in the capability check to be picked by 'auto'
+MIN_SPEEDUP = 1.15
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          '.cache', 'precision_capability.json')
+
+
+def default_precision() -> str:
+    """Precision requested through ELPIS_TTS_PRECISION (fp32 if unset)."""
+    value = os.environ.get('ELPIS_TTS_PRECISION', 'fp32').lower()
+    return value if value in PRECISIONS else 'fp32'
+
+
+def _cpu_name() -> str:
+    try:
+        with open('/proc/cpuinfo', 'r') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def _native_bf16() -> bool:
+    """True if the CPU advertises bf16 instructions (AVX512-BF16/AMX on x86, BF16 on arm64)."""
+    try:
+        with open('/proc/cpuinfo', 'r') as f:
+            flags = f.read()
+        if re.search(r'\b(avx512_bf16|amx_bf16|bf16)\b', flags):
+            return True
+    except OSError:
+        pass
+    if platform.system() == 'Darwin' and platform.machine() == 'arm64':
+        try:
+            import subprocess
+            out = subprocess.run(['sysctl', '-n', 'hw.optional.arm.FEAT_BF16'],
+                                 capture_output=True, text=True, timeout=2).stdout.strip()
+            return out == '1'
+        except Exception:
+            return False
+    return False
+
+
+def _time_conv(dtype, repeats: int = 3) -> float:
+    conv = torch.nn.Conv1d(128, 128, 7, padding=3).to(dtype)
+    x = torch.randn(1, 128, 4096).to(dtype)
+    best = float('inf')
+    with torch.no_grad():
+        conv(x)
+        for _ in range(repeats):
+            start = time.perf_counter()
+            conv(x)
+            best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def cpu_capability(refresh: bool = False) -> dict:
+    """
+    Whether bf16 pays off on this CPU: advertised support plus a small conv timing.
+
+    The result is cached per machine, torch version and thread count.
+    """
+    key = f"{platform.machine()}|{_cpu_name()}|torch {torch.__version__}|threads {torch.get_num_threads()}"
+    cache = {}
+    if not refresh:
+        try:
+            with open(CACHE_PATH, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if key in cache:
+                return cache[key]
+        except (OSError, ValueError):
+            cache = {}
+
+    fp32_ms = _time_conv(torch.float32)
+    try:
+        bf16_ms = _time_conv(torch.bfloat16)
+    except Exception as e:
+        logger.debug(f"[Precision] bf16 conv failed: {e}")
+        bf16_ms = None
+    result = {
+        'native_bf16': _native_bf16(),
+        'fp32_ms': round(fp32_ms, 3),
+        'bf16_ms': round(bf16_ms, 3) if bf16_ms else None,
+        'speedup': round(fp32_ms / bf16_ms, 3) if bf16_ms else 0.0,
+    }
+    result['bf16_recommended'] = result['speedup'] >= MIN_SPEEDUP
+
+    cache[key] = result
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        with open(CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        logger.debug(f"[Precision] Could not cache capability check: {e}")
+    return result
+
+
+def resolve_precision(precision: str, device: str = 'cpu') -> str:
+    """Turn 'auto' (or None) into a concrete precision for device."""
+    precision = (precision or 'fp32').lower()
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision: {precision} (expected one of {PRECISIONS})")
+    if precision != 'auto':
+        return precision
+    if 'cuda' in str(device):
+        return 'bf16' if torch.cuda.is_bf16_supported() else 'fp16'
+    return 'bf16' if cpu_capability()['bf16_recommended'] else 'fp32'
+
+
+def bake_weight_norm(module: torch.nn.Module):
+    """Fold weight-norm reparametrizations into plain weights (inference only)."""
+    from torch.nn.utils import parametrize
+    for m in module.modules():
+        if parametrize.is_parametrized(m, 'weight'):
+            parametrize.remove_parametrizations(m, 'weight', leave_parametrized=True)
+        elif hasattr(m, 'weight_g') and hasattr(m, 'weight_v'):
+            torch.nn.utils.remove_weight_norm(m)
+
+
+def _cast(value, dtype):
+    if torch.is_tensor(value) and value.is_floating_point():
+        return value.to(dtype)
+    if isinstance(value, (tuple, list)):
+        return type(value)(_cast(v, dtype) for v in value)
+    return value
+
+
+def _convert(module: torch.nn.Module, dtype):
+    module.to(dtype)
+
+    def cast_inputs(mod, args, kwargs):
+        return _cast(args, dtype), {k: _cast(v, dtype) for k, v in kwargs.items()}
+
+    def cast_output(mod, args, output):
+        return _cast(output, torch.float32)
+
+    module._precision_hooks = (module.register_forward_pre_hook(cast_inputs, with_kwargs=True),
+                               module.register_forward_hook(cast_output))
+
+
+def _snr_db(reference, output) -> float:
+    noise = (reference - output).float().pow(2).sum().item()
+    signal = reference.float().pow(2).sum().item()
+    if noise == 0:
+        return float('inf')
+    return 10.0 * torch.log10(torch.tensor(signal / noise)).item()
+
+
+def _parity_inputs(model, frames: int, generator):
+    device = next(model.parameters()).device
+    inputs = {}
+    if hasattr(model, 'dec'):
+        dec = model.dec
+        x = torch.randn(1, dec.conv_pre.in_channels, frames, generator=generator)
+        g = torch.randn(1, dec.cond.in_channels, 1, generator=generator) * 0.1 if hasattr(dec, 'cond') else None
+        inputs['dec'] = ((x.to(device),), {'g': g.to(device) if g is not None else None})
+    if hasattr(model, 'flow'):
+        first = model.flow.flows[0]
+        x = torch.randn(1, first.pre.in_channels * 2, frames, generator=generator)
+        mask = torch.ones(1, 1, frames)
+        cond = getattr(first.enc, 'cond_layer', None)
+        g = torch.randn(1, cond.in_channels, 1, generator=generator) * 0.1 if cond is not None else None
+        inputs['flow'] = ((x.to(device), mask.to(device)),
+                          {'g': g.to(device) if g is not None else None, 'reverse': True})
+    return inputs
+
+
+def parity_report(model, references: dict, frames: int = 200, seed: int = 0) -> dict:
+    """
+    Compare model's converted submodules against fp32 copies (references) on fixed inputs.
+
+    Returns {module: {'snr_db', 'max_abs_err'}}.
+    """
+    generator = torch.Generator().manual_seed(seed)
+    report = {}
+    with torch.no_grad():
+        for name, (args, kwargs) in _parity_inputs(model, frames, generator).items():
+            if name not in references:
+                continue
+            expected = references[name](*args, **kwargs)
+            actual = getattr(model, name)(*args, **kwargs)
+            report[name] = {
+                'snr_db': round(_snr_db(expected, actual), 2),
+                'max_abs_err': round((expected - actual).abs().max().item(), 6),
+            }
+    return report
+
+
+def apply_precision(model, precision: str = 'fp32', device: str = 'cpu', check: bool = True,
+                    min_snr_db: float = MIN_SNR_DB) -> dict:
+    """
+    Run model.dec and model.flow in reduced precision. Call after the weights are loaded.
+
+    Returns a report: {'precision': effective precision, 'modules': [...],
+    'parity': {...}} plus 'reverted': True if the guardrail put the model back to fp32.
+    """
+    requested = precision
+    precision = resolve_precision(precision, device)
+    report = {'requested': requested, 'precision': precision, 'modules': []}
+    if precision == 'fp32':
+        return report
+
+    targets = [name for name in REDUCED_MODULES if hasattr(model, name)
+               and getattr(model, name) is not None and not hasattr(getattr(model, name), '_precision_hooks')]
+    references = {}
+    for name in targets:
+        bake_weight_norm(getattr(model, name))
+        if check:
+            references[name] = copy.deepcopy(getattr(model, name))
+    for name in targets:
+        _convert(getattr(model, name), DTYPES[precision])
+    report['modules'] = targets
+
+    if check and targets:
+        try:
+            report['parity'] = parity_report(model, references)
+            worst = min(r['snr_db'] for r in report['parity'].values()) if report['parity'] else float('inf')
+            failed = worst < min_snr_db
+            reason = f"parity SNR {worst:.1f} dB < {min_snr_db:.1f} dB"
+        except Exception as e:
+            failed, reason = True, f"parity check failed: {e}"
+        if failed:
+            for name, reference in references.items():
+                setattr(model, name, reference)
+            logger.warning(f"[Precision] {precision} rejected ({reason}), using fp32")
+            report.update({'precision': 'fp32', 'reverted': True, 'reason': reason})
+            return report
+    logger.info(f"[Precision] Running {', '.join(targets)} in {precision}"
+                + (f" (parity {report['parity']})" if report.get('parity') else ""))
+    return report
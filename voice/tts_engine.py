@@ -11,6 +11,8 @@ import subprocess
 import shutil
 from typing import Optional, Callable
 
+from . import metrics
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,8 +39,13 @@ class TTSEngine:
         self._style = 'default'
         
         try:
-            from .openvoice_tts import OpenVoiceTTS
-            self.openvoice = OpenVoiceTTS()
+            if os.environ.get('ELPIS_TTS_PROCESS', '') == '1':
+                # Host the models in a worker process (see tts_process.py)
+                from .tts_process import RemoteOpenVoiceTTS
+                self.openvoice = RemoteOpenVoiceTTS()
+            else:
+                from .openvoice_tts import OpenVoiceTTS
+                self.openvoice = OpenVoiceTTS()
             logger.info("[TTSEngine] OpenVoice TTS initialized successfully")
         except Exception as e:
             logger.warning(f"[TTSEngine] OpenVoice initialization failed: {e}, falling back to pyttsx3")
@@ -70,13 +77,19 @@ class TTSEngine:
                     self.engine.setProperty('voice', v.id)
                     break
 
-    def speak(self, text: str, callback: Optional[Callable] = None):
+    def speak(self, text: str, callback: Optional[Callable] = None,
+              progress_callback: Optional[Callable] = None,
+              audio_callback: Optional[Callable] = None):
         """
         Speak text using the best available TTS engine.
         
         Args:
             text: Text to speak
             callback: Optional callback function to call while speaking
+            progress_callback: Optional callback(event, index, total) called with
+                'synth_start', 'audio_start' and 'audio_end' for each sentence
+            audio_callback: Optional callback(audio, sample_rate, index, total) called with
+                each synthesized sentence right before it starts playing
         """
         if not text.strip():
             return
@@ -84,21 +97,24 @@ class TTSEngine:
         # Try OpenVoice first
         if self._is_openvoice_available():
             try:
-                self._speak_openvoice(text, callback)
+                self._speak_openvoice(text, callback, progress_callback, audio_callback)
                 return
             except Exception as e:
                 logger.warning(f"[TTSEngine] OpenVoice failed: {e}, falling back to pyttsx3")
         
         # Fallback to pyttsx3
-        self._speak_pyttsx3(text, callback)
+        self._speak_pyttsx3(text, callback, progress_callback)
     
     def _is_openvoice_available(self):
         """Check if OpenVoice is initialized and ready."""
         return self.openvoice is not None
     
-    def _speak_openvoice(self, text: str, callback: Optional[Callable] = None):
+    def _speak_openvoice(self, text: str, callback: Optional[Callable] = None,
+                         progress_callback: Optional[Callable] = None,
+                         audio_callback: Optional[Callable] = None):
         """Use OpenVoice for high-quality speech synthesis."""
         sentences = self._split_into_sentences(text)
+        total = len(sentences)
         full_text = ""
         
         for i, sentence in enumerate(sentences):
@@ -114,23 +130,36 @@ class TTSEngine:
                 callback(full_text.strip(), is_complete)
             
             try:
+                self._report(progress_callback, 'synth_start', i, total)
                 # Synthesize audio using OpenVoice
-                audio, sample_rate = self.openvoice.synthesize_audio(
-                    sentence,
-                    reference_audio=self._ref_audio,
-                    speaker='default',
-                    language='English',
-                    speed=1.0
-                )
+                with metrics.span('synthesis'):
+                    audio, sample_rate = self.openvoice.synthesize_audio(
+                        sentence,
+                        reference_audio=self._ref_audio,
+                        speaker='default',
+                        language='English',
+                        speed=1.0
+                    )
+                metrics.add_audio(len(audio), sample_rate)
                 
                 # Play the audio
-                self._play_audio(audio, sample_rate)
+                if audio_callback:
+                    try:
+                        audio_callback(audio, sample_rate, i, total)
+                    except Exception as e:
+                        logger.debug(f"[TTSEngine] Audio callback failed: {e}")
+                metrics.mark_audio_start()
+                self._report(progress_callback, 'audio_start', i, total)
+                with metrics.span('playback'):
+                    self._play_audio(audio, sample_rate)
+                self._report(progress_callback, 'audio_end', i, total)
                 
             except Exception as e:
                 logger.error(f"[TTSEngine] OpenVoice synthesis failed for '{sentence}': {e}")
                 raise
     
-    def _speak_pyttsx3(self, text: str, callback: Optional[Callable] = None):
+    def _speak_pyttsx3(self, text: str, callback: Optional[Callable] = None,
+                       progress_callback: Optional[Callable] = None):
         """Use pyttsx3 as fallback TTS engine."""
         if not self.engine:
             logger.error("[TTSEngine] No TTS engine available")
@@ -141,10 +170,24 @@ class TTSEngine:
             callback(text, True)
             
         try:
+            self._report(progress_callback, 'synth_start', 0, 1)
             self.engine.say(text)
-            self.engine.runAndWait()
+            metrics.mark_audio_start()
+            self._report(progress_callback, 'audio_start', 0, 1)
+            with metrics.span('playback'):
+                self.engine.runAndWait()
+            self._report(progress_callback, 'audio_end', 0, 1)
         except Exception as e:
             logger.error(f"[TTSEngine] pyttsx3 playback failed: {e}")
+
+    def _report(self, progress_callback: Optional[Callable], event: str, index: int, total: int):
+        """Forward a progress event without letting a bad callback break playback."""
+        if not progress_callback:
+            return
+        try:
+            progress_callback(event, index, total)
+        except Exception as e:
+            logger.debug(f"[TTSEngine] Progress callback failed: {e}")
     
     def _play_audio(self, audio, sample_rate):
         """Play audio array using system audio."""
@@ -196,6 +239,15 @@ class TTSEngine:
         """Set a pre-exported engine directory that contains se.pth."""
         self._engine_dir = path if path and os.path.isdir(path) else None
 
+    def close(self):
+        """Release the OpenVoice backend (stops its worker process when out-of-process)."""
+        close = getattr(self.openvoice, 'close', None)
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                logger.warning(f"[TTSEngine] Failed to close OpenVoice backend: {e}")
+
     def set_style(self, style: str):
         """Set voice style for OpenVoice (e.g., 'default', 'whispering', 'sad', ...)."""
         self._style = style or 'default'
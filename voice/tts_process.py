@@ -0,0 +1,347 @@
+"""
+Out-of-process OpenVoice synthesis.
+
+RemoteOpenVoiceTTS has the same API as OpenVoiceTTS but hosts the models in a separate
+worker process, so text cleaning, tensor work and NumPy post-processing never hold the
+GUI process's GIL, and a crash in native code only takes down the worker (it is
+restarted on the next call).
+
+Calls go over a multiprocessing Pipe as small pickled messages. Arrays never do: each
+direction has a shared-memory ring buffer, NumPy arrays and torch tensors (audio,
+speaker embeddings) are written into it and only (offset, length, dtype) descriptors
+travel over the pipe; tensors come back as tensors on their original device. Calls are synchronous and
+serialized by a lock, and the reader copies an array out before the next call, so
+a writer never overwrites data from an earlier call that has not been read. Within
+one message the ring does not wrap onto that message's own arrays. Arrays that do not
+fit (larger than the ring, or than the room left for the message) fall back to raw
+bytes over the pipe (still not pickled).
+
+Stage timings recorded in the worker (voice.metrics spans) are merged into the calling
+thread's current request trace.
+
+Enabled in TTSEngine with ELPIS_TTS_PROCESS=1.
+"""
+import os
+import logging
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Default size of each ring buffer (about 90 s of float32 audio at 22.05 kHz)
+DEFAULT_RING_BYTES = 8 << 20
+
+# Seconds to wait for the worker to load the models
+START_TIMEOUT = 300.0
+
+_ALIGN = 64
+
+
+class _Array:
+    """
+    Pipe-side placeholder for an array stored in a ring (or sent as raw bytes).
+    device is set when the value was a torch tensor on that device.
+    """
+    __slots__ = ('offset', 'shape', 'dtype', 'inline', 'device')
+
+    def __init__(self, offset, shape, dtype, inline=False, device=None):
+        self.offset = offset
+        self.shape = shape
+        self.dtype = dtype
+        self.inline = inline
+        self.device = device
+
+
+def _is_tensor(value) -> bool:
+    # checked by type so the GUI side does not have to import torch to send audio
+    return type(value).__module__.startswith('torch') and hasattr(value, 'detach')
+
+
+class ShmRing:
+    """
+    Single-writer ring of arrays in a SharedMemory block.
+
+    The writer places each array at the next aligned offset, wrapping to the start when
+    it does not fit. Correctness across messages relies on the synchronous protocol:
+    the reader copies an array out before the writer's next call. begin() marks the
+    start of a message; a write that would wrap onto data written since then is
+    refused (returns None) instead.
+    """
+
+    def __init__(self, size: int = DEFAULT_RING_BYTES, name: str = None):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.name = self.shm.name
+        self.size = self.shm.size
+        self._head = 0
+        self._start = 0
+        self._wrapped = False
+
+    def begin(self):
+        """Start a new message: everything written before has been read."""
+        self._start = self._head
+        self._wrapped = False
+
+    def write(self, array: np.ndarray) -> Optional[_Array]:
+        """Copy array into the ring. Returns None if it is larger than the ring."""
+        array = np.ascontiguousarray(array)
+        nbytes = array.nbytes
+        if nbytes > self.size:
+            return None
+        if self._wrapped:
+            # the message already runs from _start to the end and from 0 to _head
+            if self._head + nbytes > self._start:
+                return None
+            offset = self._head
+        elif self._head + nbytes <= self.size:
+            offset = self._head
+        elif self._head == self._start:
+            # nothing written for this message yet, so the whole ring is free
+            offset = self._start = 0
+        elif nbytes <= self._start:
+            offset = 0
+            self._wrapped = True
+        else:
+            return None
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=self.shm.buf, offset=offset)
+        view[...] = array
+        self._head = (offset + nbytes + _ALIGN - 1) // _ALIGN * _ALIGN
+        return _Array(offset, array.shape, array.dtype.str)
+
+    def read(self, ref: _Array) -> np.ndarray:
+        view = np.ndarray(ref.shape, dtype=np.dtype(ref.dtype), buffer=self.shm.buf, offset=ref.offset)
+        return view.copy()
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _pack(value, ring: ShmRing, conn):
+    """Replace arrays and tensors in value (and in tuples/lists/dicts) with ring descriptors."""
+    ring.begin()
+    return _pack_value(value, ring, conn)
+
+
+def _pack_value(value, ring: ShmRing, conn):
+    if _is_tensor(value):
+        ref = _pack_value(value.detach().cpu().numpy(), ring, conn)
+        ref.device = str(value.device)
+        return ref
+    if isinstance(value, np.ndarray):
+        ref = ring.write(value)
+        if ref is None:
+            ref = _Array(None, value.shape, value.dtype.str, inline=True)
+            conn.send(('bytes', ref))
+            conn.send_bytes(np.ascontiguousarray(value).data)
+        return ref
+    if isinstance(value, tuple):
+        return tuple(_pack_value(v, ring, conn) for v in value)
+    if isinstance(value, list):
+        return [_pack_value(v, ring, conn) for v in value]
+    if isinstance(value, dict):
+        return {k: _pack_value(v, ring, conn) for k, v in value.items()}
+    return value
+
+
+def _recv(conn):
+    """Receive a message, collecting raw-bytes arrays sent ahead of it."""
+    inline = []
+    while True:
+        msg = conn.recv()
+        if isinstance(msg, tuple) and msg and msg[0] == 'bytes':
+            ref = msg[1]
+            inline.append(np.frombuffer(conn.recv_bytes(), dtype=np.dtype(ref.dtype)).reshape(ref.shape).copy())
+            continue
+        return msg, inline
+
+
+def _unpack(value, ring: ShmRing, inline: list):
+    if isinstance(value, _Array):
+        array = inline.pop(0) if value.inline else ring.read(value)
+        if value.device is not None:
+            import torch
+            return torch.from_numpy(array).to(value.device)
+        return array
+    if isinstance(value, tuple):
+        return tuple(_unpack(v, ring, inline) for v in value)
+    if isinstance(value, list):
+        return [_unpack(v, ring, inline) for v in value]
+    if isinstance(value, dict):
+        return {k: _unpack(v, ring, inline) for k, v in value.items()}
+    return value
+
+
+def _serve(conn, to_worker: str, from_worker: str, tts_kwargs: dict):
+    """Worker process: load OpenVoiceTTS and answer calls until the pipe closes."""
+    from .openvoice_tts import OpenVoiceTTS
+
+    inbox = ShmRing(name=to_worker)
+    outbox = ShmRing(name=from_worker)
+    try:
+        tts = OpenVoiceTTS(**tts_kwargs)
+        conn.send(('ready', {'sampling_rate': tts.sampling_rate, 'pid': os.getpid()}))
+    except Exception as e:
+        conn.send(('error', f"{type(e).__name__}: {e}"))
+        return
+    while True:
+        try:
+            msg, inline = _recv(conn)
+        except (EOFError, OSError):
+            break
+        if msg is None:
+            break
+        method, args, kwargs = _unpack(msg, inbox, inline)
+        with metrics.trace_request() as trace:
+            try:
+                result = getattr(tts, method)(*args, **kwargs)
+                reply = ('ok', _pack(result, outbox, conn))
+            except Exception as e:
+                reply = ('error', f"{type(e).__name__}: {e}")
+        conn.send(reply + ({'stages': trace.stages, 'counts': trace.counts},))
+    inbox.close()
+    outbox.close()
+
+
+class RemoteOpenVoiceTTS:
+    """
+    OpenVoiceTTS hosted in a worker process (same constructor arguments and methods).
+
+    Raises RuntimeError from the constructor if the worker cannot load the models, and
+    from a call if the worker dies during it; the next call starts a new worker.
+    """
+
+    def __init__(self, device: str = None, checkpoints_dir: str = None, precision: str = None,
+                 ring_bytes: int = DEFAULT_RING_BYTES, start_timeout: float = START_TIMEOUT):
+        self._tts_kwargs = {'device': device, 'checkpoints_dir': checkpoints_dir, 'precision': precision}
+        self._ring_bytes = ring_bytes
+        self._start_timeout = start_timeout
+        self._lock = threading.Lock()
+        self._process = None
+        self._conn = None
+        self._rings = None
+        self.sampling_rate = None
+        self.pid = None
+        self._start()
+
+    def _start(self):
+        ctx = multiprocessing.get_context('spawn')
+        self._rings = (ShmRing(self._ring_bytes), ShmRing(self._ring_bytes))
+        self._conn, child = ctx.Pipe()
+        self._process = ctx.Process(target=_serve, name='elpis-tts',
+                                    args=(child, self._rings[0].name, self._rings[1].name, self._tts_kwargs),
+                                    daemon=True)
+        self._process.start()
+        child.close()
+        if not self._conn.poll(self._start_timeout):
+            self._stop()
+            raise RuntimeError("TTS worker process did not start in time")
+        try:
+            status, info = self._conn.recv()
+        except (EOFError, OSError):
+            status, info = 'error', f"worker exited with code {self._process.exitcode}"
+        if status != 'ready':
+            self._stop()
+            raise RuntimeError(f"TTS worker process failed to start: {info}")
+        self.sampling_rate = info['sampling_rate']
+        self.pid = info['pid']
+        logger.info(f"[RemoteTTS] OpenVoice worker process {self.pid} ready")
+
+    def _stop(self):
+        if self._conn is not None:
+            try:
+                self._conn.send(None)
+            except (OSError, BrokenPipeError):
+                pass
+            self._conn.close()
+            self._conn = None
+        if self._process is not None:
+            self._process.join(5)
+            if self._process.is_alive():
+                self._process.kill()
+                self._process.join()
+            self._process = None
+        if self._rings is not None:
+            for ring in self._rings:
+                ring.close()
+            self._rings = None
+
+    def _call(self, method: str, *args, **kwargs):
+        with self._lock:
+            if self._process is None or not self._process.is_alive():
+                if self._process is not None:
+                    logger.warning(f"[RemoteTTS] Worker exited ({self._process.exitcode}), restarting")
+                    self._stop()
+                self._start()
+            to_worker, from_worker = self._rings
+            try:
+                self._conn.send(_pack((method, args, kwargs), to_worker, self._conn))
+                msg, inline = _recv(self._conn)
+            except (EOFError, OSError) as e:
+                code = self._process.exitcode if self._process is not None else None
+                self._stop()
+                raise RuntimeError(f"TTS worker process died during {method} (exit code {code})") from e
+            status, payload, timings = msg
+            trace = metrics.current_trace()
+            if trace is not None:
+                for name, seconds in timings['stages'].items():
+                    trace.stages[name] = trace.stages.get(name, 0.0) + seconds
+                    trace.counts[name] = trace.counts.get(name, 0) + timings['counts'].get(name, 1)
+            if status != 'ok':
+                raise RuntimeError(f"TTS worker {method} failed: {payload}")
+            return _unpack(payload, from_worker, inline)
+
+    def close(self):
+        """Stop the worker process and free the shared memory."""
+        with self._lock:
+            self._stop()
+
+    # ---- OpenVoiceTTS API -----------------------------------------------------
+
+    def synthesize_audio(self, text: str, reference_audio: Optional[str] = None,
+                         speaker: str = 'default', language: str = 'English', speed: float = 1.0):
+        return self._call('synthesize_audio', text, reference_audio=reference_audio,
+                          speaker=speaker, language=language, speed=speed)
+
+    def synthesize_with_timeline(self, text: str, reference_audio: Optional[str] = None,
+                                 speaker: str = 'default', language: str = 'English', speed: float = 1.0):
+        return self._call('synthesize_with_timeline', text, reference_audio=reference_audio,
+                          speaker=speaker, language=language, speed=speed)
+
+    def get_target_se(self, reference_audio: str):
+        return self._call('get_target_se', reference_audio)
+
+    def extract_target_se(self, audio: np.ndarray):
+        return self._call('extract_target_se', np.asarray(audio, dtype=np.float32))
+
+    def set_target_se(self, reference_audio: str, target_se):
+        return self._call('set_target_se', reference_audio, target_se)
+
+    def forget_target_se(self, reference_audio: str):
+        return self._call('forget_target_se', reference_audio)
+
+    def set_speaker_style(self, style: str = 'default'):
+        return self._call('set_speaker_style', style)
+
+    def memory_report(self) -> dict:
+        return self._call('memory_report')
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass